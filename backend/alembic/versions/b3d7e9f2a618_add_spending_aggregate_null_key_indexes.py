@@ -0,0 +1,71 @@
+"""add unique indexes for NULL spending aggregate keys
+
+Revision ID: b3d7e9f2a618
+Revises: a4f8c3e1b925
+Create Date: 2026-10-19 09:12:40.873215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d7e9f2a618'
+down_revision: Union[str, Sequence[str], None] = 'a4f8c3e1b925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index, key columns, rows it covers)
+INDEXES = (
+    ('uq_spending_aggregates_rollup', ['user_id', 'period'],
+     'category IS NULL AND period IS NOT NULL'),
+    ('uq_spending_aggregates_undated', ['user_id', 'category'],
+     'period IS NULL AND category IS NOT NULL'),
+    ('uq_spending_aggregates_undated_rollup', ['user_id'],
+     'period IS NULL AND category IS NULL'),
+)
+
+
+def merge_duplicates(columns, condition) -> None:
+    """Sum duplicate rows of one key into the oldest and drop the rest."""
+    same_key = ' AND '.join(f'd.{c} = spending_aggregates.{c}' for c in columns)
+    d_condition = condition.replace('category', 'd.category').replace('period', 'd.period')
+    group = f'FROM spending_aggregates d WHERE {same_key} AND {d_condition}'
+
+    op.execute(
+        f"UPDATE spending_aggregates SET "
+        f"total = (SELECT SUM(d.total) {group}), "
+        f"entry_count = (SELECT SUM(d.entry_count) {group}) "
+        f"WHERE {condition}"
+    )
+    op.execute(
+        f"DELETE FROM spending_aggregates WHERE {condition} "
+        f"AND id > (SELECT MIN(d.id) {group})"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, columns, condition in INDEXES:
+        # only SQL Server already kept these keys unique
+        if op.get_bind().dialect.name != 'mssql':
+            merge_duplicates(columns, condition)
+
+        op.create_index(
+            name,
+            'spending_aggregates',
+            columns,
+            unique=True,
+            sqlite_where=sa.text(condition),
+            postgresql_where=sa.text(condition),
+            mssql_where=sa.text(condition),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='spending_aggregates')
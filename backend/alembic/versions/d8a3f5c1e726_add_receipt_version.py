@@ -0,0 +1,36 @@
+"""add updated_at and version to receipts
+
+Revision ID: d8a3f5c1e726
+Revises: b6d4e2f81c07
+Create Date: 2026-10-18 19:02:44.108235
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a3f5c1e726'
+down_revision: Union[str, Sequence[str], None] = 'b6d4e2f81c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('receipts', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('receipts', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    # existing receipts were last modified when they were created
+    op.execute("UPDATE receipts SET updated_at = created_at")
+
+    with op.batch_alter_table('receipts') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('receipts', 'version', mssql_drop_default=True)
+    op.drop_column('receipts', 'updated_at')
@@ -0,0 +1,102 @@
+"""
+Shared setup for benchmarks: local stand-ins instead of Azure services.
+
+Importing this module configures dummy settings and a throwaway SQLite
+database *before* any `src` module is imported, so benchmarks run
+without cloud credentials.
+"""
+
+import os
+import asyncio
+import tempfile
+import statistics
+from typing import Dict, List, Optional
+
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="receipt-bench-"), "bench.db")
+
+for key, value in {
+    "AZURE_BLOB_CONNECTION_STRING": (
+        "DefaultEndpointsProtocol=https;AccountName=bench;"
+        "AccountKey=YmVuY2g=;EndpointSuffix=core.windows.net"
+    ),
+    "AZURE_BLOB_CONTAINER": "bench",
+    "AZURE_DI_ENDPOINT": "https://di.invalid/",
+    "AZURE_DI_KEY": "bench",
+    "AZURE_OPENAI_ENDPOINT": "https://openai.invalid/",
+    "AZURE_OPENAI_KEY": "bench",
+    "AZURE_OPENAI_DEPLOYMENT": "bench",
+    "AUTH_TENANT_ID": "bench",
+    "AUTH_AUDIENCE": "api://bench",
+    "DATABASE_URL": f"sqlite:///{_DB_PATH}",
+    "INGESTION_JOB_STORE_PATH": os.path.join(os.path.dirname(_DB_PATH), "jobs.db"),
+}.items():
+    os.environ.setdefault(key, value)
+
+
+SAMPLE_DI_RESULT = {
+    "merchant": "BENCH MARKET",
+    "total": "₺123,45",
+    "transaction_date": "01.02.2026",
+    "items": [
+        {"description": "MILK 1L", "quantity": 1, "total_price": "34,90"},
+        {"description": "BREAD", "quantity": 2, "total_price": "20,00"},
+        {"description": "COFFEE", "quantity": 1, "total_price": "68,55"},
+    ],
+    "source": "document_intelligence",
+}
+
+
+class StandInDocumentIntelligence:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def analyze_receipt(self, url: Optional[str] = None, data: Optional[bytes] = None) -> Dict:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return dict(SAMPLE_DI_RESULT)
+
+
+class StandInClassifier:
+    async def classify(self, items, merchant=None) -> Dict:
+        from src.logic.expense_classifier import ItemClassification
+
+        return {
+            name: ItemClassification(category="Groceries", source="llm")
+            for name in items
+        }
+
+
+def create_schema() -> None:
+    import src.db.models  # noqa: F401
+    from src.db.base import Base
+    from src.db.session import engine
+
+    Base.metadata.create_all(engine)
+
+
+def override_auth(app) -> None:
+    from src.core.auth import is_authorized
+    from src.schemas.user_info import UserInfo
+
+    app.dependency_overrides[is_authorized] = lambda: UserInfo(
+        user_id="bench-oid",
+        email="bench@example.com",
+        name="Bench",
+    )
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    return {
+        "p50": pct(50),
+        "p95": pct(95),
+        "p99": pct(99),
+        "max": ordered[-1],
+        "mean": statistics.fmean(ordered),
+    }
@@ -0,0 +1,198 @@
+"""
+Per-receipt latency, engine calls and accuracy of `POST /api/receipts`
+with `method=di`, `openai` and `auto`.
+
+    python -m benchmarks.bench_auto_engine --receipts 80
+
+Uses local stand-ins (no Azure access needed). Every synthetic receipt
+has a known true total and date; the engines answer after a fixed latency:
+
+  * Document Intelligence is right and confident on most receipts; on
+    `--di-unsure` of them it misreads the total with low confidence, and
+    on `--di-wrong` it misreads it silently (high confidence), always for
+    the same few merchants
+  * OpenAI is always right but slower
+
+Accuracy is the share of receipts whose saved total and date are both
+correct. `auto` learns weak merchants from the compare history, so
+`--warmup-compares` compare uploads run before it.
+"""
+
+import os
+import time
+import random
+import asyncio
+import argparse
+from collections import Counter
+from typing import Dict, List, Optional
+
+os.environ.setdefault("ANALYSIS_CACHE_ENABLED", "false")
+os.environ.setdefault("IMAGE_PREPROCESS_ENABLED", "false")
+
+from benchmarks import _standins
+from benchmarks.bench_image_preprocessing import MemoryBlobStandIn
+
+import httpx
+
+
+class Truth:
+    def __init__(self, index: int, merchant: str, di_mode: str):
+        self.total = round(10 + index * 1.37, 2)
+        self.date = f"2026-02-{index % 27 + 1:02d}"
+        self.merchant = merchant
+        self.di_mode = di_mode
+
+
+def build_receipts(args) -> Dict[bytes, Truth]:
+    rng = random.Random(11)
+    merchants = [f"MARKET {i}" for i in range(12)]
+    # DI misreads these merchants' receipt layout without noticing
+    silent = set(merchants[:2])
+
+    receipts: Dict[bytes, Truth] = {}
+    for index in range(args.receipts):
+        merchant = rng.choice(merchants)
+        if merchant in silent and rng.random() < args.di_wrong * len(merchants) / len(silent):
+            mode = "wrong"
+        elif rng.random() < args.di_unsure:
+            mode = "unsure"
+        else:
+            mode = "ok"
+        receipts[f"receipt-{index}".encode()] = Truth(index, merchant, mode)
+    return receipts
+
+
+class StandInDI:
+    def __init__(self, receipts: Dict[bytes, Truth], latency: float):
+        self.receipts = receipts
+        self.latency = latency
+        self.calls = 0
+
+    async def analyze_receipt(self, url: Optional[str] = None, data: Optional[bytes] = None) -> Dict:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+        truth = self.receipts[data or b""]
+        total = truth.total if truth.di_mode == "ok" else truth.total + 1
+        return {
+            "merchant": truth.merchant,
+            "total": f"${total:.2f}",
+            "transaction_date": truth.date,
+            "items": [{"description": "MILK 1L", "quantity": 1, "total_price": "2.50"}],
+            "source": "document_intelligence",
+            "confidence": {
+                "document": 0.9,
+                "merchant": 0.95,
+                "total": 0.4 if truth.di_mode == "unsure" else 0.97,
+                "transaction_date": 0.95,
+                "items": 0.9,
+            },
+        }
+
+
+class StandInVision:
+    def __init__(self, receipts: Dict[bytes, Truth], latency: float):
+        self.receipts = receipts
+        self.latency = latency
+        self.calls = 0
+
+    async def analyze_image_with_schema(self, image_url, schema_model, system_prompt, user_prompt, temperature=0):
+        import base64
+        from src.services.openai_service import OpenAIJsonSchemaResponse
+
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+        truth = self.receipts[base64.b64decode(image_url.split(",", 1)[1])]
+        raw = {
+            "merchant": truth.merchant,
+            "total": truth.total,
+            "currency": "USD",
+            "transaction_date": truth.date,
+            "items": [{"name": "MILK 1L", "quantity": 1, "price": 2.5}],
+        }
+        return OpenAIJsonSchemaResponse(raw=raw, model=schema_model(**raw))
+
+
+async def upload(client: httpx.AsyncClient, method: str, data: bytes) -> dict:
+    response = await client.post(
+        f"/api/receipts?method={method}",
+        files={"file": ("receipt.jpg", data, "image/jpeg")},
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def run_mode(method: str, receipts: Dict[bytes, Truth], args) -> None:
+    from src.main import app
+    from src.logic import receipt_processor
+
+    di = StandInDI(receipts, args.di_latency)
+    vision = StandInVision(receipts, args.openai_latency)
+    receipt_processor.async_blob_storage = MemoryBlobStandIn(upload_mbps=1000)
+    receipt_processor.di_service = di  # type: ignore[assignment]
+    receipt_processor.processor._svc = vision  # type: ignore[assignment]
+    receipt_processor.expense_classifier = _standins.StandInClassifier()
+
+    items = list(receipts.items())
+    latencies: List[float] = []
+    correct = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        if method == "auto":
+            for data, _ in items[: args.warmup_compares]:
+                await upload(client, "compare", data)
+            items = items[args.warmup_compares :]
+            di.calls = vision.calls = 0
+
+        for data, truth in items:
+            start = time.perf_counter()
+            analysis = (await upload(client, method, data))["analysis"]
+            latencies.append(time.perf_counter() - start)
+
+            if analysis["total"] == truth.total and analysis["transaction_date"] == truth.date:
+                correct += 1
+
+    s = _standins.percentiles(latencies)
+    print(
+        f"{method:<7} {s['mean']:>8.3f} {s['p95']:>8.3f} {di.calls / len(items):>7.2f} "
+        f"{vision.calls / len(items):>7.2f} {correct / len(items):>9.1%}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--receipts", type=int, default=80)
+    parser.add_argument("--di-latency", type=float, default=0.2)
+    parser.add_argument("--openai-latency", type=float, default=0.6)
+    parser.add_argument("--di-unsure", type=float, default=0.15)
+    parser.add_argument("--di-wrong", type=float, default=0.05)
+    parser.add_argument("--warmup-compares", type=int, default=20)
+    args = parser.parse_args()
+
+    receipts = build_receipts(args)
+
+    _standins.create_schema()
+
+    from src.main import app
+
+    _standins.override_auth(app)
+
+    modes = Counter(truth.di_mode for truth in receipts.values())
+    print(
+        f"{args.receipts} receipts (DI ok={modes['ok']} unsure={modes['unsure']} "
+        f"wrong={modes['wrong']}) | DI {args.di_latency}s, OpenAI {args.openai_latency}s"
+    )
+    print(f"{'method':<7} {'mean':>8} {'p95':>8} {'DI/rcpt':>7} {'OAI/rcpt':>7} {'accuracy':>9}")
+
+    for method in ("di", "openai", "auto"):
+        await run_mode(method, receipts, args)
+
+    from src.db.session import async_engine
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
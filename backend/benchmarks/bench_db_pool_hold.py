@@ -0,0 +1,157 @@
+"""
+Connection pool pressure from concurrent uploads: a session held for the
+whole request versus sessions opened only to persist.
+
+    python -m benchmarks.bench_db_pool_hold --uploads 12 --pool-size 2
+
+Uses local stand-ins (no Azure access needed) and a deliberately small
+pool (`--pool-size`, no overflow). `--uploads` receipts are processed
+concurrently with a `--di-latency` Document Intelligence stand-in while
+a dashboard-style query runs in a loop on its own session.
+
+  * held    — a session is touched before the engines run and then
+              used to persist (a request-scoped session used early)
+  * scoped  — `process_receipt_bytes` alone (current code)
+
+Reported: uploads saved (the rest hit the pool timeout), their wall
+time, dashboard query latency and pool timeouts, and the mean
+connection hold time from `db.pool.hold_seconds`.
+"""
+
+import os
+import time
+import logging
+import asyncio
+import argparse
+from typing import List
+
+_args = argparse.ArgumentParser(add_help=False)
+_args.add_argument("--pool-size", type=int, default=2)
+_known, _ = _args.parse_known_args()
+
+os.environ.setdefault("DB_POOL_SIZE", str(_known.pool_size))
+os.environ.setdefault("DB_MAX_OVERFLOW", "0")
+os.environ.setdefault("DB_POOL_TIMEOUT", "5")
+os.environ.setdefault("ANALYSIS_CACHE_ENABLED", "false")
+os.environ.setdefault("IMAGE_PREPROCESS_ENABLED", "false")
+
+from benchmarks import _standins
+from benchmarks.bench_image_preprocessing import MemoryBlobStandIn
+
+from sqlalchemy import text
+
+
+def hold_stats() -> tuple[float, float]:
+    from src.utils.metrics import metrics
+
+    snapshot = metrics.snapshot()
+    return snapshot.get("db.pool.hold_seconds.count", 0), snapshot.get("db.pool.hold_seconds.sum", 0)
+
+
+async def upload(mode: str, index: int) -> bool:
+    from sqlalchemy.exc import TimeoutError as PoolTimeout
+    from src.db.session import AsyncSessionLocal
+    from src.db.crud.receipt_crud import save_receipt
+    from src.logic.receipt_processor import analyze_receipt_bytes, process_receipt_bytes
+    from src.schemas.engine import Engine
+
+    data = f"receipt-{mode}-{index}".encode()
+
+    try:
+        if mode == "scoped":
+            await process_receipt_bytes(data, "receipt.jpg", Engine.di, user_id=1)
+            return True
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+            analyzed = await analyze_receipt_bytes(data, "receipt.jpg", Engine.di)
+            await save_receipt(db, analyzed.analysis, 1, analyzed.sas_url)  # type: ignore[arg-type]
+            return True
+    except PoolTimeout:
+        return False
+
+
+async def dashboard(stop: asyncio.Event, latencies: List[float]) -> int:
+    from sqlalchemy.exc import TimeoutError as PoolTimeout
+    from src.db.session import AsyncSessionLocal
+    from src.db.crud.receipt_crud import list_receipts_page
+
+    timeouts = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                await list_receipts_page(db, 1, limit=20)
+        except PoolTimeout:
+            timeouts += 1
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.05)
+    return timeouts
+
+
+async def run_mode(mode: str, args) -> None:
+    count_before, sum_before = hold_stats()
+
+    stop = asyncio.Event()
+    latencies: List[float] = []
+    query_loop = asyncio.create_task(dashboard(stop, latencies))
+
+    start = time.perf_counter()
+    saved = await asyncio.gather(*(upload(mode, i) for i in range(args.uploads)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    timeouts = await query_loop
+
+    count_after, sum_after = hold_stats()
+    holds = count_after - count_before
+    mean_hold = (sum_after - sum_before) / holds if holds else 0
+
+    s = _standins.percentiles(latencies)
+    print(
+        f"{mode:<7} {sum(saved):>3}/{len(saved):<3} {elapsed:>7.2f} {s['p50'] * 1000:>9.1f} "
+        f"{s['p95'] * 1000:>9.1f} {s['max'] * 1000:>9.1f} {timeouts:>8} {mean_hold * 1000:>10.1f}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uploads", type=int, default=12)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--di-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    # pool timeouts inside the pipeline are expected in `held` mode
+    logging.getLogger("src").setLevel(logging.CRITICAL)
+
+    _standins.create_schema()
+
+    from src.db.models.user import User
+    from src.db.session import AsyncSessionLocal, async_engine
+    from src.logic import receipt_processor
+
+    async with AsyncSessionLocal() as db:
+        db.add(User(id=1, microsoft_id="bench-oid", email="bench@example.com", name="Bench"))
+        await db.commit()
+
+    receipt_processor.async_blob_storage = MemoryBlobStandIn(upload_mbps=1000)
+    receipt_processor.di_service = _standins.StandInDocumentIntelligence(args.di_latency)  # type: ignore[assignment]
+    receipt_processor.expense_classifier = _standins.StandInClassifier()
+
+    print(
+        f"{args.uploads} concurrent uploads | pool {args.pool_size}+0, "
+        f"timeout {os.environ['DB_POOL_TIMEOUT']}s | DI {args.di_latency}s"
+    )
+    print(
+        f"{'mode':<7} {'saved':>7} {'wall s':>7} {'dash p50':>9} {'dash p95':>9} {'dash max':>9} "
+        f"{'timeouts':>8} {'hold ms':>10}"
+    )
+
+    for mode in ("held", "scoped"):
+        await run_mode(mode, args)
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,215 @@
+"""
+Latency of one Document Intelligence analysis with the SDK's fixed-interval
+polling versus the tuned backoff polling of `DocumentIntelligenceService`.
+
+    python -m benchmarks.bench_di_polling --requests 20
+
+Runs against a local fake of the DI REST API (no Azure access needed):
+
+  * `POST .../documentModels/{model}:analyze` answers 202 with an
+    `Operation-Location`
+  * the operation stays `notStarted` for `--queue` seconds, `running` for
+    `--analysis` seconds (both jittered by ±50%), then `succeeded`
+  * with `--retry-after N` every status response carries `Retry-After: N`
+
+  * fixed  — SDK poller with `polling_interval=--fixed-interval`
+  * tuned  — `DocumentIntelligenceService.run_analysis` (current code)
+
+Afterwards one operation longer than `--deadline` checks that the tuned
+service gives up on time.
+"""
+
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from typing import Dict, Tuple
+
+from benchmarks import _standins
+
+from aiohttp import web
+
+
+MODEL_ID = "prebuilt-receipt"
+
+ANALYZE_RESULT = {
+    "apiVersion": "2024-11-30",
+    "modelId": MODEL_ID,
+    "content": "BENCH MARKET\nTOTAL 123,45",
+    "pages": [],
+    "documents": [
+        {
+            "docType": "receipt.retailMeal",
+            "confidence": 0.98,
+            "spans": [],
+            "fields": {
+                "MerchantName": {"type": "string", "valueString": "BENCH MARKET", "confidence": 0.97},
+                "Total": {"type": "currency", "content": "123,45", "confidence": 0.95},
+            },
+        }
+    ],
+}
+
+
+class FakeDocumentIntelligence:
+    def __init__(self, queue: float, analysis: float, retry_after: int, seed: int = 7):
+        self.queue = queue
+        self.analysis = analysis
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        # operation id -> (running at, succeeded at)
+        self.operations: Dict[str, Tuple[float, float]] = {}
+        self.status_requests = 0
+
+    def _jitter(self, seconds: float) -> float:
+        return seconds * self.rng.uniform(0.5, 1.5)
+
+    async def analyze(self, request: web.Request) -> web.Response:
+        await request.read()
+
+        now = time.perf_counter()
+        running_at = now + self._jitter(self.queue)
+        self.operations[op_id := uuid.uuid4().hex] = (
+            running_at,
+            running_at + self._jitter(self.analysis),
+        )
+
+        location = (
+            f"{request.url.origin()}/documentintelligence/documentModels/"
+            f"{request.match_info['model']}/analyzeResults/{op_id}?api-version=2024-11-30"
+        )
+        return web.Response(status=202, headers={"Operation-Location": location})
+
+    async def status(self, request: web.Request) -> web.Response:
+        self.status_requests += 1
+        running_at, done_at = self.operations[request.match_info["op_id"]]
+        now = time.perf_counter()
+
+        body: Dict = {"createdDateTime": "2026-01-01T00:00:00Z", "lastUpdatedDateTime": "2026-01-01T00:00:00Z"}
+        if now < running_at:
+            body["status"] = "notStarted"
+        elif now < done_at:
+            body["status"] = "running"
+        else:
+            body["status"] = "succeeded"
+            body["analyzeResult"] = ANALYZE_RESULT
+
+        headers = {"Retry-After": str(self.retry_after)} if self.retry_after else {}
+        return web.json_response(body, headers=headers)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/documentintelligence/documentModels/{model}:analyze", self.analyze)
+        app.router.add_get(
+            "/documentintelligence/documentModels/{model}/analyzeResults/{op_id}",
+            self.status,
+        )
+        return app
+
+
+async def start_server(fake: FakeDocumentIntelligence) -> Tuple[web.AppRunner, str]:
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def run_fixed(endpoint: str, args) -> float:
+    from azure.ai.documentintelligence.models import AnalyzeDocumentRequest
+    from src.services.document_intelligence_service import DocumentIntelligenceService
+
+    service = DocumentIntelligenceService(endpoint, "bench")
+
+    start = time.perf_counter()
+    poller = await service._client.begin_analyze_document(
+        model_id=MODEL_ID,
+        body=AnalyzeDocumentRequest(bytes_source=b"receipt"),
+        polling_interval=args.fixed_interval,
+    )
+    await poller.result()
+    elapsed = time.perf_counter() - start
+
+    await service._client.close()
+    return elapsed
+
+
+async def run_tuned(endpoint: str, args) -> float:
+    from src.services.document_intelligence_service import DocumentIntelligenceService
+
+    service = DocumentIntelligenceService(endpoint, "bench")
+
+    start = time.perf_counter()
+    await service.run_analysis(MODEL_ID, data=b"receipt")
+    elapsed = time.perf_counter() - start
+
+    await service._client.close()
+    return elapsed
+
+
+async def check_deadline(args) -> None:
+    from src.services.document_intelligence_service import (
+        DocumentAnalysisTimeout,
+        DocumentIntelligenceService,
+    )
+
+    fake = FakeDocumentIntelligence(queue=args.deadline, analysis=args.deadline, retry_after=0)
+    runner, endpoint = await start_server(fake)
+
+    service = DocumentIntelligenceService(endpoint, "bench", deadline_seconds=args.deadline)
+    start = time.perf_counter()
+    try:
+        await service.run_analysis(MODEL_ID, data=b"receipt")
+        outcome = "finished (unexpected)"
+    except DocumentAnalysisTimeout:
+        outcome = "timed out"
+
+    print(f"deadline {args.deadline}s: {outcome} after {time.perf_counter() - start:.2f}s")
+
+    await service._client.close()
+    await runner.cleanup()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--queue", type=float, default=0.3)
+    parser.add_argument("--analysis", type=float, default=1.2)
+    parser.add_argument("--retry-after", type=int, default=0)
+    parser.add_argument("--fixed-interval", type=float, default=1.0)
+    parser.add_argument("--deadline", type=float, default=3.0)
+    args = parser.parse_args()
+
+    from src.utils.metrics import metrics
+
+    print(
+        f"{args.requests} analyses | queue~{args.queue}s analysis~{args.analysis}s "
+        f"retry-after={args.retry_after or '-'} fixed interval={args.fixed_interval}s"
+    )
+    print(f"{'mode':<7} {'p50':>8} {'p95':>8} {'mean':>8} {'polls/op':>9}")
+
+    for mode, run in (("fixed", run_fixed), ("tuned", run_tuned)):
+        fake = FakeDocumentIntelligence(args.queue, args.analysis, args.retry_after)
+        runner, endpoint = await start_server(fake)
+
+        latencies = [await run(endpoint, args) for _ in range(args.requests)]
+        await runner.cleanup()
+
+        s = _standins.percentiles(latencies)
+        polls = fake.status_requests / args.requests
+        print(f"{mode:<7} {s['p50']:>8.3f} {s['p95']:>8.3f} {s['mean']:>8.3f} {polls:>9.1f}")
+
+    snapshot = metrics.snapshot()
+    for name in ("di.queue_seconds", "di.analysis_seconds"):
+        count = snapshot.get(f"{name}.count", 0)
+        mean = snapshot.get(f"{name}.sum", 0) / count if count else 0
+        print(f"{name}: mean {mean:.3f}s over {count:.0f}")
+
+    await check_deadline(args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
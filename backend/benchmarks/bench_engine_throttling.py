@@ -0,0 +1,191 @@
+"""
+Load test of engine calls against a throttling stub: SDK retries alone
+versus the client-side `EngineGuard` (AIMD limiter, retry budget, breaker).
+
+    python -m benchmarks.bench_engine_throttling --calls 200
+
+The stub speaks the Azure OpenAI chat-completions API (no Azure access
+needed) and admits `--capacity` requests per second (token bucket, burst
+of one second); everything above gets `429` with `Retry-After`.
+`OpenAIVisionService.complete_with_schema` is called by `--clients`
+concurrent workers until `--calls` calls are done.
+
+  * sdk      — no guard; the SDK retries each 429 itself (2 retries)
+  * guarded  — `EngineGuard`, SDK retries off (current code)
+
+Reported: calls that succeeded, upstream requests per call (retry
+amplification), 429s received and latency. A final phase makes the stub
+return 503 for everything and counts how many calls the breaker rejects
+without reaching it.
+"""
+
+import time
+import asyncio
+import argparse
+from typing import List, Optional
+
+from benchmarks import _standins
+
+from aiohttp import web
+from pydantic import BaseModel
+
+
+API_VERSION = "2024-08-01-preview"
+
+
+class Answer(BaseModel):
+    category: str
+
+
+class ThrottlingStub:
+    def __init__(self, capacity: float, latency: float, retry_after: int):
+        self.capacity = capacity
+        self.latency = latency
+        self.retry_after = retry_after
+        self.tokens = capacity
+        self.refilled_at = time.monotonic()
+        self.outage = False
+        self.requests = 0
+        self.throttled = 0
+
+    def _admit(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.refilled_at) * self.capacity)
+        self.refilled_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    async def completions(self, request: web.Request) -> web.Response:
+        await request.read()
+        self.requests += 1
+
+        if self.outage:
+            return web.json_response({"error": {"code": "ServiceUnavailable"}}, status=503)
+
+        if not self._admit():
+            self.throttled += 1
+            return web.json_response(
+                {"error": {"code": "429", "message": "Rate limit exceeded"}},
+                status=429,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        await asyncio.sleep(self.latency)
+        return web.json_response(
+            {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "bench",
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": '{"category": "Groceries"}'},
+                    }
+                ],
+            }
+        )
+
+    async def start(self) -> tuple[web.AppRunner, str]:
+        app = web.Application()
+        app.router.add_post("/openai/deployments/{deployment}/chat/completions", self.completions)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+def build_guard(args):
+    from src.services.engine_guard import AdaptiveLimiter, CircuitBreaker, EngineGuard, RetryBudget
+
+    return EngineGuard(
+        "openai",
+        limiter=AdaptiveLimiter(initial=4, minimum=1, maximum=args.clients),
+        breaker=CircuitBreaker(failure_threshold=5, reset_seconds=5),
+        budget=RetryBudget(ratio=0.2),
+        max_attempts=3,
+    )
+
+
+async def run_load(service, calls: int, clients: int) -> tuple[List[float], int]:
+    latencies: List[float] = []
+    failures = 0
+    remaining = iter(range(calls))
+
+    async def worker() -> None:
+        nonlocal failures
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                await service.complete_with_schema(Answer, "Label the item.", "milk")
+            except Exception:
+                failures += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return latencies, failures
+
+
+async def run_mode(mode: str, args) -> None:
+    from src.services.openai_service import OpenAIVisionService
+
+    stub = ThrottlingStub(args.capacity, args.latency, args.retry_after)
+    runner, endpoint = await stub.start()
+
+    guard = build_guard(args) if mode == "guarded" else None
+    service = OpenAIVisionService(endpoint, "bench", "bench", API_VERSION, guard=guard)
+
+    start = time.perf_counter()
+    latencies, failures = await run_load(service, args.calls, args.clients)
+    elapsed = time.perf_counter() - start
+
+    s = _standins.percentiles(latencies) if latencies else {"p50": 0, "p95": 0}
+    print(
+        f"{mode:<8} {len(latencies):>5}/{args.calls:<5} {stub.requests / args.calls:>9.2f} "
+        f"{stub.throttled:>6} {s['p50']:>7.2f} {s['p95']:>7.2f} {elapsed:>7.1f}"
+    )
+
+    if guard is not None:
+        stub.outage = True
+        before = stub.requests
+        _, failures = await run_load(service, args.calls, args.clients)
+        print(
+            f"outage: {failures} calls failed, {stub.requests - before} reached the stub "
+            f"(breaker {guard.breaker.state})"
+        )
+
+    await service._client.close()
+    await runner.cleanup()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--capacity", type=float, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args()
+
+    print(
+        f"{args.calls} calls from {args.clients} clients | stub admits {args.capacity}/s, "
+        f"latency {args.latency}s, Retry-After {args.retry_after}s"
+    )
+    print(f"{'mode':<8} {'ok':>11} {'req/call':>9} {'429s':>6} {'p50':>7} {'p95':>7} {'wall':>7}")
+
+    for mode in ("sdk", "guarded"):
+        await run_mode(mode, args)
+
+    from src.utils.metrics import metrics
+
+    print({k: v for k, v in metrics.snapshot().items() if k.startswith("engine.")})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
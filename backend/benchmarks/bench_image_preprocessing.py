@@ -0,0 +1,207 @@
+"""
+Bytes sent to the engine and end-to-end latency of `POST /api/receipts`
+with and without the image preprocessing stage.
+
+    python -m benchmarks.bench_image_preprocessing --fixtures ./photos
+    python -m benchmarks.bench_image_preprocessing --generate 8
+
+Fixtures are JPEG/PNG receipt photos; without `--fixtures`, phone-sized
+synthetic photos (paper on a dark desk, sensor noise, rotated via EXIF)
+are generated.
+
+Both runs use local stand-ins (no Azure access needed):
+
+  * blob storage keeps uploads in memory; an upload takes
+    `--upload-mbps` to transfer
+  * Document Intelligence receives the image (sent inline or fetched
+    from storage) at `--engine-mbps` and then spends `--engine-latency`
+    on it
+
+  * original  — engines read the uploaded file as-is
+  * optimized — engines read the preprocessed variant (current code)
+
+The analysis cache is disabled so every request does the full amount of work.
+"""
+
+import io
+import os
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+os.environ.setdefault("ANALYSIS_CACHE_ENABLED", "false")
+
+from benchmarks import _standins
+
+import httpx
+from PIL import Image, ImageDraw
+
+
+def generate_photo(seed: int, size: Tuple[int, int] = (3024, 4032)) -> bytes:
+    """A receipt on a desk, roughly what a phone camera produces."""
+
+    rng = random.Random(seed)
+    width, height = size
+    desk = (58, 44, 36)
+
+    photo = Image.new("RGB", size, desk)
+
+    paper_w, paper_h = int(width * 0.5), int(height * 0.8)
+    paper = Image.new("RGB", (paper_w, paper_h), (246, 244, 238))
+    draw = ImageDraw.Draw(paper)
+
+    y = 80
+    while y < paper_h - 80:
+        line_w = rng.randint(paper_w // 3, paper_w - 160)
+        draw.rectangle((80, y, 80 + line_w, y + 22), fill=(30, 30, 30))
+        y += rng.randint(45, 70)
+
+    photo.paste(
+        paper.rotate(rng.uniform(-4, 4), fillcolor=desk),
+        ((width - paper_w) // 2, (height - paper_h) // 2),
+    )
+
+    noise = Image.effect_noise(size, 40).convert("RGB")
+    photo = Image.blend(photo, noise, 0.15)
+
+    # stored sideways with an orientation tag, as portrait phone shots are
+    exif = Image.Exif()
+    exif[0x0112] = 6
+
+    buffer = io.BytesIO()
+    photo.transpose(Image.Transpose.ROTATE_90).save(
+        buffer, format="JPEG", quality=92, exif=exif
+    )
+    return buffer.getvalue()
+
+
+def load_fixtures(args) -> List[Tuple[str, bytes]]:
+    if args.fixtures:
+        paths = sorted(
+            p for p in Path(args.fixtures).iterdir()
+            if p.suffix.lower() in {".jpg", ".jpeg", ".png"}
+        )
+        return [(p.name, p.read_bytes()) for p in paths]
+
+    return [(f"photo{i}.jpg", generate_photo(i)) for i in range(args.generate)]
+
+
+class MemoryBlobStandIn:
+    def __init__(self, upload_mbps: float):
+        self.upload_mbps = upload_mbps
+        self.blobs: Dict[str, bytes] = {}
+
+    async def upload_bytes(self, blob_name: str, data: bytes, overwrite: bool = True) -> str:
+        await asyncio.sleep(len(data) * 8 / (self.upload_mbps * 1_000_000))
+        self.blobs[blob_name] = data
+        return f"https://bench.invalid/{blob_name}"
+
+    def generate_read_sas(self, blob_name: str, expires_in_hours: int = 2) -> str:
+        return f"https://bench.invalid/{blob_name}?sas"
+
+
+class FetchingDocumentIntelligence(_standins.StandInDocumentIntelligence):
+    """Pays for receiving the image (fetched or sent) before the fixed analysis latency."""
+
+    def __init__(self, blobs: MemoryBlobStandIn, mbps: float, latency: float):
+        super().__init__(latency)
+        self.blobs = blobs
+        self.mbps = mbps
+        self.bytes_fetched = 0
+
+    async def analyze_receipt(self, url: Optional[str] = None, data: Optional[bytes] = None) -> Dict:
+        if data is None:
+            assert url is not None
+            data = self.blobs.blobs[url.rsplit("/", 1)[-1].split("?", 1)[0]]
+
+        self.bytes_fetched += len(data)
+
+        await asyncio.sleep(len(data) * 8 / (self.mbps * 1_000_000))
+        return await super().analyze_receipt(url, data)
+
+
+async def run_mode(mode: str, fixtures: List[Tuple[str, bytes]], args) -> dict:
+    from src.main import app
+    from src.settings import settings
+    from src.logic import receipt_processor
+
+    settings.IMAGE_PREPROCESS_ENABLED = mode == "optimized"
+
+    blobs = MemoryBlobStandIn(args.upload_mbps)
+    engine = FetchingDocumentIntelligence(blobs, args.engine_mbps, args.engine_latency)
+
+    receipt_processor.async_blob_storage = blobs
+    receipt_processor.di_service = engine
+    receipt_processor.expense_classifier = _standins.StandInClassifier()
+
+    latencies = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # first request creates the user row and starts the pool workers
+        await client.post(
+            "/api/receipts?method=di",
+            files={"file": ("warmup.jpg", fixtures[0][1], "image/jpeg")},
+        )
+        engine.bytes_fetched = 0
+
+        for filename, data in fixtures:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/receipts?method=di",
+                files={"file": (filename, data, "image/jpeg")},
+            )
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    stats = _standins.percentiles(latencies)
+    stats["engine_mb"] = engine.bytes_fetched / len(fixtures) / 1_000_000
+    return stats
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fixtures", type=str, default=None)
+    parser.add_argument("--generate", type=int, default=6)
+    parser.add_argument("--upload-mbps", type=float, default=200)
+    parser.add_argument("--engine-mbps", type=float, default=50)
+    parser.add_argument("--engine-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args)
+    if not fixtures:
+        parser.error("no fixtures found")
+
+    _standins.create_schema()
+
+    from src.main import app
+    from src.logic.receipt_processor import image_preprocessor
+
+    _standins.override_auth(app)
+
+    mean_mb = sum(len(data) for _, data in fixtures) / len(fixtures) / 1_000_000
+    print(
+        f"{len(fixtures)} photos, mean {mean_mb:.2f} MB | upload={args.upload_mbps}Mbps "
+        f"engine={args.engine_mbps}Mbps + {args.engine_latency}s"
+    )
+    print(f"{'mode':<10} {'engine MB':>10} {'p50':>8} {'p95':>8} {'mean':>8}")
+
+    for mode in ("original", "optimized"):
+        s = await run_mode(mode, fixtures, args)
+        print(
+            f"{mode:<10} {s['engine_mb']:>10.2f} {s['p50']:>8.3f} "
+            f"{s['p95']:>8.3f} {s['mean']:>8.3f}"
+        )
+
+    image_preprocessor.shutdown()
+
+    from src.db.session import async_engine
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+"""
+Critical-path latency of `POST /api/receipts?method=openai` when the
+image reaches OpenAI as a SAS URL versus inline as a base64 data URL.
+
+    python -m benchmarks.bench_openai_inline --generate 6
+
+Both runs use local stand-ins (no Azure access needed):
+
+  * blob storage keeps uploads in memory; an upload takes
+    `--upload-mbps` to transfer
+  * the OpenAI stand-in either fetches the SAS URL from storage
+    (`--fetch-overhead` + `--fetch-mbps`) or receives the data URL in the
+    request body (`--upload-mbps`), then spends `--model-latency`
+
+  * sas     — OpenAI starts after the blob upload and fetches the image
+  * inline  — OpenAI starts once preprocessing is done (current code)
+
+Images are preprocessed in both runs. The analysis cache is disabled so
+every request does the full amount of work.
+"""
+
+import os
+import time
+import asyncio
+import argparse
+from typing import List, Tuple
+
+os.environ.setdefault("ANALYSIS_CACHE_ENABLED", "false")
+
+from benchmarks import _standins
+from benchmarks.bench_image_preprocessing import MemoryBlobStandIn, load_fixtures
+
+import httpx
+
+
+class StandInVisionService:
+    def __init__(self, blobs: MemoryBlobStandIn, args):
+        self.blobs = blobs
+        self.args = args
+
+    async def _receive_image(self, image_url: str) -> None:
+        if image_url.startswith("data:"):
+            seconds = len(image_url) * 8 / (self.args.upload_mbps * 1_000_000)
+        else:
+            name = image_url.rsplit("/", 1)[-1].split("?", 1)[0]
+            size = len(self.blobs.blobs[name])
+            seconds = self.args.fetch_overhead + size * 8 / (self.args.fetch_mbps * 1_000_000)
+
+        await asyncio.sleep(seconds)
+
+    async def analyze_image_with_schema(self, image_url, schema_model, system_prompt, user_prompt, temperature=0):
+        from src.services.openai_service import OpenAIJsonSchemaResponse
+
+        await self._receive_image(image_url)
+        await asyncio.sleep(self.args.model_latency)
+
+        raw = {
+            "merchant": "BENCH MARKET",
+            "total": 123.45,
+            "currency": "TRY",
+            "items": [{"name": "MILK 1L", "quantity": 1, "price": 34.9}],
+        }
+        return OpenAIJsonSchemaResponse(raw=raw, model=schema_model(**raw))
+
+
+async def run_mode(mode: str, fixtures: List[Tuple[str, bytes]], args) -> dict:
+    from src.main import app
+    from src.settings import settings
+    from src.logic import receipt_processor
+
+    settings.OPENAI_INLINE_IMAGES = mode == "inline"
+
+    blobs = MemoryBlobStandIn(args.upload_mbps)
+    vision = StandInVisionService(blobs, args)
+
+    receipt_processor.async_blob_storage = blobs
+    receipt_processor.processor._svc = vision  # type: ignore[assignment]
+    receipt_processor.expense_classifier = _standins.StandInClassifier()
+
+    latencies = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # first request creates the user row and starts the pool workers
+        await client.post(
+            "/api/receipts?method=openai",
+            files={"file": ("warmup.jpg", fixtures[0][1], "image/jpeg")},
+        )
+
+        for filename, data in fixtures:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/receipts?method=openai",
+                files={"file": (filename, data, "image/jpeg")},
+            )
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    return _standins.percentiles(latencies)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fixtures", type=str, default=None)
+    parser.add_argument("--generate", type=int, default=6)
+    parser.add_argument("--upload-mbps", type=float, default=100)
+    parser.add_argument("--fetch-mbps", type=float, default=200)
+    parser.add_argument("--fetch-overhead", type=float, default=0.15)
+    parser.add_argument("--model-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args)
+    if not fixtures:
+        parser.error("no fixtures found")
+
+    _standins.create_schema()
+
+    from src.main import app
+    from src.logic.receipt_processor import image_preprocessor
+
+    _standins.override_auth(app)
+
+    print(
+        f"{len(fixtures)} photos | upload={args.upload_mbps}Mbps "
+        f"fetch={args.fetch_overhead}s + {args.fetch_mbps}Mbps model={args.model_latency}s"
+    )
+    print(f"{'mode':<8} {'p50':>8} {'p95':>8} {'mean':>8}")
+
+    results = {}
+    for mode in ("sas", "inline"):
+        s = results[mode] = await run_mode(mode, fixtures, args)
+        print(f"{mode:<8} {s['p50']:>8.3f} {s['p95']:>8.3f} {s['mean']:>8.3f}")
+
+    saved = results["sas"]["mean"] - results["inline"]["mean"]
+    print(f"critical path saved: {saved * 1000:.0f} ms per request (mean)")
+
+    image_preprocessor.shutdown()
+
+    from src.db.session import async_engine
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,189 @@
+"""
+Saving a receipt and editing one of its lines, at 10/100/1000 items:
+the previous per-object ORM code versus the bulk insert / diff-based
+update in `receipt_crud`.
+
+    python -m benchmarks.bench_receipt_items --repeat 5
+
+Runs on the benchmark SQLite database (no Azure access needed).
+
+  * orm   — items appended one ORM object at a time; an update clears
+            the collection and re-inserts every item (previous code)
+  * bulk  — `save_receipt` / `update_receipt` (current code)
+
+Reported per operation: median time and the number of statements that
+wrote to `receipt_items` (an executemany counts once).
+"""
+
+import time
+import asyncio
+import argparse
+import statistics
+from datetime import datetime
+from typing import List, Tuple
+
+from benchmarks import _standins
+
+from sqlalchemy import event
+
+
+def build_data(size: int):
+    from src.schemas.receipt import ReceiptSchema
+
+    return ReceiptSchema(
+        merchant="BENCH MARKET",
+        total=size * 1.5,
+        currency="USD",
+        source="di",
+        items=[
+            {"name": f"ITEM {i}", "quantity": 1, "price": 1.5, "category": "Groceries"}
+            for i in range(size)
+        ],
+    )
+
+
+async def orm_save(db, receipt_data, user_id: int):
+    from src.db.models.receipt import Receipt, ReceiptItem
+    from src.db.crud.spending_aggregate_crud import apply_deltas, receipt_deltas
+
+    receipt = Receipt(
+        merchant=receipt_data.merchant,
+        total=receipt_data.total,
+        currency=receipt_data.currency,
+        transaction_date=receipt_data.transaction_date,
+        source=receipt_data.source,
+        user_id=user_id,
+        blob_url="bench",
+    )
+    for item in receipt_data.items:
+        receipt.items.append(
+            ReceiptItem(
+                name=item.name,
+                quantity=item.quantity,
+                price=item.price,
+                category=item.category,
+                category_source=item.category_source or ("llm" if item.category else None),
+                category_confidence=item.category_confidence,
+                categorized_at=datetime.utcnow() if item.category else None,
+            )
+        )
+
+    db.add(receipt)
+    await apply_deltas(db, user_id, receipt_deltas([receipt]))
+    await db.commit()
+    return receipt
+
+
+async def orm_update(db, receipt_id: int, user_id: int, updated_data):
+    from src.db.models.receipt import ReceiptItem
+    from src.db.crud.receipt_crud import get_receipt_for_user
+    from src.db.crud.spending_aggregate_crud import apply_deltas, merge_deltas, receipt_deltas
+
+    receipt = await get_receipt_for_user(db, receipt_id, user_id)
+    removed = receipt_deltas([receipt], sign=-1)
+
+    receipt.total = updated_data.total
+    receipt.items.clear()
+    for item in updated_data.items:
+        receipt.items.append(
+            ReceiptItem(
+                name=item.name,
+                quantity=item.quantity,
+                price=item.price,
+                category=item.category,
+                category_source=item.category_source or ("llm" if item.category else None),
+                category_confidence=item.category_confidence,
+                categorized_at=datetime.utcnow() if item.category else None,
+            )
+        )
+
+    await apply_deltas(db, user_id, merge_deltas(removed, receipt_deltas([receipt])))
+    await db.commit()
+    return receipt
+
+
+class ItemStatements:
+    """Counts statements that write to `receipt_items`."""
+
+    def __init__(self, engine):
+        self.statements = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if "receipt_items" in statement and not statement.lstrip().startswith("SELECT"):
+            self.statements += 1
+
+    def reset(self) -> None:
+        self.statements = 0
+
+
+async def run(mode: str, size: int, args, counter: ItemStatements) -> Tuple[float, float, int, int]:
+    from src.db.session import AsyncSessionLocal
+    from src.db.crud.receipt_crud import read_receipt_by_id_for_user, save_receipt, update_receipt
+
+    save = orm_save if mode == "orm" else (lambda db, data, user: save_receipt(db, data, user, "bench"))
+    update = orm_update if mode == "orm" else update_receipt
+
+    save_times: List[float] = []
+    update_times: List[float] = []
+
+    for _ in range(args.repeat):
+        data = build_data(size)
+
+        async with AsyncSessionLocal() as db:
+            counter.reset()
+            start = time.perf_counter()
+            receipt = await save(db, data, 1)
+            save_times.append(time.perf_counter() - start)
+            saved = counter.statements
+
+        async with AsyncSessionLocal() as db:
+            # what the edit page sends back: the stored items, one price changed
+            edited = await read_receipt_by_id_for_user(db, receipt.id, 1)
+
+        edited.items[size // 2].price = 9.99
+        edited.total = (edited.total or 0) + 8.49
+
+        async with AsyncSessionLocal() as db:
+            counter.reset()
+            start = time.perf_counter()
+            await update(db, receipt.id, 1, edited)
+            update_times.append(time.perf_counter() - start)
+            updated = counter.statements
+
+    return statistics.median(save_times), statistics.median(update_times), saved, updated
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    _standins.create_schema()
+
+    from src.db.models.user import User
+    from src.db.session import AsyncSessionLocal, async_engine
+
+    async with AsyncSessionLocal() as db:
+        db.add(User(id=1, microsoft_id="bench-oid", email="bench@example.com", name="Bench"))
+        await db.commit()
+
+    counter = ItemStatements(async_engine)
+
+    print(f"median of {args.repeat} runs | stmts = statements writing receipt_items")
+    print(f"{'items':>6} {'mode':<5} {'save ms':>9} {'stmts':>6} {'update ms':>10} {'stmts':>6}")
+
+    for size in args.sizes:
+        for mode in ("orm", "bulk"):
+            save_s, update_s, saved, updated = await run(mode, size, args, counter)
+            print(
+                f"{size:>6} {mode:<5} {save_s * 1000:>9.1f} {saved:>6} "
+                f"{update_s * 1000:>10.1f} {updated:>6}"
+            )
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+"""
+Latency of concurrent `POST /api/receipts` requests when blob upload and
+DB commits block the event loop versus when they are offloaded.
+
+    python -m benchmarks.bench_upload_event_loop --requests 15
+
+Both runs use the same local stand-ins (no Azure access needed):
+
+  * blocking  — blob upload and DB commits hold the event loop, as the
+                synchronous SDK and `Session` did before
+  * offloaded — async blob client + async DB session (current code)
+
+Blob and commit latencies are simulated with sleeps; Document Intelligence
+is an async stand-in with a fixed delay. The analysis cache is disabled so
+every request does the full amount of work.
+
+Each in-flight request may keep one pooled connection checked out (see
+`get_async_db`), so keep `--requests` within DB_POOL_SIZE + DB_MAX_OVERFLOW.
+"""
+
+import os
+import time
+import asyncio
+import argparse
+
+os.environ.setdefault("ANALYSIS_CACHE_ENABLED", "false")
+
+from benchmarks import _standins
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class BlockingBlobStandIn:
+    """Behaves like the synchronous SDK: the upload holds the event loop."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def upload_bytes(self, blob_name: str, data: bytes, overwrite: bool = True) -> str:
+        time.sleep(self.latency)
+        return f"https://bench.invalid/{blob_name}"
+
+    def generate_read_sas(self, blob_name: str, expires_in_hours: int = 2) -> str:
+        return f"https://bench.invalid/{blob_name}?sas"
+
+
+class AsyncBlobStandIn(BlockingBlobStandIn):
+    async def upload_bytes(self, blob_name: str, data: bytes, overwrite: bool = True) -> str:
+        await asyncio.sleep(self.latency)
+        return f"https://bench.invalid/{blob_name}"
+
+
+_real_commit = AsyncSession.commit
+
+
+def _patch_commit(latency: float, blocking: bool) -> None:
+    # simulated network round-trip to the DB server
+    async def commit(self):
+        if blocking:
+            time.sleep(latency)
+        else:
+            await asyncio.sleep(latency)
+        await _real_commit(self)
+
+    AsyncSession.commit = commit  # type: ignore[method-assign]
+
+
+async def run_mode(mode: str, args) -> dict:
+    from src.main import app
+    from src.logic import receipt_processor
+
+    blocking = mode == "blocking"
+
+    receipt_processor.async_blob_storage = (
+        BlockingBlobStandIn(args.blob_latency)
+        if blocking
+        else AsyncBlobStandIn(args.blob_latency)
+    )
+    receipt_processor.di_service = _standins.StandInDocumentIntelligence(args.engine_latency)
+    receipt_processor.expense_classifier = _standins.StandInClassifier()
+
+    _patch_commit(args.db_latency, blocking)
+
+    latencies = []
+
+    async def one(client: httpx.AsyncClient, i: int) -> None:
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/receipts?method=di",
+            files={"file": (f"r{i}.jpg", f"{mode}-{i}".encode(), "image/jpeg")},
+        )
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # first request creates the user row; keep that out of the timings
+        await client.post(
+            "/api/receipts?method=di",
+            files={"file": ("warmup.jpg", f"{mode}-warmup".encode(), "image/jpeg")},
+        )
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(client, i) for i in range(args.requests)))
+        wall = time.perf_counter() - start
+
+    stats = _standins.percentiles(latencies)
+    stats["wall"] = wall
+    return stats
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=15)
+    parser.add_argument("--blob-latency", type=float, default=0.15)
+    parser.add_argument("--db-latency", type=float, default=0.03)
+    parser.add_argument("--engine-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    _standins.create_schema()
+
+    from src.main import app
+
+    _standins.override_auth(app)
+
+    print(
+        f"{args.requests} concurrent uploads | blob={args.blob_latency}s "
+        f"commit={args.db_latency}s engine={args.engine_latency}s"
+    )
+    print(f"{'mode':<10} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'wall':>8}")
+
+    for mode in ("blocking", "offloaded"):
+        s = await run_mode(mode, args)
+        print(
+            f"{mode:<10} {s['p50']:>8.3f} {s['p95']:>8.3f} {s['p99']:>8.3f} "
+            f"{s['max']:>8.3f} {s['wall']:>8.3f}"
+        )
+
+    from src.db.session import async_engine
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
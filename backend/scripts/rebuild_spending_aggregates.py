@@ -0,0 +1,81 @@
+"""
+Recompute the `spending_aggregates` table from receipts.
+
+    python -m scripts.rebuild_spending_aggregates            # every user
+    python -m scripts.rebuild_spending_aggregates --user-id 7
+
+Run once after the migration that creates the table, and whenever the
+aggregates are suspected to have drifted. Each user is rebuilt in its
+own transaction; receipts are read in chunks so memory stays flat.
+"""
+
+import asyncio
+import argparse
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from src.db.session import AsyncSessionLocal, async_engine
+from src.db.models.receipt import Receipt
+from src.db.models.user import User
+from src.db.crud.spending_aggregate_crud import (
+    AggregateDeltas,
+    merge_deltas,
+    receipt_deltas,
+    replace_user_aggregates,
+)
+
+
+async def rebuild_user(user_id: int, chunk_size: int) -> int:
+    deltas: AggregateDeltas = {}
+    last_id = 0
+    count = 0
+
+    async with AsyncSessionLocal() as db:
+        while True:
+            receipts = (
+                await db.execute(
+                    select(Receipt)
+                    .options(selectinload(Receipt.items))
+                    .where(Receipt.user_id == user_id, Receipt.id > last_id)
+                    .order_by(Receipt.id)
+                    .limit(chunk_size)
+                )
+            ).scalars().all()
+
+            if not receipts:
+                break
+
+            deltas = merge_deltas(deltas, receipt_deltas(receipts))
+            last_id = receipts[-1].id
+            count += len(receipts)
+            db.expunge_all()
+
+        await replace_user_aggregates(db, user_id, deltas)
+        await db.commit()
+
+    return count
+
+
+async def main(user_id: Optional[int], chunk_size: int) -> None:
+    if user_id is not None:
+        user_ids: List[int] = [user_id]
+    else:
+        async with AsyncSessionLocal() as db:
+            user_ids = list((await db.execute(select(User.id).order_by(User.id))).scalars())
+
+    for uid in user_ids:
+        count = await rebuild_user(uid, chunk_size)
+        print(f"user {uid}: {count} receipts")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--user-id", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.user_id, args.chunk_size))
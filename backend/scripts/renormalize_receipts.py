@@ -0,0 +1,170 @@
+"""
+Re-run the normalizers on stored receipts from their engines' raw outputs.
+
+    python -m scripts.renormalize_receipts                  # every receipt
+    python -m scripts.renormalize_receipts --user-id 7 --dry-run
+
+Run after a fix to `normalize_di_receipt`, `money_utils`, `date_utils`
+or the OpenAI extraction mapping. Only receipts with stored raw outputs
+(`receipt_raw_outputs`) are reprocessed, and no engine is called.
+Receipts edited by their user (`edited_at` set) are skipped unless
+`--include-edited` is given.
+
+Receipt ids are read in chunks; `--workers` chunks are processed
+concurrently, each in its own transaction, with only changed rows
+updated and the spending aggregates adjusted in the same transaction.
+"""
+
+import asyncio
+import argparse
+import logging
+from collections import Counter
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from src.db.session import AsyncSessionLocal, async_engine
+from src.db.models.receipt import Receipt
+from src.db.models.receipt_raw_output import ReceiptRawOutput
+from src.db.crud.receipt_crud import assign_receipt_data
+from src.db.crud.receipt_raw_output_crud import get_raw_outputs
+from src.db.crud.spending_aggregate_crud import (
+    AggregateDeltas,
+    apply_deltas,
+    merge_deltas,
+    receipt_deltas,
+)
+from src.logic.receipt_renormalizer import renormalize_receipt
+
+
+logger = logging.getLogger(__name__)
+
+
+async def renormalize_chunk(
+    receipt_ids: List[int],
+    include_edited: bool,
+    dry_run: bool,
+) -> Counter:
+    counts: Counter = Counter()
+    deltas: Dict[int, AggregateDeltas] = {}
+
+    async with AsyncSessionLocal() as db:
+        query = (
+            select(Receipt)
+            .options(selectinload(Receipt.items))
+            .where(Receipt.id.in_(receipt_ids))
+        )
+        if not include_edited:
+            query = query.where(Receipt.edited_at.is_(None))
+
+        receipts = (await db.execute(query)).scalars().all()
+        raw_outputs = await get_raw_outputs(db, [receipt.id for receipt in receipts])
+        counts["skipped_edited"] += len(receipt_ids) - len(receipts)
+
+        for receipt in receipts:
+            try:
+                analysis = renormalize_receipt(receipt, raw_outputs.get(receipt.id, {}))
+            except Exception:
+                logger.warning("Re-normalizing receipt %s failed", receipt.id, exc_info=True)
+                counts["failed"] += 1
+                continue
+
+            if analysis is None:
+                counts["missing_raw"] += 1
+                continue
+
+            removed = receipt_deltas([receipt], sign=-1)
+            if not assign_receipt_data(db, receipt, analysis):
+                counts["unchanged"] += 1
+                continue
+
+            counts["updated"] += 1
+            deltas[receipt.user_id] = merge_deltas(
+                deltas.get(receipt.user_id, {}), removed, receipt_deltas([receipt])
+            )
+
+        if dry_run:
+            await db.rollback()
+            return counts
+
+        for user_id, user_deltas in deltas.items():
+            await apply_deltas(db, user_id, user_deltas)
+        await db.commit()
+
+    return counts
+
+
+async def receipt_id_chunks(
+    queue: "asyncio.Queue[Optional[List[int]]]",
+    user_id: Optional[int],
+    chunk_size: int,
+    workers: int,
+) -> None:
+    """Keyset-read ids of receipts with raw outputs onto `queue`."""
+
+    last_id = 0
+
+    async with AsyncSessionLocal() as db:
+        while True:
+            query = (
+                select(ReceiptRawOutput.receipt_id)
+                .where(ReceiptRawOutput.receipt_id > last_id)
+                .group_by(ReceiptRawOutput.receipt_id)
+                .order_by(ReceiptRawOutput.receipt_id)
+                .limit(chunk_size)
+            )
+            if user_id is not None:
+                query = query.join(Receipt, Receipt.id == ReceiptRawOutput.receipt_id).where(
+                    Receipt.user_id == user_id
+                )
+
+            receipt_ids = list((await db.execute(query)).scalars())
+            if not receipt_ids:
+                break
+
+            await queue.put(receipt_ids)
+            last_id = receipt_ids[-1]
+
+    for _ in range(workers):
+        await queue.put(None)
+
+
+async def main(
+    user_id: Optional[int],
+    chunk_size: int,
+    workers: int,
+    include_edited: bool,
+    dry_run: bool,
+) -> None:
+    queue: "asyncio.Queue[Optional[List[int]]]" = asyncio.Queue(maxsize=workers * 2)
+    totals: Counter = Counter()
+
+    async def worker() -> None:
+        while (receipt_ids := await queue.get()) is not None:
+            counts = await renormalize_chunk(receipt_ids, include_edited, dry_run)
+            totals.update(counts)
+            print(f"receipts {receipt_ids[0]}..{receipt_ids[-1]}: {dict(counts)}")
+
+    await asyncio.gather(
+        receipt_id_chunks(queue, user_id, chunk_size, workers),
+        *(worker() for _ in range(workers)),
+    )
+
+    print(f"{'dry run, nothing saved: ' if dry_run else ''}{dict(totals)}")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--user-id", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--include-edited", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(
+        main(args.user_id, args.chunk_size, args.workers, args.include_edited, args.dry_run)
+    )
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query
+from datetime import date
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db.session import get_db
-from src.schemas.user_info import UserInfo
-from src.core.auth import is_authorized
+from src.db.session import get_async_db
+from src.schemas.user_info import ResolvedUser
+from src.api.dependencies import get_current_user
+from src.schemas.dashboard import DashboardResponse
 
 from src.logic import dashboard_logic
 
@@ -14,34 +17,49 @@ router = APIRouter(
 )
 
 
+@router.get("", response_model=DashboardResponse)
+async def get_dashboard(
+    date_from: Optional[date] = Query(default=None),
+    date_to: Optional[date] = Query(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    user: ResolvedUser = Depends(get_current_user),
+):
+    return await dashboard_logic.get_dashboard(
+        db=db,
+        user_id=user.id,
+        date_from=date_from,
+        date_to=date_to,
+    )
+
+
 @router.get("/category-distribution")
-def get_category_distribution(
-    db: Session = Depends(get_db),
-    user_info: UserInfo = Depends(is_authorized),
+async def get_category_distribution(
+    db: AsyncSession = Depends(get_async_db),
+    user: ResolvedUser = Depends(get_current_user),
 ):
-    return dashboard_logic.get_category_distribution(
+    return await dashboard_logic.get_category_distribution(
         db=db,
-        user_info=user_info,
+        user_id=user.id,
     )
 
 
 @router.get("/monthly-trend")
-def get_monthly_trend(
-    db: Session = Depends(get_db),
-    user_info: UserInfo = Depends(is_authorized),
+async def get_monthly_trend(
+    db: AsyncSession = Depends(get_async_db),
+    user: ResolvedUser = Depends(get_current_user),
 ):
-    return dashboard_logic.get_monthly_trend(
+    return await dashboard_logic.get_monthly_trend(
         db=db,
-        user_info=user_info,
+        user_id=user.id,
     )
 
 
 @router.get("/summary")
-def get_summary(
-    db: Session = Depends(get_db),
-    user_info: UserInfo = Depends(is_authorized),
+async def get_summary(
+    db: AsyncSession = Depends(get_async_db),
+    user: ResolvedUser = Depends(get_current_user),
 ):
-    return dashboard_logic.get_summary(
+    return await dashboard_logic.get_summary(
         db=db,
-        user_info=user_info,
+        user_id=user.id,
     )  
\ No newline at end of file
@@ -0,0 +1,18 @@
+from fastapi import Depends
+
+from src.core.auth import is_authorized
+from src.schemas.user_info import UserInfo, ResolvedUser
+from src.logic.user_resolver import resolve_user
+
+
+async def get_current_user(
+    user_info: UserInfo = Depends(is_authorized),
+) -> ResolvedUser:
+    """
+    Application user for the current request.
+
+    FastAPI evaluates a dependency once per request, so endpoints and
+    nested dependencies share a single resolution.
+    """
+
+    return await resolve_user(user_info)
@@ -0,0 +1,49 @@
+import asyncio
+from contextlib import suppress
+from typing import Awaitable, TypeVar
+
+from fastapi import HTTPException, Request
+
+from src.utils.metrics import metrics
+
+
+T = TypeVar("T")
+
+# nginx's status for "client closed request"; the client never sees it
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def cancel_on_disconnect(
+    request: Request,
+    work: Awaitable[T],
+    check_interval: float = 0.5,
+) -> T:
+    """
+    Await `work`, cancelling it once the client has gone away.
+
+    Starlette keeps running an endpoint after its client disconnects, so a
+    closed browser tab would otherwise keep engine calls polling until
+    they finish. Cancellation reaches every awaited call inside `work`.
+    """
+
+    task = asyncio.ensure_future(work)
+
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=check_interval)
+            if done:
+                return task.result()
+
+            if await request.is_disconnected():
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+
+                metrics.inc("requests.client_disconnected")
+                raise HTTPException(
+                    status_code=CLIENT_CLOSED_REQUEST,
+                    detail="Client closed request",
+                )
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends
+
+from src.schemas.user_info import UserInfo
+from src.core.auth import require_operator
+from src.db.pool_metrics import pool_status
+from src.db.session import async_engine
+from src.logic.expense_classifier import classifier_tier_stats
+from src.logic.receipt_processor import engine_guards
+from src.settings import settings
+from src.utils.metrics import metrics
+
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+)
+
+
+@router.get("")
+def get_metrics(
+    user_info: UserInfo = Depends(require_operator),
+):
+    return metrics.snapshot()
+
+
+@router.get("/classifier")
+def get_classifier_metrics(
+    user_info: UserInfo = Depends(require_operator),
+):
+    return {
+        "tiers": classifier_tier_stats(),
+        "local_min_confidence": settings.CLASSIFIER_LOCAL_MIN_CONFIDENCE,
+        "local_escalated": metrics.get("classifier.local.escalated"),
+    }
+
+
+@router.get("/engines")
+def get_engine_metrics(
+    user_info: UserInfo = Depends(require_operator),
+):
+    return {engine.value: guard.stats() for engine, guard in engine_guards.items()}
+
+
+@router.get("/db")
+def get_db_metrics(
+    user_info: UserInfo = Depends(require_operator),
+):
+    hold = {
+        key.removeprefix("db.pool.hold_seconds."): value
+        for key, value in metrics.snapshot().items()
+        if key.startswith("db.pool.hold_seconds.")
+    }
+    return {**pool_status(async_engine.sync_engine), "hold_seconds": hold}
@@ -1,20 +1,25 @@
-from fastapi import APIRouter, UploadFile, File, Query, Depends
-from typing import Union, List
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, UploadFile, File, Header, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import date
+from typing import Optional, Union, List
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db.session import get_db
+from src.db.session import get_async_db
 from src.schemas.receipt import (
     ReceiptDetailSchema,
     ReceiptSchema,
     ReceiptAnalysisResponse,
     ReceiptCompareResponse,
-    ReceiptListSchema,
+    ReceiptListPage,
+    ReceiptBatchResponse,
 )
-from src.schemas.engine import Engine
-from src.schemas.user_info import UserInfo
-from src.core.auth import is_authorized
+from src.schemas.engine import CompareChoice, Engine
+from src.schemas.job import ReceiptJobAccepted, ReceiptJobStatusResponse
+from src.schemas.user_info import ResolvedUser
+from src.api.dependencies import get_current_user
+from src.api.disconnect import cancel_on_disconnect
 
-from src.logic import receipt_logic
+from src.logic import receipt_logic, receipt_jobs
 
 
 router = APIRouter(
@@ -24,69 +29,175 @@ router = APIRouter(
 
 @router.post("", response_model=Union[ReceiptAnalysisResponse, ReceiptCompareResponse])
 async def handle_receipt(
+    request: Request,
     file: UploadFile = File(...),
     method: Engine = Query(default=Engine.di),
-    db: Session = Depends(get_db),
-    user_info: UserInfo = Depends(is_authorized),
+    user: ResolvedUser = Depends(get_current_user),
 ):
 
-    return await receipt_logic.handle_receipt_logic(
+    # no request-scoped session: the pipeline opens one only to persist
+    return await cancel_on_disconnect(
+        request,
+        receipt_logic.handle_receipt_logic(
+            file=file,
+            method=method,
+            user_id=user.id,
+        ),
+    )
+
+
+@router.post("/stream")
+async def handle_receipt_stream(
+    file: UploadFile = File(...),
+    method: Engine = Query(default=Engine.di),
+    user: ResolvedUser = Depends(get_current_user),
+):
+    events = await receipt_logic.handle_receipt_stream_logic(
         file=file,
         method=method,
-        db=db,
-        user_info=user_info,
+        user_id=user.id,
+    )
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
-@router.get("", response_model=List[ReceiptListSchema])
-def list_receipts(
+@router.post("/batch", response_model=ReceiptBatchResponse)
+async def handle_receipt_batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    method: Engine = Query(default=Engine.di),
+    user: ResolvedUser = Depends(get_current_user),
+):
+
+    return await cancel_on_disconnect(
+        request,
+        receipt_logic.handle_receipt_batch_logic(
+            files=files,
+            method=method,
+            user_id=user.id,
+        ),
+    )
+
+
+@router.post("/compare/{comparison_id}/promote", response_model=ReceiptAnalysisResponse)
+async def promote_comparison(
+    comparison_id: int,
+    engine: CompareChoice = Query(...),
+    user: ResolvedUser = Depends(get_current_user),
+):
+
+    # sessions are opened only to read the comparison and persist
+    return await receipt_logic.promote_comparison_logic(
+        user_id=user.id,
+        comparison_id=comparison_id,
+        choice=engine,
+    )
+
+
+@router.post("/jobs", response_model=ReceiptJobAccepted, status_code=202)
+async def submit_receipt_job(
+    response: Response,
+    file: UploadFile = File(...),
+    method: Engine = Query(default=Engine.di),
+    user: ResolvedUser = Depends(get_current_user),
+):
+
+    accepted = await receipt_jobs.submit_receipt_job_logic(
+        file=file,
+        method=method,
+        user_id=user.id,
+    )
+
+    response.headers["Location"] = accepted.status_url
+    return accepted
+
+
+@router.get("/jobs/{job_id}", response_model=ReceiptJobStatusResponse)
+async def get_receipt_job(
+    job_id: str,
+    user: ResolvedUser = Depends(get_current_user),
+):
+    return await receipt_jobs.get_receipt_job_logic(
+        user_id=user.id,
+        job_id=job_id,
+    )
+
+
+@router.get("", response_model=ReceiptListPage)
+async def list_receipts(
     source: Engine | None = Query(default=None),
-    db: Session = Depends(get_db),
-    user_info: UserInfo = Depends(is_authorized),
+    limit: int = Query(default=50, ge=1),
+    cursor: Optional[str] = Query(default=None),
+    date_from: Optional[date] = Query(default=None),
+    date_to: Optional[date] = Query(default=None),
+    merchant: Optional[str] = Query(default=None, min_length=1),
+    currency: Optional[str] = Query(default=None, min_length=3, max_length=3),
+    db: AsyncSession = Depends(get_async_db),
+    user: ResolvedUser = Depends(get_current_user),
 ):
-    return receipt_logic.list_receipts_logic(
+    return await receipt_logic.list_receipts_logic(
         db=db,
-        user_info=user_info,
+        user_id=user.id,
         source=source,
+        limit=limit,
+        cursor=cursor,
+        date_from=date_from,
+        date_to=date_to,
+        merchant=merchant,
+        currency=currency,
     )
 
 
-@router.get("/{receipt_id}", response_model=ReceiptDetailSchema)
-def get_receipt(
+@router.get(
+    "/{receipt_id}",
+    response_model=ReceiptDetailSchema,
+    responses={304: {"description": "Not Modified"}},
+)
+async def get_receipt(
     receipt_id: int,
-    db: Session = Depends(get_db),
-    user_info: UserInfo = Depends(is_authorized),
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+    if_modified_since: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    user: ResolvedUser = Depends(get_current_user),
 ):
-    return receipt_logic.get_receipt_logic(
+    return await receipt_logic.get_receipt_logic(
         db=db,
-        user_info=user_info,
+        user_id=user.id,
         receipt_id=receipt_id,
+        response=response,
+        if_none_match=if_none_match,
+        if_modified_since=if_modified_since,
     )
 
 
 @router.put("/{receipt_id}", response_model=ReceiptSchema)
-def update_receipt_endpoint(
+async def update_receipt_endpoint(
     receipt_id: int,
     updated_data: ReceiptSchema,
-    db: Session = Depends(get_db),
-    user_info: UserInfo = Depends(is_authorized),
+    db: AsyncSession = Depends(get_async_db),
+    user: ResolvedUser = Depends(get_current_user),
 ):
-    return receipt_logic.update_receipt_logic(
+    return await receipt_logic.update_receipt_logic(
         db=db,
-        user_info=user_info,
+        user_id=user.id,
         receipt_id=receipt_id,
         updated_data=updated_data,
     )
 
 
 @router.delete("/{receipt_id}")
-def delete_receipt_endpoint(
+async def delete_receipt_endpoint(
     receipt_id: int,
-    db: Session = Depends(get_db),
-    user_info: UserInfo = Depends(is_authorized),
+    db: AsyncSession = Depends(get_async_db),
+    user: ResolvedUser = Depends(get_current_user),
 ):
-    return receipt_logic.delete_receipt_logic(
+    return await receipt_logic.delete_receipt_logic(
         db=db,
-        user_info=user_info,
+        user_id=user.id,
         receipt_id=receipt_id,
     )
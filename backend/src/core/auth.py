@@ -1,27 +1,153 @@
+import time
+import hashlib
+import logging
+from typing import Any, Dict, List
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt
 
+from src.settings import settings
+from src.core.jwks import JwksKeyCache
 from src.schemas.user_info import UserInfo
+from src.utils.ttl_cache import TTLCache
+
 
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
+MICROSOFT_JWKS_URL = "https://login.microsoftonline.com/{tenant}/discovery/v2.0/keys"
+
+# v2.0 and v1.0 access tokens carry different issuers
+MICROSOFT_ISSUERS = (
+    "https://login.microsoftonline.com/{tenant}/v2.0",
+    "https://sts.windows.net/{tenant}/",
+)
+
+
+class InvalidTokenError(Exception):
+    """Raised when a bearer token fails verification."""
+
+
+class TokenVerifier:
+    """
+    Verifies Entra ID access tokens: signature, audience, issuer and expiry.
+
+    Decoded claims are cached by token hash until the token expires, so a
+    client reusing its token pays for signature verification once.
+    """
+
+    def __init__(
+        self,
+        keys: JwksKeyCache,
+        audience: str,
+        issuers: List[str],
+        claims_cache_size: int,
+        leeway_seconds: int = 60,
+    ):
+        self._keys = keys
+        self._audience = audience
+        self._issuers = issuers
+        self._leeway = leeway_seconds
+        # per-entry ttl is the token's remaining lifetime
+        self._claims: TTLCache[Dict[str, Any]] = TTLCache(claims_cache_size, 0)
+
+    @property
+    def keys(self) -> JwksKeyCache:
+        return self._keys
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Return the verified claims of `token`.
+
+        Raises:
+            InvalidTokenError: If the token is malformed, signed by an
+                unknown key, expired, or issued for another audience.
+        """
+
+        digest = hashlib.sha256(token.encode()).hexdigest()
+
+        claims = self._claims.get(digest)
+        if claims is not None:
+            return claims
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except Exception as e:
+            raise InvalidTokenError("Malformed token") from e
+
+        kid = header.get("kid")
+        if not kid:
+            raise InvalidTokenError("Token has no key id")
+
+        key = await self._keys.get_key(kid)
+        if key is None:
+            raise InvalidTokenError(f"Unknown signing key {kid}")
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[key.get("alg", "RS256")],
+                audience=self._audience,
+                issuer=self._issuers,
+                options={"leeway": self._leeway, "require_exp": True},
+            )
+        except Exception as e:
+            raise InvalidTokenError(str(e)) from e
+
+        remaining = claims["exp"] - time.time()
+        if remaining > 0:
+            self._claims.set(digest, claims, ttl_seconds=remaining)
+
+        return claims
 
-def is_authorized(
+
+def _build_verifier() -> TokenVerifier:
+    tenant = settings.AUTH_TENANT_ID
+
+    issuers = (
+        [settings.AUTH_ISSUER]
+        if settings.AUTH_ISSUER
+        else [issuer.format(tenant=tenant) for issuer in MICROSOFT_ISSUERS]
+    )
+
+    keys = JwksKeyCache(
+        source=settings.AUTH_JWKS_URL or MICROSOFT_JWKS_URL.format(tenant=tenant),
+        refresh_seconds=settings.AUTH_JWKS_REFRESH_SECONDS,
+        min_refresh_seconds=settings.AUTH_JWKS_MIN_REFRESH_SECONDS,
+    )
+
+    return TokenVerifier(
+        keys=keys,
+        audience=settings.AUTH_AUDIENCE,
+        issuers=issuers,
+        claims_cache_size=settings.AUTH_CLAIMS_CACHE_MAX_ENTRIES,
+    )
+
+
+token_verifier = _build_verifier()
+
+
+async def is_authorized(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> UserInfo:
     """
-    Extracts user information from Microsoft access token.
+    Extracts user information from a verified Microsoft access token.
     """
 
     token = credentials.credentials
 
     try:
-        decoded = jwt.get_unverified_claims(token)
+        decoded = await token_verifier.verify(token)
 
         user_id = decoded.get("oid")
-        email = decoded.get("preferred_username") or decoded.get("upn")
+        email = (
+            decoded.get("preferred_username")
+            or decoded.get("upn")
+            or decoded.get("unique_name")
+        )
         name = decoded.get("name")
 
         if not user_id or not email:
@@ -34,6 +160,14 @@ def is_authorized(
             user_id=user_id,
             email=email,
             name=name,
+            roles=decoded.get("roles") or [],
+        )
+
+    except InvalidTokenError as e:
+        logger.info("Rejected access token: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
         )
 
     except Exception:
@@ -42,3 +176,19 @@ def is_authorized(
             detail="Invalid token",
         )
 
+
+async def require_operator(
+    user_info: UserInfo = Depends(is_authorized),
+) -> UserInfo:
+    """
+    Allows only callers holding the `AUTH_OPERATOR_ROLE` app role
+    (operational endpoints such as /api/metrics).
+    """
+
+    if settings.AUTH_OPERATOR_ROLE not in user_info.roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Operator role required",
+        )
+
+    return user_info
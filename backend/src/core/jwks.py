@@ -0,0 +1,127 @@
+import json
+import time
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+
+JsonWebKey = Dict[str, Any]
+
+# refetches never run more often than this, whatever the settings say
+MIN_REFRESH_FLOOR_SECONDS = 1.0
+
+
+class JwksKeyCache:
+    """
+    In-memory cache of token signing keys (JWKS).
+
+    Responsibilities:
+        • Load the key set once and serve keys by `kid` from memory
+        • Refresh the whole set periodically in the background
+        • Refetch early when a token names an unknown `kid` (key rotation),
+          at most once per `min_refresh_seconds` so bogus tokens cannot
+          turn into a request flood against the identity provider
+
+    The source may be an https URL or a local JSON file (`file://...` or a
+    plain path), which keeps verification testable with a generated key set.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        refresh_seconds: float,
+        min_refresh_seconds: float,
+    ):
+        self._source = source
+        self._refresh_seconds = refresh_seconds
+        self._min_refresh_seconds = max(min_refresh_seconds, MIN_REFRESH_FLOOR_SECONDS)
+
+        self._keys: Dict[str, JsonWebKey] = {}
+        # last fetch, successful or not; spaces out refetches either way
+        self._last_attempt: Optional[float] = None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ----- internal helpers -----
+
+    async def _fetch(self) -> Dict[str, Any]:
+        if self._source.startswith(("https://", "http://")):
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.get(self._source)
+                response.raise_for_status()
+                return response.json()
+
+        path = Path(self._source.removeprefix("file://"))
+        return json.loads(await asyncio.to_thread(path.read_text))
+
+    async def _refresh(self) -> None:
+        document = await self._fetch()
+
+        keys = {key["kid"]: key for key in document.get("keys", []) if "kid" in key}
+        if not keys:
+            raise ValueError(f"JWKS at {self._source} contains no keys")
+
+        self._keys = keys
+        logger.info("Loaded %d signing keys from %s", len(keys), self._source)
+
+    async def _refresh_if_stale(self, min_age: float) -> None:
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+
+        async with self._refresh_lock:
+            # another caller may have refreshed while we waited for the lock
+            if (
+                self._last_attempt is not None
+                and time.monotonic() - self._last_attempt < min_age
+            ):
+                return
+
+            # a failed fetch backs off too: the old keys (if any) stay in use,
+            # and an unreachable source is not retried on every request
+            self._last_attempt = time.monotonic()
+            try:
+                await self._refresh()
+            except Exception:
+                logger.warning("JWKS refresh from %s failed", self._source, exc_info=True)
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._refresh_seconds)
+            await self._refresh_if_stale(self._min_refresh_seconds)
+
+    # ----- public operations -----
+
+    async def start(self) -> None:
+        """
+        Load the key set, then start periodic background refresh on the
+        running event loop. A failed first load is logged, not raised;
+        the first token retries it after `min_refresh_seconds`.
+        """
+        if self._task is None:
+            await self._refresh_if_stale(self._min_refresh_seconds)
+            self._task = asyncio.create_task(self._refresh_loop(), name="jwks-refresh")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def get_key(self, kid: str) -> Optional[JsonWebKey]:
+        """
+        Return the signing key for `kid`, refetching the set if it is unknown.
+        """
+
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        await self._refresh_if_stale(self._min_refresh_seconds)
+
+        return self._keys.get(kid)
@@ -0,0 +1,104 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.analysis_cache import ReceiptAnalysisCacheEntry
+
+
+async def get_cache_entry(
+    db: AsyncSession,
+    content_hash: str,
+    engine: str,
+    created_after: Optional[datetime] = None,
+) -> Optional[ReceiptAnalysisCacheEntry]:
+    """
+    The cached analysis for (content_hash, engine). With `created_after`,
+    an entry stored before it counts as expired and is not returned.
+    """
+
+    query = select(ReceiptAnalysisCacheEntry).where(
+        ReceiptAnalysisCacheEntry.content_hash == content_hash,
+        ReceiptAnalysisCacheEntry.engine == engine,
+    )
+    if created_after is not None:
+        query = query.where(ReceiptAnalysisCacheEntry.created_at >= created_after)
+
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
+async def record_cache_hit(
+    db: AsyncSession,
+    entry: ReceiptAnalysisCacheEntry,
+) -> None:
+    entry.hit_count = (entry.hit_count or 0) + 1
+    entry.last_hit_at = datetime.utcnow()
+    await db.commit()
+
+
+async def save_cache_entry(
+    db: AsyncSession,
+    content_hash: str,
+    engine: str,
+    analysis_json: str,
+    blob_name: str,
+    blob_url: str,
+    replace: bool = True,
+    created_after: Optional[datetime] = None,
+) -> None:
+    """
+    Insert or update the cached analysis for (content_hash, engine).
+
+    With `replace=False` a live entry is left untouched; an entry stored
+    before `created_after` is expired and always overwritten. A
+    concurrent insert of the same key is not an error — the first
+    writer wins.
+    """
+
+    entry = await get_cache_entry(db, content_hash, engine)
+
+    if entry:
+        if created_after is not None and entry.created_at < created_after:
+            # a fresh analysis in place of the expired one
+            entry.analysis = analysis_json
+            entry.blob_name = blob_name
+            entry.blob_url = blob_url
+            entry.created_at = datetime.utcnow()
+            await db.commit()
+        elif replace:
+            entry.analysis = analysis_json
+            await db.commit()
+        return
+
+    db.add(
+        ReceiptAnalysisCacheEntry(
+            content_hash=content_hash,
+            engine=engine,
+            analysis=analysis_json,
+            blob_name=blob_name,
+            blob_url=blob_url,
+            hit_count=0,
+        )
+    )
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+
+
+async def delete_expired_entries(
+    db: AsyncSession,
+    created_before: datetime,
+) -> int:
+    """Delete cache entries stored before `created_before`. Returns the count."""
+
+    result = await db.execute(
+        delete(ReceiptAnalysisCacheEntry).where(
+            ReceiptAnalysisCacheEntry.created_at < created_before
+        )
+    )
+    await db.commit()
+    return result.rowcount
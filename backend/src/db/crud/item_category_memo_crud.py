@@ -0,0 +1,72 @@
+from typing import Dict, Iterable, Tuple
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.item_category_memo import ItemCategoryMemo
+
+
+MemoKey = Tuple[str, str]  # (normalized item name, normalized merchant or "")
+
+
+async def get_memo_categories(
+    db: AsyncSession,
+    keys: Iterable[MemoKey],
+) -> Dict[MemoKey, str]:
+    keys = list(set(keys))
+    if not keys:
+        return {}
+
+    names = {name for name, _ in keys}
+    merchants = {merchant for _, merchant in keys}
+
+    result = await db.execute(
+        select(
+            ItemCategoryMemo.item_name,
+            ItemCategoryMemo.merchant,
+            ItemCategoryMemo.category,
+        ).where(
+            ItemCategoryMemo.item_name.in_(names),
+            ItemCategoryMemo.merchant.in_(merchants),
+        )
+    )
+
+    wanted = set(keys)
+    return {
+        (name, merchant): category
+        for name, merchant, category in result.all()
+        if (name, merchant) in wanted
+    }
+
+
+async def save_memo_categories(
+    db: AsyncSession,
+    entries: Dict[MemoKey, str],
+) -> None:
+    """
+    Insert memo entries that do not exist yet. Existing entries win, and a
+    concurrent insert of the same key is skipped.
+    """
+
+    if not entries:
+        return
+
+    existing = await get_memo_categories(db, entries.keys())
+
+    for (name, merchant), category in entries.items():
+        if (name, merchant) in existing:
+            continue
+
+        try:
+            async with db.begin_nested():
+                db.add(
+                    ItemCategoryMemo(
+                        item_name=name,
+                        merchant=merchant,
+                        category=category,
+                    )
+                )
+        except IntegrityError:
+            continue
+
+    await db.commit()
@@ -0,0 +1,62 @@
+from typing import Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.merchant_engine_stats import MerchantEngineStats
+
+
+async def get_merchant_engine_stats(
+    db: AsyncSession,
+    merchant: str,
+) -> Optional[Tuple[int, int]]:
+    """(comparisons, DI disagreements) for a normalized merchant name."""
+
+    result = await db.execute(
+        select(
+            MerchantEngineStats.comparisons,
+            MerchantEngineStats.di_disagreements,
+        ).where(MerchantEngineStats.merchant == merchant)
+    )
+    row = result.first()
+    return (row[0], row[1]) if row else None
+
+
+async def record_engine_comparison(
+    db: AsyncSession,
+    merchant: str,
+    di_disagreed: bool,
+) -> None:
+    disagreement = 1 if di_disagreed else 0
+
+    updated = await db.execute(
+        update(MerchantEngineStats)
+        .where(MerchantEngineStats.merchant == merchant)
+        .values(
+            comparisons=MerchantEngineStats.comparisons + 1,
+            di_disagreements=MerchantEngineStats.di_disagreements + disagreement,
+        )
+    )
+
+    if updated.rowcount == 0:
+        try:
+            async with db.begin_nested():
+                db.add(
+                    MerchantEngineStats(
+                        merchant=merchant,
+                        comparisons=1,
+                        di_disagreements=disagreement,
+                    )
+                )
+        except IntegrityError:
+            # inserted concurrently; count this comparison on top of it
+            await db.execute(
+                update(MerchantEngineStats)
+                .where(MerchantEngineStats.merchant == merchant)
+                .values(
+                    comparisons=MerchantEngineStats.comparisons + 1,
+                    di_disagreements=MerchantEngineStats.di_disagreements + disagreement,
+                )
+            )
+
+    await db.commit()
@@ -0,0 +1,85 @@
+from typing import List, Optional, Sequence, Tuple
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.receipt_comparison import ReceiptComparison
+from src.db.crud.receipt_raw_output_crud import RawOutputs, compress_payload
+from src.schemas.receipt import ReceiptCompareAnalysis
+
+
+async def save_comparisons(
+    db: AsyncSession,
+    entries: Sequence[Tuple[ReceiptCompareAnalysis, str, str, Optional[RawOutputs]]],
+    user_id: int,
+) -> List[int]:
+    """
+    Persist compare results in a single transaction.
+
+    Args:
+        entries: (analysis, blob_name, blob_url, raw outputs) tuples.
+
+    Returns:
+        The new comparison IDs, in the same order as `entries`.
+    """
+
+    comparisons = [
+        ReceiptComparison(
+            user_id=user_id,
+            blob_name=blob_name,
+            blob_url=blob_url,
+            analysis=analysis.model_dump_json(),
+            raw_outputs=compress_payload(raw_outputs) if raw_outputs else None,
+        )
+        for analysis, blob_name, blob_url, raw_outputs in entries
+    ]
+
+    try:
+        db.add_all(comparisons)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    return [comparison.id for comparison in comparisons]
+
+
+async def get_comparison_for_user(
+    db: AsyncSession,
+    comparison_id: int,
+    user_id: int,
+) -> ReceiptComparison:
+    """
+    Load a compare result, or raise 404 if it does not belong to the user.
+    """
+
+    comparison = await db.get(ReceiptComparison, comparison_id)
+
+    if comparison is None or comparison.user_id != user_id:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Comparison with id={comparison_id} not found",
+        )
+
+    return comparison
+
+
+async def claim_comparison(
+    db: AsyncSession,
+    comparison_id: int,
+    receipt_id: int,
+) -> bool:
+    """
+    Link a comparison to the receipt created from it, inside the caller's
+    transaction. False when another receipt already claimed it.
+    """
+
+    result = await db.execute(
+        update(ReceiptComparison)
+        .where(
+            ReceiptComparison.id == comparison_id,
+            ReceiptComparison.receipt_id.is_(None),
+        )
+        .values(receipt_id=receipt_id)
+    )
+    return result.rowcount == 1
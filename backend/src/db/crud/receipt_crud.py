@@ -1,25 +1,34 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from datetime import date, datetime
+from sqlalchemy import Row, and_, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from src.db.models.receipt import Receipt, ReceiptItem
 from src.schemas.receipt import ReceiptDetailSchema, ReceiptSchema
+from src.schemas.receipt import ReceiptItem as ReceiptItemSchema
 from typing import List
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import HTTPException
 from src.schemas.engine import Engine
 from src.schemas.receipt import ReceiptSchema
+from src.db.crud.spending_aggregate_crud import (
+    apply_deltas,
+    merge_deltas,
+    receipt_deltas,
+)
+from src.db.crud.receipt_raw_output_crud import RawOutputs, insert_raw_outputs
 
 
-def save_receipt(
-    db: Session,
+def build_receipt(
     receipt_data: ReceiptSchema,
     user_id: int,
     blob_url: str,
 ) -> Receipt:
     """
-    Persist a normalized receipt and its items into the database.
+    Build (but do not add) a Receipt ORM object, without its items.
     """
 
-    receipt = Receipt(
+    return Receipt(
         merchant=receipt_data.merchant,
         total=receipt_data.total,
         currency=receipt_data.currency,
@@ -29,42 +38,155 @@ def save_receipt(
         blob_url=blob_url,
     )
 
-    if receipt_data.items:
-        for item in receipt_data.items:
-            receipt.items.append(
-                ReceiptItem(
-                    name=item.name,
-                    quantity=item.quantity,
-                    price=item.price,
-                    category=getattr(item, "category", None),
-                    category_source="llm" if getattr(item, "category", None) else None,
-                )
-            )
+
+def item_category_values(item: ReceiptItemSchema, now: datetime) -> Dict[str, Any]:
+    return {
+        "category": item.category,
+        "category_source": item.category_source or ("llm" if item.category else None),
+        "category_confidence": item.category_confidence,
+        "categorized_at": now if item.category else None,
+    }
+
+
+def item_values(receipt_id: int, item: ReceiptItemSchema, now: datetime) -> Dict[str, Any]:
+    return {
+        "receipt_id": receipt_id,
+        "name": item.name,
+        "quantity": item.quantity,
+        "price": item.price,
+        **item_category_values(item, now),
+    }
+
+
+async def insert_items(
+    db: AsyncSession,
+    receipts: Sequence[Tuple[Receipt, ReceiptSchema]],
+) -> None:
+    """
+    Insert the items of already-flushed receipts in one bulk statement.
+
+    A single executemany (batched by insertmanyvalues) instead of one
+    unit-of-work INSERT ... RETURNING per item; item ids are not fetched.
+    Each receipt's `items` is set to in-memory copies so aggregates can
+    be computed without reloading.
+    """
+
+    now = datetime.utcnow()
+    rows: List[Dict[str, Any]] = []
+
+    for receipt, receipt_data in receipts:
+        values = [item_values(receipt.id, item, now) for item in receipt_data.items or []]
+        rows.extend(values)
+        set_committed_value(receipt, "items", [ReceiptItem(**row) for row in values])
+
+    if rows:
+        await db.execute(insert(ReceiptItem), rows)
+
+
+async def add_receipt(
+    db: AsyncSession,
+    receipt_data: ReceiptSchema,
+    user_id: int,
+    blob_url: str,
+    raw_outputs: Optional[RawOutputs] = None,
+) -> Receipt:
+    """
+    Insert a normalized receipt, its items and the engines' raw outputs
+    (when given) inside the caller's transaction. The caller commits.
+    """
+
+    receipt = build_receipt(receipt_data, user_id, blob_url)
 
     db.add(receipt)
-    db.commit()
-    db.refresh(receipt)
+    await db.flush()
+    await insert_items(db, [(receipt, receipt_data)])
+    if raw_outputs:
+        await insert_raw_outputs(db, [(receipt.id, raw_outputs)])
+    await apply_deltas(db, user_id, receipt_deltas([receipt]))
+
+    return receipt
+
+
+async def save_receipt(
+    db: AsyncSession,
+    receipt_data: ReceiptSchema,
+    user_id: int,
+    blob_url: str,
+    raw_outputs: Optional[RawOutputs] = None,
+) -> Receipt:
+    """
+    Persist a normalized receipt and its items into the database,
+    with the engines' raw outputs when given.
+    """
+
+    receipt = await add_receipt(db, receipt_data, user_id, blob_url, raw_outputs)
+    await db.commit()
 
     return receipt
 
 
-def read_receipt_by_id_for_user(
-    db: Session,
+async def save_receipts(
+    db: AsyncSession,
+    entries: List[Tuple[ReceiptSchema, str]],
+    user_id: int,
+    raw_outputs: Optional[Sequence[Optional[RawOutputs]]] = None,
+) -> List[int]:
+    """
+    Persist many normalized receipts in a single transaction.
+
+    Args:
+        entries: (receipt_data, blob_url) pairs.
+        raw_outputs: the engines' raw outputs, in the same order as `entries`.
+
+    Returns:
+        The new receipt IDs, in the same order as `entries`.
+        Either every receipt is saved or none is.
+    """
+
+    receipts = [
+        build_receipt(receipt_data, user_id, blob_url)
+        for receipt_data, blob_url in entries
+    ]
+
+    try:
+        db.add_all(receipts)
+        await db.flush()
+        await insert_items(
+            db,
+            [(receipt, receipt_data) for receipt, (receipt_data, _) in zip(receipts, entries)],
+        )
+        if raw_outputs:
+            await insert_raw_outputs(
+                db,
+                [(receipt.id, raw) for receipt, raw in zip(receipts, raw_outputs) if raw],
+            )
+        await apply_deltas(db, user_id, receipt_deltas(receipts))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    return [receipt.id for receipt in receipts]
+
+
+async def get_receipt_for_user(
+    db: AsyncSession,
     receipt_id: int,
     user_id: int,
-) -> ReceiptSchema:
+) -> Receipt:
     """
-    Return a single receipt by ID if it belongs to the user.
+    Load a receipt with its items, or raise 404 if it does not belong to the user.
     """
 
-    receipt = (
-        db.query(Receipt)
-        .filter(
+    result = await db.execute(
+        select(Receipt)
+        .options(selectinload(Receipt.items))
+        .where(
             Receipt.id == receipt_id,
             Receipt.user_id == user_id,
         )
-        .first()
     )
+    receipt = result.scalars().first()
 
     if not receipt:
         raise HTTPException(
@@ -72,75 +194,226 @@ def read_receipt_by_id_for_user(
             detail=f"Receipt with id={receipt_id} not found",
         )
 
-    return ReceiptDetailSchema.model_validate(receipt)
+    return receipt
 
 
-def get_receipts_by_user(
-    db: Session,
+async def get_receipt_version(
+    db: AsyncSession,
+    receipt_id: int,
     user_id: int,
-) -> List[Receipt]:
-    return (
-        db.query(Receipt)
-        .filter(Receipt.user_id == user_id)
-        .order_by(Receipt.created_at.desc())
-        .all()
-    )
+) -> Tuple[int, datetime]:
+    """
+    (version, updated_at) of a receipt, or 404 if it does not belong to the user.
+
+    Reads only the receipt row, so conditional GETs can be answered
+    without loading items.
+    """
+
+    row = (
+        await db.execute(
+            select(Receipt.version, Receipt.updated_at).where(
+                Receipt.id == receipt_id,
+                Receipt.user_id == user_id,
+            )
+        )
+    ).first()
+
+    if row is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Receipt with id={receipt_id} not found",
+        )
+
+    return row.version, row.updated_at
 
 
-def read_receipts_by_user(
-    db: Session,
+async def read_receipt_by_id_for_user(
+    db: AsyncSession,
+    receipt_id: int,
     user_id: int,
-) -> List[ReceiptSchema]:
-    receipts = get_receipts_by_user(db, user_id)
-    return [ReceiptSchema.model_validate(r) for r in receipts]
+) -> ReceiptSchema:
+    """
+    Return a single receipt by ID if it belongs to the user.
+    """
+
+    receipt = await get_receipt_for_user(db, receipt_id, user_id)
+
+    return ReceiptDetailSchema.model_validate(receipt)
+
 
+RECEIPT_LIST_COLUMNS = (
+    Receipt.id,
+    Receipt.merchant,
+    Receipt.total,
+    Receipt.currency,
+    Receipt.transaction_date,
+    Receipt.source,
+    Receipt.created_at,
+)
 
-def get_receipts_by_user_and_source(
-    db: Session,
+
+async def list_receipts_page(
+    db: AsyncSession,
     user_id: int,
-    source: str,
-) -> List[Receipt]:
-    return (
-        db.query(Receipt)
-        .filter(
-            Receipt.user_id == user_id,
-            Receipt.source == source,
+    limit: int,
+    after: Optional[Tuple[datetime, int]] = None,
+    source: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    merchant: Optional[str] = None,
+    currency: Optional[str] = None,
+) -> List[Row]:
+    """
+    Return up to `limit` receipt list rows, newest first.
+
+    Keyset pagination on (created_at, id): `after` is the last row of the
+    previous page, so each page is an index seek on
+    `ix_receipts_user_created` instead of an OFFSET scan. Only the list
+    columns are selected.
+    """
+
+    query = select(*RECEIPT_LIST_COLUMNS).where(Receipt.user_id == user_id)
+
+    if after is not None:
+        created_at, receipt_id = after
+        # expanded row-value comparison; SQL Server has no (a, b) < (x, y)
+        query = query.where(
+            or_(
+                Receipt.created_at < created_at,
+                and_(Receipt.created_at == created_at, Receipt.id < receipt_id),
+            )
         )
-        .order_by(Receipt.created_at.desc())
-        .all()
-    )
 
+    if source:
+        query = query.where(Receipt.source == source)
 
-def read_receipts_by_user_and_source(
-    db: Session,
-    user_id: int,
-    source: str,
-) -> List[ReceiptSchema]:
-    receipts = get_receipts_by_user_and_source(db, user_id, source)
-    return [ReceiptSchema.model_validate(r) for r in receipts]
+    if date_from:
+        query = query.where(Receipt.transaction_date >= date_from)
 
+    if date_to:
+        query = query.where(Receipt.transaction_date <= date_to)
 
-def update_receipt(
-    db: Session,
-    receipt_id: int,
-    user_id: int,
-    updated_data: ReceiptSchema,
-) -> Receipt:
+    if merchant:
+        query = query.where(Receipt.merchant.startswith(merchant, autoescape=True))
+
+    if currency:
+        query = query.where(Receipt.currency == currency)
+
+    query = query.order_by(Receipt.created_at.desc(), Receipt.id.desc()).limit(limit)
+
+    result = await db.execute(query)
+    return list(result.all())
+
+
+async def get_labelled_items(
+    db: AsyncSession,
+    category_source: str,
+    limit: int,
+) -> List[Tuple[str, Optional[str], str]]:
     """
-    Update a receipt if it belongs to the user.
+    Most recent (item name, merchant, category) rows labelled by `category_source`.
     """
 
-    receipt = (
-        db.query(Receipt)
-        .filter(Receipt.id == receipt_id, Receipt.user_id == user_id)
-        .first()
+    result = await db.execute(
+        select(ReceiptItem.name, Receipt.merchant, ReceiptItem.category)
+        .join(Receipt)
+        .where(
+            ReceiptItem.category_source == category_source,
+            ReceiptItem.category.is_not(None),
+            ReceiptItem.name.is_not(None),
+        )
+        .order_by(ReceiptItem.id.desc())
+        .limit(limit)
     )
+    return [tuple(row) for row in result.all()]  # type: ignore[misc]
 
-    if not receipt:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Receipt with id={receipt_id} not found",
+
+async def get_merchant_currency(
+    db: AsyncSession,
+    merchant: str,
+) -> Optional[str]:
+    """
+    Most frequent currency among earlier receipts from this merchant.
+    """
+
+    return await db.scalar(
+        select(Receipt.currency)
+        .where(Receipt.merchant == merchant, Receipt.currency.is_not(None))
+        .group_by(Receipt.currency)
+        .order_by(func.count().desc())
+        .limit(1)
+    )
+
+
+def match_items(
+    existing: List[ReceiptItem],
+    incoming: List[ReceiptItemSchema],
+) -> List[Optional[ReceiptItem]]:
+    """
+    Pair each incoming item with the row it edits, or None for a new item.
+
+    Items are matched by `id`; an item without one (or with an id of
+    another receipt) is new. Clients that send no ids at all are matched
+    by position. Rows left unmatched were removed.
+    """
+
+    if all(item.id is None for item in incoming):
+        return [
+            existing[index] if index < len(existing) else None
+            for index in range(len(incoming))
+        ]
+
+    by_id = {row.id: row for row in existing}
+    return [by_id.pop(item.id, None) if item.id is not None else None for item in incoming]
+
+
+def apply_item_changes(
+    row: ReceiptItem,
+    item: ReceiptItemSchema,
+    now: datetime,
+) -> None:
+    """
+    Copy only the changed values onto an existing row, so the flush
+    updates only changed rows and columns. The category values are
+    replaced only by a different, non-empty category or when
+    `clear_category` is set; a missing or unchanged category keeps the
+    stored category, source, confidence and `categorized_at`.
+    """
+
+    values: Dict[str, Any] = {
+        "name": item.name,
+        "quantity": item.quantity,
+        "price": item.price,
+    }
+    if item.clear_category:
+        values.update(
+            category=None,
+            category_source=None,
+            category_confidence=None,
+            categorized_at=None,
         )
+    elif item.category is not None and item.category != row.category:
+        values.update(item_category_values(item, now))
+
+    for column, value in values.items():
+        if getattr(row, column) != value:
+            setattr(row, column, value)
+
+
+def assign_receipt_data(
+    db: AsyncSession,
+    receipt: Receipt,
+    updated_data: ReceiptSchema,
+) -> bool:
+    """
+    Copy `updated_data` onto a loaded receipt (items included) without
+    flushing. Returns whether anything changed.
+
+    Items are diffed against the stored rows (see `match_items`): editing
+    one line of a long receipt updates one row instead of deleting and
+    re-inserting all of them. When anything changed, `version` and
+    `updated_at` are bumped (the detail endpoint's ETag/Last-Modified).
+    """
 
     receipt.merchant = updated_data.merchant
     receipt.total = updated_data.total
@@ -148,28 +421,58 @@ def update_receipt(
     receipt.transaction_date = updated_data.transaction_date
     receipt.source = updated_data.source
 
-    receipt.items.clear()
-
-    if updated_data.items:
-        for item in updated_data.items:
-            receipt.items.append(
-                ReceiptItem(
-                    name=item.name,
-                    quantity=item.quantity,
-                    price=item.price,
-                    category=getattr(item, "category", None),
-                    category_source="llm" if getattr(item, "category", None) else None,
-                )
-            )
+    now = datetime.utcnow()
+    incoming = updated_data.items or []
+    existing = sorted(receipt.items, key=lambda row: row.id)
+
+    items: List[ReceiptItem] = []
+    for item, row in zip(incoming, match_items(existing, incoming)):
+        if row is None:
+            row = ReceiptItem(**item_values(receipt.id, item, now))
+        else:
+            apply_item_changes(row, item, now)
+        items.append(row)
+
+    # rows no longer listed are deleted (delete-orphan)
+    receipt.items = items
+
+    changed = db.is_modified(receipt) or any(db.is_modified(row) for row in items)
+    if changed:
+        receipt.version += 1
+        receipt.updated_at = now
+
+    return changed
 
-    db.commit()
-    db.refresh(receipt)
+
+async def update_receipt(
+    db: AsyncSession,
+    receipt_id: int,
+    user_id: int,
+    updated_data: ReceiptSchema,
+) -> Receipt:
+    """
+    Update a receipt if it belongs to the user (see `assign_receipt_data`).
+    A change marks the receipt as edited (`edited_at`).
+    """
+
+    receipt = await get_receipt_for_user(db, receipt_id, user_id)
+
+    removed = receipt_deltas([receipt], sign=-1)
+    if assign_receipt_data(db, receipt, updated_data):
+        receipt.edited_at = receipt.updated_at
+
+    await apply_deltas(
+        db,
+        user_id,
+        merge_deltas(removed, receipt_deltas([receipt])),
+    )
+    await db.commit()
 
     return receipt
 
 
-def delete_receipt(
-    db: Session,
+async def delete_receipt(
+    db: AsyncSession,
     receipt_id: int,
     user_id: int,
 ) -> None:
@@ -177,17 +480,8 @@ def delete_receipt(
     Delete a receipt if it belongs to the user.
     """
 
-    receipt = (
-        db.query(Receipt)
-        .filter(Receipt.id == receipt_id, Receipt.user_id == user_id)
-        .first()
-    )
-
-    if not receipt:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Receipt with id={receipt_id} not found",
-        )
+    receipt = await get_receipt_for_user(db, receipt_id, user_id)
 
-    db.delete(receipt)
-    db.commit()
+    await apply_deltas(db, user_id, receipt_deltas([receipt], sign=-1))
+    await db.delete(receipt)
+    await db.commit()
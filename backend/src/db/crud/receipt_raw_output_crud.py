@@ -0,0 +1,71 @@
+import gzip
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.receipt_raw_output import ReceiptRawOutput
+
+
+# raw outputs per engine name, e.g. {"di": {...}, "openai": {...}}
+RawOutputs = Dict[str, Any]
+
+
+def compress_payload(payload: Any) -> bytes:
+    return gzip.compress(
+        json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8"),
+        compresslevel=6,
+    )
+
+
+def decompress_payload(data: bytes) -> Any:
+    return json.loads(gzip.decompress(data))
+
+
+async def insert_raw_outputs(
+    db: AsyncSession,
+    entries: Sequence[Tuple[int, RawOutputs]],
+) -> None:
+    """
+    Store the raw outputs of already-flushed receipts in one bulk
+    statement, inside the caller's transaction. The caller commits.
+
+    Args:
+        entries: (receipt_id, raw outputs) pairs.
+    """
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "receipt_id": receipt_id,
+            "engine": engine,
+            "payload": compress_payload(payload),
+            "created_at": now,
+        }
+        for receipt_id, outputs in entries
+        for engine, payload in outputs.items()
+    ]
+
+    if rows:
+        await db.execute(insert(ReceiptRawOutput), rows)
+
+
+async def get_raw_outputs(
+    db: AsyncSession,
+    receipt_ids: List[int],
+) -> Dict[int, RawOutputs]:
+    """Decompressed raw outputs of the given receipts, by receipt id."""
+
+    result = await db.execute(
+        select(
+            ReceiptRawOutput.receipt_id,
+            ReceiptRawOutput.engine,
+            ReceiptRawOutput.payload,
+        ).where(ReceiptRawOutput.receipt_id.in_(receipt_ids))
+    )
+
+    outputs: Dict[int, RawOutputs] = {}
+    for receipt_id, engine, payload in result.all():
+        outputs.setdefault(receipt_id, {})[engine] = decompress_payload(payload)
+    return outputs
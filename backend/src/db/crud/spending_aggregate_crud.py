@@ -0,0 +1,163 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.receipt import Receipt
+from src.db.models.spending_aggregate import SpendingAggregate
+
+
+UNCATEGORIZED = "Uncategorized"
+
+# (period, category) → (amount, entry count)
+AggregateKey = Tuple[Optional[date], Optional[str]]
+AggregateDeltas = Dict[AggregateKey, Tuple[float, int]]
+
+
+def month_start(value: Optional[date]) -> Optional[date]:
+    return value.replace(day=1) if value else None
+
+
+def receipt_deltas(receipts: Iterable[Receipt], sign: int = 1) -> AggregateDeltas:
+    """
+    What the given receipts add to (sign=1) or remove from (sign=-1) the
+    aggregates. Receipts must have their items loaded.
+    """
+
+    deltas: Dict[AggregateKey, List[float]] = defaultdict(lambda: [0.0, 0])
+
+    for receipt in receipts:
+        period = month_start(receipt.transaction_date)
+
+        rollup = deltas[(period, None)]
+        rollup[0] += sign * (receipt.total or 0)
+        rollup[1] += sign
+
+        for item in receipt.items:
+            entry = deltas[(period, item.category or UNCATEGORIZED)]
+            entry[0] += sign * (item.price or 0)
+            entry[1] += sign
+
+    return {key: (amount, count) for key, (amount, count) in deltas.items()}
+
+
+def merge_deltas(*parts: AggregateDeltas) -> AggregateDeltas:
+    merged: Dict[AggregateKey, List[float]] = defaultdict(lambda: [0.0, 0])
+
+    for part in parts:
+        for key, (amount, count) in part.items():
+            merged[key][0] += amount
+            merged[key][1] += count
+
+    return {
+        key: (amount, count)
+        for key, (amount, count) in merged.items()
+        if amount or count
+    }
+
+
+def _key_filter(user_id: int, period: Optional[date], category: Optional[str]):
+    # NULL-safe equality: `period = NULL` would never match
+    return and_(
+        SpendingAggregate.user_id == user_id,
+        SpendingAggregate.period.is_(None) if period is None else SpendingAggregate.period == period,
+        SpendingAggregate.category.is_(None) if category is None else SpendingAggregate.category == category,
+    )
+
+
+async def _add_to_row(
+    db: AsyncSession,
+    user_id: int,
+    period: Optional[date],
+    category: Optional[str],
+    amount: float,
+    count: int,
+) -> int:
+    result = await db.execute(
+        update(SpendingAggregate)
+        .where(_key_filter(user_id, period, category))
+        .values(
+            total=SpendingAggregate.total + amount,
+            entry_count=SpendingAggregate.entry_count + count,
+        )
+    )
+    return result.rowcount
+
+
+async def apply_deltas(
+    db: AsyncSession,
+    user_id: int,
+    deltas: AggregateDeltas,
+) -> None:
+    """
+    Add deltas to the user's aggregate rows inside the caller's transaction.
+
+    Each key is an UPDATE, falling back to an INSERT when the row does not
+    exist yet. The INSERT runs in a savepoint, so losing a race against a
+    concurrent first insert just retries the UPDATE. Rows whose entry
+    count drops to zero are removed. The caller commits.
+    """
+
+    # fixed key order so concurrent writers lock rows in the same sequence
+    for (period, category), (amount, count) in sorted(
+        deltas.items(), key=lambda kv: (str(kv[0][0]), kv[0][1] or "")
+    ):
+        if await _add_to_row(db, user_id, period, category, amount, count):
+            continue
+
+        if count <= 0:
+            # nothing to remove from — the row was never materialized
+            continue
+
+        try:
+            async with db.begin_nested():
+                await db.execute(
+                    insert(SpendingAggregate).values(
+                        user_id=user_id,
+                        period=period,
+                        category=category,
+                        total=amount,
+                        entry_count=count,
+                    )
+                )
+        except IntegrityError:
+            await _add_to_row(db, user_id, period, category, amount, count)
+
+    await db.execute(
+        delete(SpendingAggregate).where(
+            SpendingAggregate.user_id == user_id,
+            SpendingAggregate.entry_count <= 0,
+        )
+    )
+
+
+async def replace_user_aggregates(
+    db: AsyncSession,
+    user_id: int,
+    deltas: AggregateDeltas,
+) -> None:
+    """
+    Overwrite all aggregate rows of a user (used by the rebuild command).
+    """
+
+    await db.execute(
+        delete(SpendingAggregate).where(SpendingAggregate.user_id == user_id)
+    )
+
+    rows = [
+        {
+            "user_id": user_id,
+            "period": period,
+            "category": category,
+            "total": amount,
+            "entry_count": count,
+        }
+        for (period, category), (amount, count) in deltas.items()
+        if count > 0
+    ]
+
+    if rows:
+        await db.execute(insert(SpendingAggregate), rows)
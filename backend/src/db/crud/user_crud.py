@@ -1,17 +1,20 @@
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.db.models.user import User
 
 
-def get_user_by_microsoft_id(
-    db: Session,
+async def get_user_by_microsoft_id(
+    db: AsyncSession,
     microsoft_id: str,
 ) -> Optional[User]:
-    return db.query(User).filter(User.microsoft_id == microsoft_id).first()
+    result = await db.execute(select(User).where(User.microsoft_id == microsoft_id))
+    return result.scalars().first()
 
 
-def create_user(
-    db: Session,
+async def create_user(
+    db: AsyncSession,
     oid: str,
     email: str,
     name: Optional[str],
@@ -23,21 +26,30 @@ def create_user(
     )
 
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
 
     return user
 
 
-def get_or_create_user(
-    db: Session,
+async def get_or_create_user(
+    db: AsyncSession,
     oid: str,
     email: str,
     name: Optional[str],
 ) -> User:
-    user = get_user_by_microsoft_id(db, oid)
+    user = await get_user_by_microsoft_id(db, oid)
 
     if user:
         return user
 
-    return create_user(db, oid, email, name)
+    try:
+        return await create_user(db, oid, email, name)
+    except IntegrityError:
+        # another worker inserted the same oid first — use its row
+        await db.rollback()
+
+        user = await get_user_by_microsoft_id(db, oid)
+        if user is None:
+            raise
+
+        return user
@@ -1,2 +1,8 @@
 from src.db.models.receipt import Receipt, ReceiptItem
 from src.db.models.user import User
+from src.db.models.analysis_cache import ReceiptAnalysisCacheEntry
+from src.db.models.spending_aggregate import SpendingAggregate
+from src.db.models.item_category_memo import ItemCategoryMemo
+from src.db.models.merchant_engine_stats import MerchantEngineStats
+from src.db.models.receipt_raw_output import ReceiptRawOutput
+from src.db.models.receipt_comparison import ReceiptComparison
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import String, Text, Integer, DateTime, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.base import Base
+
+
+class ReceiptAnalysisCacheEntry(Base):
+    """
+    Normalized engine output for a receipt image, keyed by file content.
+
+    Lets identical uploads reuse a previous analysis (and its blob)
+    instead of paying for another engine run.
+    """
+
+    __tablename__ = "receipt_analysis_cache"
+    __table_args__ = (
+        UniqueConstraint("content_hash", "engine", name="uq_analysis_cache_hash_engine"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    engine: Mapped[str] = mapped_column(String(20), nullable=False)
+    analysis: Mapped[str] = mapped_column(Text, nullable=False)
+    blob_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    blob_url: Mapped[str] = mapped_column(String(500), nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+    )
+    last_hit_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import String, DateTime, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.base import Base
+
+
+class ItemCategoryMemo(Base):
+    """
+    Remembered expense category for a normalized item name.
+
+    `merchant` is the normalized merchant name, or "" for the
+    merchant-independent entry used when the merchant has not been seen.
+    """
+
+    __tablename__ = "item_category_memo"
+    __table_args__ = (
+        UniqueConstraint("item_name", "merchant", name="uq_item_category_memo_name_merchant"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    item_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    merchant: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+    category: Mapped[str] = mapped_column(String(50), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+    )
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import String, Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.base import Base
+
+
+class MerchantEngineStats(Base):
+    """
+    How often Document Intelligence disagreed with OpenAI per merchant.
+
+    Filled from every upload where both engines ran (compare, and auto
+    escalations). `auto` routing sends merchants with a high disagreement
+    rate straight to OpenAI as well. `merchant` is the normalized name.
+    """
+
+    __tablename__ = "merchant_engine_stats"
+
+    merchant: Mapped[str] = mapped_column(String(255), primary_key=True)
+    comparisons: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    di_disagreements: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
@@ -1,7 +1,8 @@
 from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import String, Float, Date, DateTime, func, ForeignKey
+from sqlalchemy import String, Float, Date, DateTime, Integer, func, ForeignKey, Index
+from sqlalchemy.dialects import mssql
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.orm import relationship
 
@@ -16,6 +17,15 @@ class Receipt(Base):
     """
 
     __tablename__ = "receipts"
+    __table_args__ = (
+        # keyset pagination of the receipt list (newest first)
+        Index("ix_receipts_user_created", "user_id", "created_at", "id"),
+        Index("ix_receipts_user_source_created", "user_id", "source", "created_at", "id"),
+        # date-range filters
+        Index("ix_receipts_user_transaction_date", "user_id", "transaction_date"),
+        # currency history per merchant (OpenAI currency resolution)
+        Index("ix_receipts_merchant_currency", "merchant", "currency"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(
@@ -28,10 +38,20 @@ class Receipt(Base):
     transaction_date: Mapped[Optional[date]] = mapped_column(Date)
     source: Mapped[str] = mapped_column(String(20))
     blob_url: Mapped[str] = mapped_column(String(500), nullable=False)
+    # keyset cursors compare it for equality: DATETIME's ~3 ms rounding on
+    # SQL Server would not match the microsecond cursor value
     created_at: Mapped[datetime] = mapped_column(
+        DateTime().with_variant(mssql.DATETIME2(precision=6), "mssql"),
+        default=datetime.utcnow,
+    )
+    # bumped by every edit; ETag / Last-Modified of the detail endpoint
+    updated_at: Mapped[datetime] = mapped_column(
         DateTime,
         default=datetime.utcnow,
     )
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
+    # last change made by the user; re-normalization leaves these alone
+    edited_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     user = relationship("User", backref="receipts")
     items = relationship(
         "ReceiptItem",
@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import String, Text, LargeBinary, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.base import Base
+
+
+class ReceiptComparison(Base):
+    """
+    A compare-mode upload: both engines' normalized results and their diff.
+
+    Kept so the user can save the receipt later from either engine (or
+    their merge) without another engine run. `receipt_id` is set once a
+    receipt has been created from it.
+    """
+
+    __tablename__ = "receipt_comparisons"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"),
+        nullable=False,
+    )
+    blob_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    blob_url: Mapped[str] = mapped_column(String(500), nullable=False)
+    # ReceiptCompareAnalysis as JSON
+    analysis: Mapped[str] = mapped_column(Text, nullable=False)
+    # gzip JSON of the engines' raw outputs (see `ReceiptRawOutput`)
+    raw_outputs: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    receipt_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("receipts.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+    )
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import String, LargeBinary, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.base import Base
+
+
+class ReceiptRawOutput(Base):
+    """
+    An engine's raw output for a saved receipt, before normalization.
+
+    `payload` is gzip-compressed JSON: the dict returned by
+    `DocumentIntelligenceService.analyze_receipt` for `di`, the model's
+    decoded JSON for `openai`, and for `auto` the escalation reasons
+    needed to merge the two again. Lets `scripts.renormalize_receipts`
+    re-run the normalizers on historical receipts without engine calls.
+    """
+
+    __tablename__ = "receipt_raw_outputs"
+
+    receipt_id: Mapped[int] = mapped_column(
+        ForeignKey("receipts.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    engine: Mapped[str] = mapped_column(String(20), primary_key=True)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+    )
@@ -0,0 +1,61 @@
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import String, Float, Integer, Date, ForeignKey, Index, UniqueConstraint, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.base import Base
+
+
+class SpendingAggregate(Base):
+    """
+    Per-user, per-month spending totals kept in step with receipts.
+
+    Two kinds of rows share the table:
+        • category IS NULL  — month roll-up of receipt totals
+        • category NOT NULL — sum of item prices in that category
+          (items without a category count as "Uncategorized")
+
+    `period` is the first day of the month, or NULL for receipts without
+    a transaction date. Dashboard queries read these rows instead of
+    scanning receipts and items.
+    """
+
+    __tablename__ = "spending_aggregates"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "period", "category",
+            name="uq_spending_aggregates_user_period_category",
+        ),
+        # only SQL Server treats NULLs as equal in the constraint above;
+        # these keep the NULL keys unique on every backend, so a lost
+        # insert race in `apply_deltas` cannot create a duplicate row
+        *(
+            Index(
+                name,
+                *columns,
+                unique=True,
+                sqlite_where=text(condition),
+                postgresql_where=text(condition),
+                mssql_where=text(condition),
+            )
+            for name, columns, condition in (
+                ("uq_spending_aggregates_rollup", ("user_id", "period"),
+                 "category IS NULL AND period IS NOT NULL"),
+                ("uq_spending_aggregates_undated", ("user_id", "category"),
+                 "period IS NULL AND category IS NOT NULL"),
+                ("uq_spending_aggregates_undated_rollup", ("user_id",),
+                 "period IS NULL AND category IS NULL"),
+            )
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"),
+        nullable=False,
+    )
+    period: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    category: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    total: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    entry_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -0,0 +1,49 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from src.utils.metrics import metrics
+
+
+# connection hold times are short when things work; seconds mean trouble
+HOLD_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30)
+
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    """
+    Record how long connections stay checked out of `engine`'s pool.
+
+    Counters `db.<name>.checkouts` / `checkins` and the histogram
+    `db.<name>.hold_seconds` (checkout to checkin). For an async engine
+    pass `async_engine.sync_engine`.
+    """
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        metrics.inc(f"db.{name}.checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record) -> None:
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is None:
+            return
+
+        metrics.inc(f"db.{name}.checkins")
+        metrics.observe(f"db.{name}.hold_seconds", time.perf_counter() - started, HOLD_BUCKETS)
+
+
+def pool_status(engine: Engine) -> dict:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checked_in": pool.checkedin(),
+    }
@@ -1,8 +1,30 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from src.settings import settings
+from src.db.pool_metrics import instrument_pool
 
 
+# Async DBAPI driver to use for each sync database backend.
+ASYNC_DRIVERS = {
+    "mssql": "mssql+aioodbc",
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def build_async_database_url(url: str) -> str:
+    """
+    Derive the async-driver URL from the sync DATABASE_URL
+    (e.g. mssql+pyodbc → mssql+aioodbc), keeping credentials and query.
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+# Synchronous engine — used by Alembic migrations and offline scripts.
 engine = create_engine(
     settings.DATABASE_URL, # type: ignore
     echo=False,
@@ -25,3 +47,31 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async engine — used by the API.
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or build_async_database_url(settings.DATABASE_URL),
+    echo=False,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+)
+
+# connection hold times (GET /api/metrics, GET /api/metrics/db)
+instrument_pool(async_engine.sync_engine, "pool")
+
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    # keep loaded attributes usable after commit; async sessions cannot lazy-load
+    expire_on_commit=False,
+)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
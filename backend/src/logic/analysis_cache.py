@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from pydantic import BaseModel
+
+from src.settings import settings
+
+from src.db.session import AsyncSessionLocal
+from src.db.crud.analysis_cache_crud import (
+    delete_expired_entries,
+    get_cache_entry,
+    record_cache_hit,
+    save_cache_entry,
+)
+
+from src.schemas.engine import Engine
+from src.schemas.receipt import ReceiptSchema
+from src.utils.metrics import metrics
+from src.utils.ttl_cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class CachedAnalysis(BaseModel):
+    blob_name: str
+    blob_url: str
+    analysis: ReceiptSchema
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Content-addressed cache of normalized engine results.
+
+    Keyed by SHA-256 of the uploaded bytes plus engine name. Lookups go
+    to an in-memory LRU first and fall back to the `receipt_analysis_cache`
+    table, so duplicates are caught across restarts and workers too.
+    Cache failures are logged and treated as misses — they never fail
+    an upload.
+
+    Entries expire after `ttl_seconds` in both tiers, so a normalizer
+    fix reaches repeated uploads; expired rows are purged periodically.
+    """
+
+    # how often expired rows are purged: at most hourly, at least a minute apart
+    PURGE_INTERVAL_SECONDS = 3600
+    MIN_PURGE_INTERVAL_SECONDS = 60
+
+    def __init__(self, maxsize: int, ttl_seconds: float, enabled: bool = True):
+        self._enabled = enabled
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._memory: TTLCache[CachedAnalysis] = TTLCache(maxsize, ttl_seconds)
+        self._purge_task: Optional[asyncio.Task] = None
+
+    def _expired_before(self) -> datetime:
+        return datetime.utcnow() - self._ttl
+
+    async def _purge_loop(self) -> None:
+        interval = max(
+            self.MIN_PURGE_INTERVAL_SECONDS,
+            min(self._ttl.total_seconds(), self.PURGE_INTERVAL_SECONDS),
+        )
+
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    purged = await delete_expired_entries(db, self._expired_before())
+                if purged:
+                    logger.info("Purged %d expired analysis cache entries", purged)
+            except Exception:
+                logger.warning("Purging the analysis cache failed", exc_info=True)
+
+            await asyncio.sleep(interval)
+
+    def start(self) -> None:
+        """Start purging expired rows on the running event loop."""
+        if self._enabled and self._purge_task is None:
+            self._purge_task = asyncio.create_task(
+                self._purge_loop(), name="analysis-cache-purge"
+            )
+
+    async def stop(self) -> None:
+        if self._purge_task is not None:
+            self._purge_task.cancel()
+            await asyncio.gather(self._purge_task, return_exceptions=True)
+            self._purge_task = None
+
+    async def lookup(self, digest: str, engine: Engine) -> Optional[CachedAnalysis]:
+        """
+        Return a private copy of the cached analysis, or None on a miss.
+        """
+
+        if not self._enabled:
+            return None
+
+        key = (digest, engine.value)
+
+        cached = self._memory.get(key)
+        if cached is not None:
+            metrics.inc("analysis_cache.hits.memory")
+            metrics.inc(f"analysis_cache.engine_calls_saved.{engine.value}")
+            return cached.model_copy(deep=True)
+
+        try:
+            async with AsyncSessionLocal() as db:
+                entry = await get_cache_entry(
+                    db, digest, engine.value, created_after=self._expired_before()
+                )
+                if entry is None:
+                    metrics.inc("analysis_cache.misses")
+                    return None
+
+                cached = CachedAnalysis(
+                    blob_name=entry.blob_name,
+                    blob_url=entry.blob_url,
+                    analysis=ReceiptSchema.model_validate_json(entry.analysis),
+                )
+                await record_cache_hit(db, entry)
+
+        except Exception:
+            logger.warning("Analysis cache lookup failed", exc_info=True)
+            metrics.inc("analysis_cache.errors")
+            return None
+
+        metrics.inc("analysis_cache.hits.db")
+        metrics.inc(f"analysis_cache.engine_calls_saved.{engine.value}")
+
+        self._memory.set(key, cached)
+        return cached.model_copy(deep=True)
+
+    async def store(
+        self,
+        digest: str,
+        engine: Engine,
+        blob_name: str,
+        blob_url: str,
+        analysis: ReceiptSchema,
+        replace: bool = True,
+    ) -> None:
+        """
+        Remember an analysis. With `replace=False` an existing entry wins.
+        """
+
+        if not self._enabled:
+            return
+
+        key = (digest, engine.value)
+
+        if not replace and self._memory.get(key) is not None:
+            return
+
+        cached = CachedAnalysis(
+            blob_name=blob_name,
+            blob_url=blob_url,
+            analysis=analysis.model_copy(deep=True),
+        )
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await save_cache_entry(
+                    db,
+                    content_hash=digest,
+                    engine=engine.value,
+                    analysis_json=cached.analysis.model_dump_json(),
+                    blob_name=cached.blob_name,
+                    blob_url=cached.blob_url,
+                    replace=replace,
+                    created_after=self._expired_before(),
+                )
+        except Exception:
+            logger.warning("Analysis cache write failed", exc_info=True)
+            metrics.inc("analysis_cache.errors")
+            return
+
+        if replace:
+            self._memory.set(key, cached)
+
+
+analysis_cache = AnalysisCache(
+    maxsize=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+    enabled=settings.ANALYSIS_CACHE_ENABLED,
+)
@@ -1,146 +1,261 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime
+from collections import defaultdict
+from typing import Dict, Optional
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, or_, select
+from datetime import date, datetime
 
-from src.schemas.user_info import UserInfo
-from src.logic.user_resolver import resolve_user
+from src.db.models.spending_aggregate import SpendingAggregate
+from src.db.crud.spending_aggregate_crud import month_start
+from src.schemas.dashboard import (
+    CategoryTotal,
+    DashboardResponse,
+    DashboardSummary,
+    MonthlyTotal,
+)
 
-from src.db.models.receipt import Receipt, ReceiptItem
 
+def _money(value) -> float:
+    # aggregates are maintained by repeated float additions
+    return round(float(value or 0), 2)
 
-def get_category_distribution(
-    db: Session,
-    user_info: UserInfo,
+
+def _current_and_previous_period() -> tuple[date, date]:
+    now = datetime.utcnow()
+    current_period = date(now.year, now.month, 1)
+
+    prev_month = now.month - 1 or 12
+    prev_year = now.year if now.month != 1 else now.year - 1
+
+    return current_period, date(prev_year, prev_month, 1)
+
+
+def _percent_change(current_total: float, previous_total: float) -> float:
+    if previous_total > 0:
+        return round(((current_total - previous_total) / previous_total) * 100, 2)
+    return 0
+
+
+async def get_category_distribution(
+    db: AsyncSession,
+    user_id: int,
 ):
     """
     Returns total spending grouped by category.
     """
 
-    user = resolve_user(db, user_info)
-
     results = (
-        db.query(
-            ReceiptItem.category,
-            func.sum(ReceiptItem.price).label("total"),
+        await db.execute(
+            select(
+                SpendingAggregate.category,
+                func.sum(SpendingAggregate.total).label("total"),
+            )
+            .where(
+                SpendingAggregate.user_id == user_id,
+                SpendingAggregate.category.is_not(None),
+            )
+            .group_by(SpendingAggregate.category)
         )
-        .join(Receipt)
-        .filter(Receipt.user_id == user.id)
-        .group_by(ReceiptItem.category)
-        .all()
-    )
+    ).all()
 
     return [
         {
-            "category": r[0] or "Uncategorized",
-            "total": float(r[1] or 0),
+            "category": r[0],
+            "total": _money(r[1]),
         }
         for r in results
     ]
 
 
-def get_monthly_trend(
-    db: Session,
-    user_info: UserInfo,
+async def get_monthly_trend(
+    db: AsyncSession,
+    user_id: int,
 ):
     """
     Returns monthly spending trend for the user.
     """
 
-    user = resolve_user(db, user_info)
-
     results = (
-        db.query(
-            func.year(Receipt.transaction_date).label("year"),
-            func.month(Receipt.transaction_date).label("month"),
-            func.sum(Receipt.total).label("total"),
-        )
-        .filter(Receipt.user_id == user.id)
-        .group_by(
-            func.year(Receipt.transaction_date),
-            func.month(Receipt.transaction_date),
+        await db.execute(
+            select(
+                SpendingAggregate.period,
+                func.sum(SpendingAggregate.total).label("total"),
+            )
+            .where(
+                SpendingAggregate.user_id == user_id,
+                SpendingAggregate.category.is_(None),
+            )
+            .group_by(SpendingAggregate.period)
+            .order_by(SpendingAggregate.period)
         )
-        .order_by(
-            func.year(Receipt.transaction_date),
-            func.month(Receipt.transaction_date),
-        )
-        .all()
-    )
+    ).all()
 
     return [
         {
-            "year": r[0],
-            "month": r[1],
-            "total": float(r[2] or 0),
+            "year": r[0].year if r[0] else None,
+            "month": r[0].month if r[0] else None,
+            "total": _money(r[1]),
         }
         for r in results
     ]
 
 
-def get_summary(
-    db: Session,
-    user_info: UserInfo,
+async def get_summary(
+    db: AsyncSession,
+    user_id: int,
 ):
     """
     Returns dashboard summary statistics.
     """
 
-    user = resolve_user(db, user_info)
-
-    now = datetime.utcnow()
-    current_year = now.year
-    current_month = now.month
-
-    # Current month total
-    current_total = (
-        db.query(func.sum(Receipt.total))
-        .filter(
-            Receipt.user_id == user.id,
-            func.year(Receipt.transaction_date) == current_year,
-            func.month(Receipt.transaction_date) == current_month,
-        )
-        .scalar()
-        or 0
-    )
-
-    # Previous month calculation
-    prev_month = current_month - 1 or 12
-    prev_year = current_year if current_month != 1 else current_year - 1
+    current_period, previous_period = _current_and_previous_period()
 
-    previous_total = (
-        db.query(func.sum(Receipt.total))
-        .filter(
-            Receipt.user_id == user.id,
-            func.year(Receipt.transaction_date) == prev_year,
-            func.month(Receipt.transaction_date) == prev_month,
+    async def month_total(period: date) -> float:
+        total = await db.scalar(
+            select(func.sum(SpendingAggregate.total)).where(
+                SpendingAggregate.user_id == user_id,
+                SpendingAggregate.period == period,
+                SpendingAggregate.category.is_(None),
+            )
         )
-        .scalar()
-        or 0
-    )
+        return _money(total)
 
-    percent_change = 0
-    if previous_total > 0:
-        percent_change = ((current_total - previous_total) / previous_total) * 100
+    current_total = await month_total(current_period)
+    previous_total = await month_total(previous_period)
 
     # Top category this month
     top_category = (
-        db.query(
-            ReceiptItem.category,
-            func.sum(ReceiptItem.price).label("total"),
+        await db.execute(
+            select(
+                SpendingAggregate.category,
+                func.sum(SpendingAggregate.total).label("total"),
+            )
+            .where(
+                SpendingAggregate.user_id == user_id,
+                SpendingAggregate.period == current_period,
+                SpendingAggregate.category.is_not(None),
+            )
+            .group_by(SpendingAggregate.category)
+            .order_by(func.sum(SpendingAggregate.total).desc())
+            .limit(1)
         )
-        .join(Receipt)
-        .filter(
-            Receipt.user_id == user.id,
-            func.year(Receipt.transaction_date) == current_year,
-            func.month(Receipt.transaction_date) == current_month,
-        )
-        .group_by(ReceiptItem.category)
-        .order_by(func.sum(ReceiptItem.price).desc())
-        .first()
-    )
+    ).first()
 
     return {
-        "current_month_total": float(current_total),
-        "previous_month_total": float(previous_total),
-        "percent_change": round(percent_change, 2),
+        "current_month_total": current_total,
+        "previous_month_total": previous_total,
+        "percent_change": _percent_change(current_total, previous_total),
         "top_category": top_category[0] if top_category else None,
     }
+
+
+async def get_dashboard(
+    db: AsyncSession,
+    user_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> DashboardResponse:
+    """
+    Returns every dashboard panel from a single aggregate query.
+
+    `date_from`/`date_to` narrow the category and trend panels to whole
+    months; the summary always compares this month with the previous one.
+    Period filters are plain ranges on the indexed `period` column.
+    """
+
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from is after date_to")
+
+    window_start = month_start(date_from)
+    window_end = month_start(date_to)
+    current_period, previous_period = _current_and_previous_period()
+
+    window = []
+    if window_start:
+        window.append(SpendingAggregate.period >= window_start)
+    if window_end:
+        window.append(SpendingAggregate.period <= window_end)
+
+    query = select(
+        SpendingAggregate.period,
+        SpendingAggregate.category,
+        func.sum(SpendingAggregate.total).label("total"),
+    ).where(SpendingAggregate.user_id == user_id)
+
+    if window:
+        # the summary months are needed even when outside the window
+        query = query.where(
+            or_(
+                and_(*window),
+                SpendingAggregate.period.in_([current_period, previous_period]),
+            )
+        )
+
+    rows = (
+        await db.execute(
+            query.group_by(SpendingAggregate.period, SpendingAggregate.category)
+        )
+    ).all()
+
+    def in_window(period: Optional[date]) -> bool:
+        if not window:
+            return True
+        if period is None:
+            return False
+        return (not window_start or period >= window_start) and (
+            not window_end or period <= window_end
+        )
+
+    categories: Dict[str, float] = defaultdict(float)
+    months: Dict[Optional[date], float] = defaultdict(float)
+    summary_months: Dict[date, float] = defaultdict(float)
+    current_categories: Dict[str, float] = defaultdict(float)
+
+    for period, category, total in rows:
+        total = total or 0
+
+        if category is None:
+            if in_window(period):
+                months[period] += total
+            if period in (current_period, previous_period):
+                summary_months[period] += total
+            continue
+
+        if in_window(period):
+            categories[category] += total
+        if period == current_period:
+            current_categories[category] += total
+
+    current_total = _money(summary_months[current_period])
+    previous_total = _money(summary_months[previous_period])
+
+    top_category = (
+        max(current_categories.items(), key=lambda kv: kv[1])[0]
+        if current_categories
+        else None
+    )
+
+    return DashboardResponse(
+        category_distribution=[
+            CategoryTotal(category=category, total=_money(total))
+            for category, total in categories.items()
+        ],
+        monthly_trend=[
+            MonthlyTotal(
+                year=period.year if period else None,
+                month=period.month if period else None,
+                total=_money(total),
+            )
+            # undated receipts first, as in the trend endpoint
+            for period, total in sorted(
+                months.items(),
+                key=lambda kv: (kv[0] is not None, kv[0] or date.min),
+            )
+        ],
+        summary=DashboardSummary(
+            current_month_total=current_total,
+            previous_month_total=previous_total,
+            percent_change=_percent_change(current_total, previous_total),
+            top_category=top_category,
+        ),
+    )
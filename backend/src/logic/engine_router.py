@@ -0,0 +1,155 @@
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from src.db.session import AsyncSessionLocal
+from src.db.crud.merchant_engine_stats_crud import (
+    get_merchant_engine_stats,
+    record_engine_comparison,
+)
+from src.logic.expense_classifier import normalize_key_text
+from src.schemas.receipt import ReceiptDiffReport, ReceiptSchema
+from src.utils.ttl_cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+# fields `auto` needs from DI; `items` is the line item list
+AUTO_FIELDS = ("merchant", "total", "transaction_date", "items")
+
+# escalation reason when the merchant's history, not this receipt, is weak
+MERCHANT_HISTORY = "merchant_history"
+
+# diff fields that count as DI getting a receipt wrong
+_DISAGREEMENT_FIELDS = {"total", "transaction_date", "currency"}
+
+
+def di_weak_fields(
+    analysis: ReceiptSchema,
+    confidence: Dict[str, Optional[float]],
+    min_confidence: float,
+) -> List[str]:
+    """
+    Fields DI left empty or reported below `min_confidence`.
+
+    A missing currency is listed too; the caller may still resolve it
+    without OpenAI. Fields without a reported confidence are trusted.
+    """
+
+    weak: List[str] = []
+
+    for field in AUTO_FIELDS:
+        if not getattr(analysis, field):
+            weak.append(field)
+            continue
+
+        score = confidence.get(field)
+        if score is not None and score < min_confidence:
+            weak.append(field)
+
+    if not analysis.currency:
+        weak.append("currency")
+
+    return weak
+
+
+def di_disagrees(diff: ReceiptDiffReport) -> bool:
+    """True when OpenAI found a different total/date/currency or extra items."""
+
+    if diff.missing_in_di_count:
+        return True
+    return any(f.field in _DISAGREEMENT_FIELDS and not f.match for f in diff.fields)
+
+
+def merge_receipts(
+    di: ReceiptSchema,
+    openai: ReceiptSchema,
+    weak: List[str],
+) -> ReceiptSchema:
+    """
+    Combine both engines' results for an escalated `auto` receipt.
+
+    DI values are kept unless listed in `weak` (or empty); those come from
+    OpenAI when it has them. A weak merchant history prefers OpenAI for
+    every field, with DI filling only the gaps.
+    """
+
+    prefer_openai = set(AUTO_FIELDS) | {"currency"} if MERCHANT_HISTORY in weak else set(weak)
+
+    merged = di.model_copy(deep=True)
+    merged.source = "auto"
+
+    for field in ("merchant", "total", "currency", "transaction_date", "items"):
+        di_value = getattr(di, field)
+        oai_value = getattr(openai, field)
+
+        if oai_value and (field in prefer_openai or not di_value):
+            setattr(merged, field, oai_value)
+
+    return merged
+
+
+class MerchantEngineHistory:
+    """
+    Per-merchant DI disagreement rate, learned from uploads where both
+    engines ran (`merchant_engine_stats` table). `auto` uploads DI
+    handled alone count as comparisons without disagreement, so the
+    rate is not measured only on the receipts DI already looked weak on.
+
+    A merchant is DI-weak once it has at least `min_comparisons` and DI
+    disagreed with OpenAI on at least `max_disagreement_rate` of them.
+    Lookups are cached; failures are logged and treated as "not weak".
+    """
+
+    def __init__(
+        self,
+        min_comparisons: int,
+        max_disagreement_rate: float,
+        cache_max_entries: int = 5000,
+        cache_ttl_seconds: float = 600,
+    ):
+        self._min_comparisons = min_comparisons
+        self._max_rate = max_disagreement_rate
+        self._cache: TTLCache[Tuple[int, int]] = TTLCache(cache_max_entries, cache_ttl_seconds)
+
+    async def di_is_weak(self, merchant: Optional[str]) -> bool:
+        key = normalize_key_text(merchant)
+        if not key:
+            return False
+
+        stats = self._cache.get(key)
+        if stats is None:
+            try:
+                async with AsyncSessionLocal() as db:
+                    stats = await get_merchant_engine_stats(db, key) or (0, 0)
+            except Exception:
+                logger.warning("Merchant engine stats lookup failed", exc_info=True)
+                return False
+            self._cache.set(key, stats)
+
+        comparisons, disagreements = stats
+        return (
+            comparisons >= self._min_comparisons
+            and disagreements / comparisons >= self._max_rate
+        )
+
+    async def record(self, merchant: Optional[str], diff: ReceiptDiffReport) -> None:
+        await self._record(merchant, di_disagrees(diff))
+
+    async def record_di_only(self, merchant: Optional[str]) -> None:
+        """An `auto` upload DI handled without escalation."""
+        await self._record(merchant, False)
+
+    async def _record(self, merchant: Optional[str], di_disagreed: bool) -> None:
+        key = normalize_key_text(merchant)
+        if not key:
+            return
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await record_engine_comparison(db, key, di_disagreed)
+        except Exception:
+            logger.warning("Recording merchant engine stats failed", exc_info=True)
+            return
+
+        # next lookup sees the new counts
+        self._cache.pop(key)
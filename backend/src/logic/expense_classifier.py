@@ -0,0 +1,333 @@
+import re
+import json
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple, cast
+from pydantic import BaseModel
+
+from src.db.session import AsyncSessionLocal
+from src.db.crud.item_category_memo_crud import (
+    MemoKey,
+    get_memo_categories,
+    save_memo_categories,
+)
+from src.db.crud.receipt_crud import get_labelled_items
+
+from src.logic.local_classifier import LocalCategoryIndex
+
+from src.services.openai_service import OpenAIVisionService
+from src.schemas.expense_category import EXPENSE_CATEGORIES, ItemCategoryBatch
+from src.utils.metrics import metrics
+from src.utils.micro_batcher import MicroBatcher
+from src.utils.ttl_cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+CLASSIFIER_TIERS = ("memory", "db", "local", "llm", "unresolved")
+
+
+def normalize_key_text(value: Optional[str]) -> str:
+    """
+    Canonical form used for memo keys: case-folded, single-spaced, trimmed.
+    """
+
+    if not value:
+        return ""
+    return _WHITESPACE.sub(" ", value).strip().casefold()[:255]
+
+
+def classifier_tier_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Items answered per classifier tier and each tier's share, since process start.
+    """
+
+    counts = {tier: metrics.get(f"classifier.tier.{tier}") for tier in CLASSIFIER_TIERS}
+    total = sum(counts.values())
+
+    return {
+        tier: {
+            "items": count,
+            "rate": round(count / total, 4) if total else 0.0,
+        }
+        for tier, count in counts.items()
+    }
+
+
+class ItemClassification(BaseModel):
+    category: str
+    source: str
+    confidence: Optional[float] = None
+
+
+class ExpenseClassifier:
+    """
+    Assigns expense categories to receipt line items.
+
+    Lookup order for each (normalized item name, merchant):
+        1. in-memory LRU
+        2. `item_category_memo` table (merchant-specific, then any merchant)
+        3. local token/merchant index built from LLM-labelled items — used
+           when its confidence reaches `local_min_confidence`
+        4. Azure OpenAI — only for names the tiers above cannot answer
+
+    LLM requests from concurrent receipts are coalesced by a micro-batcher,
+    so a burst of uploads costs a few calls of up to `batch_size` names
+    instead of one call per receipt. Every LLM answer is written back to
+    the memo, so each distinct name is paid for once.
+    """
+
+    def __init__(
+        self,
+        service: OpenAIVisionService,
+        batch_size: int,
+        batch_wait_seconds: float,
+        memo_max_entries: int,
+        memo_ttl_seconds: float,
+        local_min_confidence: float = 0.8,
+        local_refresh_seconds: float = 600,
+        local_max_rows: int = 50000,
+    ):
+        self._svc = service
+        self._memory: TTLCache[str] = TTLCache(memo_max_entries, memo_ttl_seconds)
+        self._batcher: MicroBatcher[MemoKey, str] = MicroBatcher(
+            self._classify_with_llm,
+            max_batch_size=batch_size,
+            max_wait_seconds=batch_wait_seconds,
+        )
+
+        self._local = LocalCategoryIndex()
+        self._local_min_confidence = local_min_confidence
+        self._local_refresh_seconds = local_refresh_seconds
+        self._local_max_rows = local_max_rows
+        self._local_built_at: Optional[float] = None
+        self._local_task: Optional[asyncio.Task] = None
+
+    # ----- memo tiers -----
+
+    async def _lookup_memo(self, keys: List[MemoKey]) -> Dict[MemoKey, str]:
+        found: Dict[MemoKey, str] = {}
+        missing: List[MemoKey] = []
+
+        for key in keys:
+            category = self._memory.get(key)
+            if category is None:
+                missing.append(key)
+            else:
+                found[key] = category
+
+        metrics.inc("classifier.tier.memory", len(found))
+
+        if not missing:
+            return found
+
+        # merchant-independent entries back up merchant-specific ones
+        candidates = set(missing) | {(name, "") for name, _ in missing}
+
+        try:
+            async with AsyncSessionLocal() as db:
+                stored = await get_memo_categories(db, candidates)
+        except Exception:
+            logger.warning("Category memo lookup failed", exc_info=True)
+            metrics.inc("classifier.errors")
+            return found
+
+        for key in missing:
+            category = stored.get(key) or stored.get((key[0], ""))
+            if category is None:
+                continue
+
+            found[key] = category
+            self._memory.set(key, category)
+            metrics.inc("classifier.tier.db")
+
+        return found
+
+    async def _remember(self, results: Dict[MemoKey, str]) -> None:
+        entries: Dict[MemoKey, str] = {}
+        for (name, merchant), category in results.items():
+            entries[(name, merchant)] = category
+            entries.setdefault((name, ""), category)
+            self._memory.set((name, merchant), category)
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await save_memo_categories(db, entries)
+        except Exception:
+            logger.warning("Category memo write failed", exc_info=True)
+            metrics.inc("classifier.errors")
+
+    # ----- local tier -----
+
+    def _refresh_local_index_if_stale(self) -> None:
+        """Rebuild the local index in the background; never blocks a request."""
+        if self._local_task is not None:
+            return
+
+        if (
+            self._local_built_at is not None
+            and time.monotonic() - self._local_built_at < self._local_refresh_seconds
+        ):
+            return
+
+        self._local_task = asyncio.create_task(self._rebuild_local_index())
+        self._local_task.add_done_callback(self._local_rebuilt)
+
+    def _local_rebuilt(self, task: asyncio.Task) -> None:
+        self._local_task = None
+        self._local_built_at = time.monotonic()
+
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Local category index rebuild failed", exc_info=task.exception())
+            metrics.inc("classifier.errors")
+
+    async def _rebuild_local_index(self) -> None:
+        async with AsyncSessionLocal() as db:
+            rows = await get_labelled_items(db, "llm", self._local_max_rows)
+
+        def build() -> LocalCategoryIndex:
+            return LocalCategoryIndex.from_rows(
+                (normalize_key_text(name), normalize_key_text(merchant), category)
+                for name, merchant, category in rows
+            )
+
+        self._local = await asyncio.to_thread(build)
+        logger.info("Local category index rebuilt from %d labelled items", len(rows))
+
+    def _predict_locally(
+        self,
+        keys: List[MemoKey],
+    ) -> Dict[MemoKey, Tuple[str, float]]:
+        found: Dict[MemoKey, Tuple[str, float]] = {}
+
+        for key in keys:
+            prediction = self._local.predict(*key)
+            if prediction is None:
+                continue
+
+            category, confidence = prediction
+            # decile histogram of local confidences, for tuning the threshold
+            bucket = min(int(confidence * 10), 9) / 10
+            metrics.inc(f"classifier.local.confidence.{bucket:.1f}")
+
+            if confidence >= self._local_min_confidence:
+                found[key] = (category, confidence)
+            else:
+                metrics.inc("classifier.local.escalated")
+
+        metrics.inc("classifier.tier.local", len(found))
+        return found
+
+    # ----- LLM tier -----
+
+    async def _classify_with_llm(self, keys: List[MemoKey]) -> Dict[MemoKey, str]:
+        """
+        Micro-batch handler: one structured-output call for all keys.
+        """
+
+        metrics.inc("classifier.llm.calls")
+        metrics.inc("classifier.llm.items", len(keys))
+
+        request = [
+            {"id": i, "item": name, "merchant": merchant or None}
+            for i, (name, merchant) in enumerate(keys)
+        ]
+
+        result = await self._svc.complete_with_schema(
+            schema_model=ItemCategoryBatch,
+            system_prompt=(
+                "You classify receipt line items into expense categories.\n"
+                f"Allowed categories: {', '.join(EXPENSE_CATEGORIES)}.\n\n"
+                "Rules:\n"
+                "- Return exactly one assignment per item, using its id.\n"
+                "- Item names are abbreviated as printed on receipts; use the "
+                "merchant as context when present.\n"
+                "- Use \"Other\" when no category clearly fits."
+            ),
+            user_prompt=json.dumps(request, ensure_ascii=False),
+        )
+
+        batch = cast(ItemCategoryBatch, result.model)
+
+        results: Dict[MemoKey, str] = {}
+        for assignment in batch.assignments:
+            if 0 <= assignment.id < len(keys):
+                results[keys[assignment.id]] = assignment.category
+
+        if results:
+            await self._remember(results)
+
+            for (name, merchant), category in results.items():
+                self._local.add(name, merchant, category)
+
+        metrics.inc("classifier.tier.llm", len(results))
+        return results
+
+    # ----- public API -----
+
+    async def classify(
+        self,
+        items: List[str],
+        merchant: Optional[str] = None,
+    ) -> Dict[str, ItemClassification]:
+        """
+        Categorize item names printed on one receipt.
+
+        Returns:
+            Mapping of original item name → classification. Names that
+            could not be classified (e.g. the LLM call failed) are absent.
+        """
+
+        merchant_key = normalize_key_text(merchant)
+
+        keys_by_name: Dict[str, MemoKey] = {}
+        for name in items:
+            normalized = normalize_key_text(name)
+            if normalized:
+                keys_by_name[name] = (normalized, merchant_key)
+
+        unique_keys = list(dict.fromkeys(keys_by_name.values()))
+
+        self._refresh_local_index_if_stale()
+
+        known = await self._lookup_memo(unique_keys)
+        unseen = [key for key in unique_keys if key not in known]
+
+        predicted = self._predict_locally(unseen)
+        unseen = [key for key in unseen if key not in predicted]
+
+        learned: Dict[MemoKey, str] = {}
+        if unseen:
+            learned = await self._batcher.submit_many(unseen)
+            metrics.inc("classifier.tier.unresolved", len(unseen) - len(learned))
+
+        results: Dict[str, ItemClassification] = {}
+        for name, key in keys_by_name.items():
+            if key in known:
+                results[name] = ItemClassification(category=known[key], source="memo")
+            elif key in predicted:
+                category, confidence = predicted[key]
+                results[name] = ItemClassification(
+                    category=category,
+                    source="local",
+                    confidence=confidence,
+                )
+            elif key in learned:
+                results[name] = ItemClassification(category=learned[key], source="llm")
+
+        return results
+
+    async def classify_items(
+        self,
+        items: List[str],
+        merchant: Optional[str] = None,
+    ) -> Dict[str, str]:
+        """
+        Categorize item names; returns item name → category.
+        """
+
+        classified = await self.classify(items, merchant)
+        return {name: c.category for name, c in classified.items()}
@@ -0,0 +1,260 @@
+import io
+import math
+import asyncio
+import logging
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from PIL import Image, ImageChops, ImageOps, UnidentifiedImageError
+from pydantic import BaseModel
+
+from src.utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+# crop only when the background border is at least this share of an edge
+MIN_CROP_MARGIN = 0.03
+
+# per-channel difference from the border colour that counts as content
+BACKGROUND_TOLERANCE = 40
+
+# longest side of the preview the crop box is computed on
+CROP_PREVIEW_SIZE = 256
+
+
+class PreprocessedImage(BaseModel):
+    data: bytes
+    content_type: str = "image/jpeg"
+    width: int
+    height: int
+    original_width: int
+    original_height: int
+
+
+# content bounding box as fractions (left, top, right, bottom) of the image
+CropBox = Tuple[float, float, float, float]
+
+
+def _content_box(image: Image.Image) -> Optional[CropBox]:
+    """
+    Where the receipt is inside a uniform background (table, desk), or
+    None when there is no background border worth cropping.
+
+    The background colour is taken from the top-left pixel; content is
+    everything differing from it by more than `BACKGROUND_TOLERANCE`.
+    The box is found on a small preview, so it is returned as fractions
+    of the image size.
+    """
+
+    preview = image.convert("RGB")
+    preview.thumbnail((CROP_PREVIEW_SIZE, CROP_PREVIEW_SIZE))
+
+    background = Image.new("RGB", preview.size, preview.getpixel((0, 0)))
+    diff = ImageChops.difference(preview, background).convert("L")
+    mask = diff.point(lambda v: 255 if v > BACKGROUND_TOLERANCE else 0)
+    bbox = mask.getbbox()
+
+    if bbox is None:
+        return None
+
+    left, top, right, bottom = bbox
+
+    margin_x = preview.width * MIN_CROP_MARGIN
+    margin_y = preview.height * MIN_CROP_MARGIN
+
+    if (
+        left < margin_x
+        and top < margin_y
+        and preview.width - right < margin_x
+        and preview.height - bottom < margin_y
+    ):
+        return None
+
+    return (
+        left / preview.width,
+        top / preview.height,
+        right / preview.width,
+        bottom / preview.height,
+    )
+
+
+def _crop(image: Image.Image, box: CropBox) -> Image.Image:
+    left, top, right, bottom = box
+
+    return image.crop(
+        (
+            int(left * image.width),
+            int(top * image.height),
+            min(image.width, int(right * image.width + 1)),
+            min(image.height, int(bottom * image.height + 1)),
+        )
+    )
+
+
+def _draft_scale(
+    size: Tuple[int, int],
+    box: CropBox,
+    max_dimension: int,
+) -> float:
+    """
+    Decode scale that still leaves the cropped region `max_dimension`
+    pixels on its longest side (or its full resolution, when smaller).
+    `size` and `box` are in the same (EXIF-applied) orientation.
+    """
+
+    width, height = size
+    left, top, right, bottom = box
+    longest = max((right - left) * width, (bottom - top) * height)
+
+    return min(1.0, max_dimension / longest)
+
+
+def preprocess_image(
+    data: bytes,
+    max_dimension: int,
+    grayscale: bool,
+    jpeg_quality: int,
+) -> Optional[PreprocessedImage]:
+    """
+    Produce an engine-friendly variant of an uploaded receipt photo.
+
+    Steps: apply the EXIF orientation, crop the background, downscale so
+    the longest side is at most `max_dimension`, then re-encode as
+    (optionally grayscale) JPEG.
+
+    Returns None when the content is not a raster image Pillow can read
+    (e.g. a PDF) or when the result would not be smaller than the input.
+    CPU-bound — run it through `ImagePreprocessor`, not on the event loop.
+    """
+
+    mode = "L" if grayscale else "RGB"
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        original_width, original_height = image.size
+        is_jpeg = image.format == "JPEG"
+
+        box: Optional[CropBox] = None
+        if is_jpeg:
+            # JPEGs can be decoded at 1/2..1/8 scale directly — far cheaper
+            # than decoding full resolution and resampling afterwards. The
+            # crop box comes from a small preview first, so the scale keeps
+            # the cropped receipt, not the whole photo, at `max_dimension`.
+            preview = Image.open(io.BytesIO(data))
+            preview.draft(mode, (CROP_PREVIEW_SIZE, CROP_PREVIEW_SIZE))
+            oriented = ImageOps.exif_transpose(preview)
+            box = _content_box(oriented)
+
+            if box is None:
+                image.draft(mode, (max_dimension, max_dimension))
+            else:
+                rotated = oriented.size != preview.size
+                size = image.size[::-1] if rotated else image.size
+                scale = _draft_scale(size, box, max_dimension)
+                image.draft(
+                    mode,
+                    (math.ceil(image.width * scale), math.ceil(image.height * scale)),
+                )
+
+        image.load()
+    except (UnidentifiedImageError, OSError):
+        return None
+
+    image = ImageOps.exif_transpose(image)
+
+    if not is_jpeg:
+        box = _content_box(image)
+    if box is not None:
+        image = _crop(image, box)
+
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    image = image.convert(mode)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=jpeg_quality, optimize=True)
+    optimized = buffer.getvalue()
+
+    if len(optimized) >= len(data):
+        return None
+
+    return PreprocessedImage(
+        data=optimized,
+        width=image.width,
+        height=image.height,
+        original_width=original_width,
+        original_height=original_height,
+    )
+
+
+class ImagePreprocessor:
+    """
+    Runs `preprocess_image` in a process pool so decoding and resampling
+    multi-megabyte photos never blocks the event loop.
+
+    The pool is created on first use and shut down with the app.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        grayscale: bool,
+        jpeg_quality: int,
+    ):
+        self._workers = workers
+        self._grayscale = grayscale
+        self._jpeg_quality = jpeg_quality
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._workers)
+        return self._pool
+
+    async def preprocess(
+        self,
+        data: bytes,
+        max_dimension: int,
+    ) -> Optional[PreprocessedImage]:
+        """
+        Optimized variant of `data`, or None to keep using the original.
+
+        Failures are logged and counted, never raised: the original image
+        is always a valid engine input.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        try:
+            result = await loop.run_in_executor(
+                self._get_pool(),
+                partial(
+                    preprocess_image,
+                    data,
+                    max_dimension,
+                    self._grayscale,
+                    self._jpeg_quality,
+                ),
+            )
+        except Exception:
+            logger.warning("Image preprocessing failed", exc_info=True)
+            metrics.inc("image_preprocess.errors")
+            return None
+
+        metrics.inc("image_preprocess.bytes_in", len(data))
+
+        if result is None:
+            metrics.inc("image_preprocess.skipped")
+            metrics.inc("image_preprocess.bytes_out", len(data))
+            return None
+
+        metrics.inc("image_preprocess.optimized")
+        metrics.inc("image_preprocess.bytes_out", len(result.data))
+        return result
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,138 @@
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+_TOKEN = re.compile(r"[^\W\d_]{2,}")
+
+# shortest prefix accepted as evidence for an abbreviated token ("choc")
+MIN_PREFIX_LENGTH = 3
+
+# how much a partial (prefix) token match counts next to an exact one
+PREFIX_WEIGHT = 0.5
+
+# how much the merchant's overall category mix counts next to one token
+MERCHANT_WEIGHT = 0.5
+
+
+def tokenize(normalized_name: str) -> List[str]:
+    """
+    Word tokens of a normalized item name; numbers and units are dropped.
+    """
+
+    return _TOKEN.findall(normalized_name)
+
+
+class _TrieNode:
+    __slots__ = ("children", "exact", "below")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        # categories of tokens ending exactly here
+        self.exact: Counter = Counter()
+        # categories of every token passing through this node
+        self.below: Counter = Counter()
+
+
+class LocalCategoryIndex:
+    """
+    Deterministic category predictor built from already-labelled items.
+
+    Two structures back a prediction:
+        • a prefix trie over item-name tokens, storing which categories
+          each token (and each token prefix) was labelled with
+        • a merchant → category histogram
+
+    Receipt item names are heavily abbreviated, so a token that is not in
+    the trie still contributes through its longest known prefix. The
+    confidence is the winning category's share of the combined evidence,
+    discounted when there is little evidence.
+    """
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+        self._merchants: Dict[str, Counter] = defaultdict(Counter)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, str]]) -> "LocalCategoryIndex":
+        """
+        Build an index from (normalized name, normalized merchant, category) rows.
+        """
+
+        index = cls()
+        for name, merchant, category in rows:
+            index.add(name, merchant, category)
+        return index
+
+    def add(self, name: str, merchant: str, category: str) -> None:
+        tokens = tokenize(name)
+        if not tokens:
+            return
+
+        for token in set(tokens):
+            node = self._root
+            for char in token:
+                node = node.children.setdefault(char, _TrieNode())
+                node.below[category] += 1
+            node.exact[category] += 1
+
+        if merchant:
+            self._merchants[merchant][category] += 1
+
+        self._size += 1
+
+    def _token_votes(self, token: str) -> Tuple[Counter, float]:
+        node = self._root
+        depth = 0
+
+        for char in token:
+            child = node.children.get(char)
+            if child is None:
+                break
+            node = child
+            depth += 1
+
+        if depth == len(token) and node.exact:
+            return node.exact, 1.0
+
+        if depth >= MIN_PREFIX_LENGTH:
+            return node.below, PREFIX_WEIGHT
+
+        return Counter(), 0.0
+
+    def predict(self, name: str, merchant: str) -> Optional[Tuple[str, float]]:
+        """
+        Return (category, confidence in 0..1), or None without any evidence.
+        """
+
+        scores: Counter = Counter()
+        evidence = 0
+
+        for token in set(tokenize(name)):
+            votes, weight = self._token_votes(token)
+            total = sum(votes.values())
+            if not total:
+                continue
+
+            evidence += total
+            for category, count in votes.items():
+                scores[category] += weight * count / total
+
+        if not scores:
+            return None
+
+        merchant_votes = self._merchants.get(merchant)
+        if merchant_votes:
+            total = sum(merchant_votes.values())
+            for category, count in merchant_votes.items():
+                scores[category] += MERCHANT_WEIGHT * count / total
+
+        category, top = scores.most_common(1)[0]
+        share = top / sum(scores.values())
+        support = evidence / (evidence + 1)
+
+        return category, round(share * support, 4)
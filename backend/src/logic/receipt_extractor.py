@@ -1,19 +1,122 @@
-from typing import cast
-from src.schemas.receipt import ReceiptSchema
-from src.services.openai_service import OpenAIVisionService
-from src.utils.currency_resolver import resolve_currency_from_text
+import logging
+from typing import List, Optional, cast
+from src.db.session import AsyncSessionLocal
+from src.db.crud.receipt_crud import get_merchant_currency
+from src.schemas.receipt import ReceiptExtraction, ReceiptSchema
+from src.services.openai_service import OpenAIJsonSchemaResponse, OpenAIVisionService
+from src.utils.currency_resolver import (
+    guess_currency_from_locale,
+    resolve_currency_from_text,
+)
+from src.utils.metrics import metrics
+from src.utils.ttl_cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+# cached marker for merchants without any currency history
+_NO_HISTORY = ""
 
 
 class ReceiptOpenAIProcessor:
+    """
+    OpenAI extraction with a cheapest-first currency resolution.
+
+    When the structured response has no currency, it is resolved from:
+        1. the raw currency token / total line returned in the same response
+        2. earlier receipts from the same merchant
+        3. locale markers printed on the receipt (e.g. 'KDV', 'MwSt')
+        4. a second, OCR-only OpenAI request — the last resort
 
-    def __init__(self, service: OpenAIVisionService):
+    `currency.path.*` counters record which step produced the currency.
+    """
+
+    def __init__(
+        self,
+        service: OpenAIVisionService,
+        merchant_cache_max_entries: int = 5000,
+        merchant_cache_ttl_seconds: float = 3600,
+    ):
         self._svc = service
+        self._merchant_currencies: TTLCache[str] = TTLCache(
+            merchant_cache_max_entries, merchant_cache_ttl_seconds
+        )
 
-    async def analyze_receipt(self, image_url: str) -> ReceiptSchema:
+    async def _merchant_history_currency(self, merchant: Optional[str]) -> Optional[str]:
+        if not merchant:
+            return None
+
+        cached = self._merchant_currencies.get(merchant)
+        if cached is not None:
+            return cached or None
 
-        result = await self._svc.analyze_image_with_schema(
+        try:
+            async with AsyncSessionLocal() as db:
+                currency = await get_merchant_currency(db, merchant)
+        except Exception:
+            logger.warning("Merchant currency lookup failed", exc_info=True)
+            return None
+
+        self._merchant_currencies.set(merchant, currency or _NO_HISTORY)
+        return currency
+
+    async def resolve_currency_without_ocr(
+        self,
+        merchant: Optional[str],
+        texts: List[Optional[str]],
+    ) -> Optional[str]:
+        """
+        Steps 2 and 3 only: merchant history, then locale markers in
+        `merchant` and `texts`. No model request.
+        """
+
+        resolved = await self._merchant_history_currency(merchant)
+        if resolved:
+            metrics.inc("currency.path.merchant_history")
+            return resolved
+
+        resolved = guess_currency_from_locale([merchant] + texts)
+        if resolved:
+            metrics.inc("currency.path.locale")
+        return resolved
+
+    async def _resolve_currency(
+        self,
+        extraction: ReceiptExtraction,
+        image_url: str,
+    ) -> Optional[str]:
+
+        resolved = resolve_currency_from_text(extraction.currency_token or "")
+        if not resolved:
+            resolved = resolve_currency_from_text(extraction.total_line or "")
+        if resolved:
+            metrics.inc("currency.path.token")
+            return resolved
+
+        resolved = await self.resolve_currency_without_ocr(
+            extraction.merchant,
+            [extraction.total_line] + [item.name for item in extraction.items or []],
+        )
+        if resolved:
+            return resolved
+
+        visible_text = await self._svc.extract_visible_text(image_url=image_url)
+        resolved = resolve_currency_from_text(visible_text)
+        metrics.inc("currency.path.ocr" if resolved else "currency.path.unresolved")
+
+        return resolved
+
+    async def extract_response(self, image_url: str) -> OpenAIJsonSchemaResponse:
+        """
+        Structured extraction only; the currency may still be missing.
+
+        The response keeps the model's decoded JSON (`raw`) next to the
+        parsed `ReceiptExtraction` (`model`).
+        """
+
+        return await self._svc.analyze_image_with_schema(
             image_url=image_url,
-            schema_model=ReceiptSchema,
+            schema_model=ReceiptExtraction,
             system_prompt=(
                 "You are a strictly factual receipt extraction engine.\n"
                 "You must populate ONLY the fields defined in the provided schema.\n"
@@ -29,18 +132,46 @@ class ReceiptOpenAIProcessor:
             user_prompt="Extract receipt data using the provided schema.",
         )
 
-        if result.model is None:
-            return ReceiptSchema(source="openai")
+    async def extract(self, image_url: str) -> Optional[ReceiptExtraction]:
+        result = await self.extract_response(image_url)
+        return cast(Optional[ReceiptExtraction], result.model)
 
-        model: ReceiptSchema = cast(ReceiptSchema, result.model)
+    @staticmethod
+    def to_receipt(extraction: Optional[ReceiptExtraction]) -> ReceiptSchema:
+        if extraction is None:
+            return ReceiptSchema(source="openai")
 
+        model = ReceiptSchema.model_validate(
+            extraction.model_dump(exclude={"currency_token", "total_line"})
+        )
         model.source = "openai"
+        return model
+
+    async def complete_currency(
+        self,
+        model: ReceiptSchema,
+        extraction: Optional[ReceiptExtraction],
+        image_url: str,
+    ) -> None:
+        """
+        Fill `model.currency` when the structured extraction left it empty.
+
+        Independent of item categorization, so both can run concurrently.
+        """
+
+        if extraction is None:
+            return
+
+        if model.currency:
+            metrics.inc("currency.path.model")
+        else:
+            model.currency = await self._resolve_currency(extraction, image_url)
+
+    async def analyze_receipt(self, image_url: str) -> ReceiptSchema:
 
-        if not model.currency:
-            visible_text = await self._svc.extract_visible_text(image_url=image_url)
-            resolved = resolve_currency_from_text(visible_text)
+        extraction = await self.extract(image_url)
+        model = self.to_receipt(extraction)
 
-            if resolved:
-                model.currency = resolved
+        await self.complete_currency(model, extraction, image_url)
 
         return model
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from fastapi import UploadFile, HTTPException
+
+from src.settings import settings
+
+from src.services.ingestion_queue import (
+    IngestionQueue,
+    QueueFullError,
+    SqliteJobStore,
+)
+
+from src.logic.receipt_processor import process_receipt_bytes
+
+from src.schemas.engine import Engine
+from src.schemas.job import ReceiptJobAccepted, ReceiptJobStatusResponse
+
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_JOB_KIND = "receipt"
+
+ingestion_queue = IngestionQueue(
+    store=SqliteJobStore(settings.INGESTION_JOB_STORE_PATH),
+    workers=settings.INGESTION_WORKERS,
+    maxsize=settings.INGESTION_QUEUE_MAXSIZE,
+    retention_seconds=settings.INGESTION_JOB_RETENTION_SECONDS,
+)
+
+
+async def submit_receipt_job_logic(
+    file: UploadFile,
+    method: Engine,
+    user_id: int,
+) -> ReceiptJobAccepted:
+    """
+    Accept an upload and queue the receipt pipeline for background execution.
+    """
+
+    if not file.filename or file.filename.strip() == "":
+        raise HTTPException(status_code=400, detail="File has no name")
+
+    # read now — the UploadFile is closed once the request completes
+    file_bytes = await file.read()
+    filename = file.filename
+
+    async def run():
+        return await process_receipt_bytes(
+            file_bytes,
+            filename,
+            method,
+            user_id,
+        )
+
+    try:
+        job = await ingestion_queue.submit(
+            owner_id=user_id,
+            kind=RECEIPT_JOB_KIND,
+            handler=run,
+        )
+    except QueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Receipt ingestion queue is full, retry later",
+        )
+
+    return ReceiptJobAccepted(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/api/receipts/jobs/{job.id}",
+    )
+
+
+async def get_receipt_job_logic(
+    user_id: int,
+    job_id: str,
+) -> ReceiptJobStatusResponse:
+
+    job = await asyncio.to_thread(ingestion_queue.store.get, job_id)
+
+    if not job or job.owner_id != user_id or job.kind != RECEIPT_JOB_KIND:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job with id={job_id} not found",
+        )
+
+    return ReceiptJobStatusResponse(
+        job_id=job.id,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        result=job.result,  # type: ignore[arg-type]
+        error=job.error,
+    )
@@ -1,109 +1,318 @@
-from fastapi import UploadFile, HTTPException
-from typing import Union
-from sqlalchemy.orm import Session
+import asyncio
+import logging
+from contextlib import contextmanager
+from fastapi import UploadFile, HTTPException, Response
+from datetime import date, datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.schemas.engine import Engine
-from src.schemas.user_info import UserInfo
+from src.schemas.engine import CompareChoice, Engine
 from src.schemas.receipt import (
     ReceiptSchema,
     ReceiptAnalysisResponse,
     ReceiptCompareResponse,
+    ReceiptBatchResponse,
+    ReceiptListPage,
+    ReceiptListSchema,
+    ReceiptDetailSchema,
 )
+from src.settings import settings
+from src.utils.metrics import metrics
+from src.utils.pagination import encode_cursor, decode_cursor
+from src.utils.conditional_get import entity_tag, http_date, is_not_modified
+from src.utils.progress import format_sse, start_progress
 
 from src.db.crud.receipt_crud import (
-    get_receipts_by_user,
-    get_receipts_by_user_and_source,
+    list_receipts_page,
+    get_receipt_version,
     read_receipt_by_id_for_user,
     update_receipt,
     delete_receipt,
 )
 
-from src.logic.receipt_processor import process_receipt
-from src.logic.user_resolver import resolve_user
+from src.logic.receipt_processor import (
+    ComparisonAlreadyPromoted,
+    process_receipt,
+    process_receipt_batch,
+    process_receipt_bytes,
+    promote_comparison,
+)
+from src.services.document_intelligence_service import DocumentAnalysisTimeout
+from src.services.engine_guard import EngineUnavailable
+
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def engine_errors_as_http() -> Iterator[None]:
+    try:
+        yield
+    except DocumentAnalysisTimeout:
+        raise HTTPException(status_code=504, detail="Receipt analysis timed out")
+    except EngineUnavailable as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=f"{exc}, retry later",
+            headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+        )
 
 
 async def handle_receipt_logic(
     file: UploadFile,
     method: Engine,
-    db: Session,
-    user_info: UserInfo,
+    user_id: int,
 ) -> Union[ReceiptAnalysisResponse, ReceiptCompareResponse]:
 
     if not file.filename or file.filename.strip() == "":
         raise HTTPException(status_code=400, detail="File has no name")
 
-    user = resolve_user(db, user_info)
+    with engine_errors_as_http():
+        return await process_receipt(
+            file,
+            method,
+            user_id,
+        )
+
+
+async def handle_receipt_stream_logic(
+    file: UploadFile,
+    method: Engine,
+    user_id: int,
+) -> AsyncIterator[str]:
+    """
+    Validate and read the upload, then return its server-sent event stream.
+
+    The file is read here because the UploadFile is closed once the
+    endpoint returns, before the stream is consumed.
+    """
+
+    if not file.filename or file.filename.strip() == "":
+        raise HTTPException(status_code=400, detail="File has no name")
+
+    return stream_receipt_events(await file.read(), file.filename, method, user_id)
+
+
+async def stream_receipt_events(
+    file_bytes: bytes,
+    filename: Optional[str],
+    method: Engine,
+    user_id: int,
+) -> AsyncIterator[str]:
+    """
+    Run the receipt pipeline, yielding an SSE frame per finished stage.
+
+    Progress events (`uploaded`, `di_done`, `openai_done`, `diff_ready`,
+    `categories_assigned`, `saved`) are followed by one `result` event
+    with the same body `POST /api/receipts` returns, or an `error` event
+    with `status` and `detail`. A client that disconnects cancels the
+    pipeline.
+    """
+
+    queue = start_progress()
+
+    async def run() -> Union[ReceiptAnalysisResponse, ReceiptCompareResponse]:
+        with engine_errors_as_http():
+            return await process_receipt_bytes(file_bytes, filename, method, user_id)
+
+    task = asyncio.create_task(run())
+    next_event: Optional[asyncio.Future] = None
+
+    try:
+        while True:
+            if next_event is None:
+                next_event = asyncio.ensure_future(queue.get())
+
+            done, _ = await asyncio.wait(
+                {next_event, task},
+                timeout=settings.RECEIPT_STREAM_KEEPALIVE_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            if next_event in done:
+                yield format_sse(*next_event.result())
+                next_event = None
+            elif task in done:
+                break
+            else:
+                yield ": keep-alive\n\n"
+
+        # events emitted right before the pipeline returned
+        while not queue.empty():
+            yield format_sse(*queue.get_nowait())
+
+        try:
+            response = task.result()
+        except HTTPException as exc:
+            yield format_sse("error", {"status": exc.status_code, "detail": exc.detail})
+            return
+        except Exception:
+            logger.exception("Streaming receipt upload failed")
+            yield format_sse("error", {"status": 500, "detail": "Internal Server Error"})
+            return
+
+        yield format_sse("result", response.model_dump(mode="json"))
+    finally:
+        if next_event is not None:
+            next_event.cancel()
+        if not task.done():
+            task.cancel()
+            metrics.inc("requests.client_disconnected")
+
+
+async def handle_receipt_batch_logic(
+    files: List[UploadFile],
+    method: Engine,
+    user_id: int,
+) -> ReceiptBatchResponse:
+
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+
+    if len(files) > settings.BATCH_UPLOAD_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files (max {settings.BATCH_UPLOAD_MAX_FILES})",
+        )
+
+    if any(not file.filename or file.filename.strip() == "" for file in files):
+        raise HTTPException(status_code=400, detail="File has no name")
+
+    contents = [(file.filename, await file.read()) for file in files]
 
-    return await process_receipt(
-        file,
+    return await process_receipt_batch(
+        contents,
         method,
-        db,
-        user.id,
+        user_id,
     )
 
 
-def list_receipts_logic(
-    db: Session,
-    user_info: UserInfo,
+async def promote_comparison_logic(
+    user_id: int,
+    comparison_id: int,
+    choice: CompareChoice,
+) -> ReceiptAnalysisResponse:
+
+    try:
+        return await promote_comparison(comparison_id, user_id, choice)
+    except ComparisonAlreadyPromoted as exc:
+        detail = str(exc) if exc.receipt_id is None else f"{exc} (id={exc.receipt_id})"
+        raise HTTPException(status_code=409, detail=detail)
+
+
+async def list_receipts_logic(
+    db: AsyncSession,
+    user_id: int,
     source: Engine | None,
-):
+    limit: int,
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    merchant: Optional[str] = None,
+    currency: Optional[str] = None,
+) -> ReceiptListPage:
 
-    user = resolve_user(db, user_info)
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from is after date_to")
 
-    if source:
-        return get_receipts_by_user_and_source(
-            db,
-            user.id,
-            source.value,
-        )
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    return get_receipts_by_user(db, user.id)
+    limit = min(limit, settings.RECEIPTS_PAGE_SIZE_MAX)
 
+    # one extra row tells us whether another page exists
+    rows = await list_receipts_page(
+        db,
+        user_id,
+        limit=limit + 1,
+        after=after,
+        source=source.value if source else None,
+        date_from=date_from,
+        date_to=date_to,
+        merchant=merchant,
+        currency=currency.upper() if currency else None,
+    )
+
+    items = [ReceiptListSchema.model_validate(row) for row in rows[:limit]]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return ReceiptListPage(items=items, next_cursor=next_cursor)
+
+
+def receipt_validators(receipt_id: int, version: int, updated_at: datetime) -> Dict[str, str]:
+    return {
+        "ETag": entity_tag("receipt", receipt_id, version),
+        "Last-Modified": http_date(updated_at),
+        # cache, but always revalidate: edits must show up at once
+        "Cache-Control": "private, no-cache",
+    }
 
-def get_receipt_logic(
-    db: Session,
-    user_info: UserInfo,
+
+async def get_receipt_logic(
+    db: AsyncSession,
+    user_id: int,
     receipt_id: int,
-):
+    response: Response,
+    if_none_match: Optional[str] = None,
+    if_modified_since: Optional[str] = None,
+) -> Union[ReceiptDetailSchema, Response]:
+    """
+    Receipt detail with ETag / Last-Modified validators.
+
+    A conditional request for an unchanged receipt is answered with 304
+    after reading only its version: no items are loaded or serialized.
+    """
+
+    if if_none_match is not None or if_modified_since is not None:
+        version, updated_at = await get_receipt_version(db, receipt_id, user_id)
+        headers = receipt_validators(receipt_id, version, updated_at)
 
-    user = resolve_user(db, user_info)
+        if is_not_modified(if_none_match, if_modified_since, headers["ETag"], updated_at):
+            metrics.inc("receipts.detail.not_modified")
+            return Response(status_code=304, headers=headers)
 
-    return read_receipt_by_id_for_user(
+    receipt = await read_receipt_by_id_for_user(
         db,
         receipt_id,
-        user.id,
+        user_id,
     )
 
+    # validators of what is actually sent, even if it changed meanwhile
+    response.headers.update(receipt_validators(receipt_id, receipt.version, receipt.updated_at))
+    return receipt
 
-def update_receipt_logic(
-    db: Session,
-    user_info: UserInfo,
+
+async def update_receipt_logic(
+    db: AsyncSession,
+    user_id: int,
     receipt_id: int,
     updated_data: ReceiptSchema,
 ):
 
-    user = resolve_user(db, user_info)
-
-    return update_receipt(
+    return await update_receipt(
         db,
         receipt_id,
-        user.id,
+        user_id,
         updated_data,
     )
 
 
-def delete_receipt_logic(
-    db: Session,
-    user_info: UserInfo,
+async def delete_receipt_logic(
+    db: AsyncSession,
+    user_id: int,
     receipt_id: int,
 ):
 
-    user = resolve_user(db, user_info)
-
-    delete_receipt(
+    await delete_receipt(
         db,
         receipt_id,
-        user.id,
+        user_id,
     )
 
     return {"message": "Receipt deleted successfully"}
@@ -1,49 +1,137 @@
 import os
 import time
 import uuid
+import mimetypes
 import asyncio
 import logging
-from typing import Union
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Tuple, Union, cast
+from pydantic import BaseModel
 from fastapi import UploadFile
 
 from src.settings import settings
 
-from src.db.crud.receipt_crud import save_receipt
+from src.db.session import AsyncSessionLocal
+from src.db.crud.receipt_crud import add_receipt, save_receipt, save_receipts
+from src.db.crud.receipt_comparison_crud import (
+    claim_comparison,
+    get_comparison_for_user,
+    save_comparisons,
+)
+from src.db.crud.receipt_raw_output_crud import decompress_payload
 
-from src.services.blob_storage_service import blob_storage
+from src.services.blob_storage_service import async_blob_storage
 from src.services.document_intelligence_service import DocumentIntelligenceService
-from src.services.openai_service import OpenAIVisionService
+from src.services.engine_guard import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    EngineGuard,
+    RetryBudget,
+)
+from src.services.openai_service import OpenAIVisionService, encode_image_data_url
 
 from src.logic.receipt_normalizer import normalize_di_receipt
 from src.logic.receipt_compare import build_diff
+from src.logic import engine_router
+from src.logic.engine_router import MerchantEngineHistory
 from src.logic.receipt_extractor import ReceiptOpenAIProcessor
 from src.logic.expense_classifier import ExpenseClassifier
+from src.logic.analysis_cache import analysis_cache, content_hash
+from src.logic.image_preprocessor import ImagePreprocessor, PreprocessedImage
 
-from src.schemas.engine import Engine
+from src.utils.metrics import metrics
+from src.utils.progress import emit_progress
+from src.utils.server_timing import record_server_timing
+from src.utils.stage_graph import StageGraph
+
+from src.schemas.engine import CompareChoice, Engine
 from src.schemas.receipt import (
+    ReceiptExtraction,
     ReceiptSchema,
     ReceiptAnalysisResponse,
     ReceiptCompareResponse,
     ReceiptCompareAnalysis,
+    ReceiptBatchItemResult,
+    ReceiptBatchResponse,
 )
 
 
 logger = logging.getLogger(__name__)
 
+retry_budget = RetryBudget(ratio=settings.ENGINE_RETRY_BUDGET_RATIO)
+
+
+def build_engine_guard(engine: Engine) -> EngineGuard:
+    return EngineGuard(
+        engine.value,
+        limiter=AdaptiveLimiter(
+            initial=settings.ENGINE_CONCURRENCY_INITIAL,
+            minimum=settings.ENGINE_CONCURRENCY_MIN,
+            maximum=settings.ENGINE_CONCURRENCY_MAX,
+        ),
+        breaker=CircuitBreaker(
+            failure_threshold=settings.ENGINE_BREAKER_FAILURES,
+            reset_seconds=settings.ENGINE_BREAKER_RESET_SECONDS,
+        ),
+        budget=retry_budget,
+        max_attempts=settings.ENGINE_MAX_ATTEMPTS,
+    )
+
+
+engine_guards = {
+    Engine.di: build_engine_guard(Engine.di),
+    Engine.openai: build_engine_guard(Engine.openai),
+}
+
 di_service = DocumentIntelligenceService(
     endpoint=settings.AZURE_DI_ENDPOINT,
     api_key=settings.AZURE_DI_KEY,
+    poll_initial_seconds=settings.DI_POLL_INITIAL_SECONDS,
+    poll_max_seconds=settings.DI_POLL_MAX_SECONDS,
+    poll_backoff=settings.DI_POLL_BACKOFF,
+    deadline_seconds=settings.DI_DEADLINE_SECONDS,
+    guard=engine_guards[Engine.di],
 )
 
 oai_service = OpenAIVisionService(
     endpoint=settings.AZURE_OPENAI_ENDPOINT,
     api_key=settings.AZURE_OPENAI_KEY,
     deployment=settings.AZURE_OPENAI_DEPLOYMENT,
+    guard=engine_guards[Engine.openai],
+)
+
+processor = ReceiptOpenAIProcessor(
+    oai_service,
+    merchant_cache_max_entries=settings.CURRENCY_MERCHANT_CACHE_MAX_ENTRIES,
+    merchant_cache_ttl_seconds=settings.CURRENCY_MERCHANT_CACHE_TTL_SECONDS,
+)
+expense_classifier = ExpenseClassifier(
+    oai_service,
+    batch_size=settings.CLASSIFIER_BATCH_SIZE,
+    batch_wait_seconds=settings.CLASSIFIER_BATCH_WAIT_MS / 1000,
+    memo_max_entries=settings.CLASSIFIER_MEMO_MAX_ENTRIES,
+    memo_ttl_seconds=settings.CLASSIFIER_MEMO_TTL_SECONDS,
+    local_min_confidence=settings.CLASSIFIER_LOCAL_MIN_CONFIDENCE,
+    local_refresh_seconds=settings.CLASSIFIER_LOCAL_REFRESH_SECONDS,
+    local_max_rows=settings.CLASSIFIER_LOCAL_MAX_ROWS,
+)
+
+merchant_engine_history = MerchantEngineHistory(
+    min_comparisons=settings.AUTO_WEAK_MERCHANT_MIN_COMPARISONS,
+    max_disagreement_rate=settings.AUTO_WEAK_MERCHANT_DISAGREEMENT_RATE,
 )
 
-processor = ReceiptOpenAIProcessor(oai_service)
-expense_classifier = ExpenseClassifier(oai_service)
+image_preprocessor = ImagePreprocessor(
+    workers=settings.IMAGE_PREPROCESS_WORKERS,
+    grayscale=settings.IMAGE_PREPROCESS_GRAYSCALE,
+    jpeg_quality=settings.IMAGE_PREPROCESS_JPEG_QUALITY,
+)
+
+ENGINE_MAX_DIMENSION = {
+    Engine.di: settings.IMAGE_MAX_DIMENSION_DI,
+    Engine.openai: settings.IMAGE_MAX_DIMENSION_OPENAI,
+    # DI reads it first; an escalation reuses the same image
+    Engine.auto: max(settings.IMAGE_MAX_DIMENSION_DI, settings.IMAGE_MAX_DIMENSION_OPENAI),
+}
 
 
 async def enrich_items_with_categories(analysis: ReceiptSchema):
@@ -52,96 +140,774 @@ async def enrich_items_with_categories(analysis: ReceiptSchema):
 
     item_names = [item.name for item in analysis.items if item.name]
 
-    category_map = await expense_classifier.classify_items(
-        items=item_names,
-        merchant=analysis.merchant,
-    )
+    try:
+        classified = await expense_classifier.classify(
+            items=item_names,
+            merchant=analysis.merchant,
+        )
+    except Exception:
+        # categories are an enrichment; the receipt is still worth saving
+        logger.warning("Item categorization failed", exc_info=True)
+        return
 
     for item in analysis.items:
-        if item.name and item.name in category_map:
-            item.category = category_map[item.name]
+        if item.name and item.name in classified:
+            result = classified[item.name]
+            item.category = result.category
+            item.category_source = result.source
+            item.category_confidence = result.confidence
+
+
+async def categorize_if_needed(analysis: ReceiptSchema) -> bool:
+    """
+    Categorize items unless they already carry categories (cache hits).
+
+    Entries cached by compare mode before it categorized items have none.
+    """
+    if not analysis.items or any(item.category for item in analysis.items):
+        return False
+
+    await enrich_items_with_categories(analysis)
+    return True
+
+
+def emit_analysis(event: str, engine: Engine, analysis: ReceiptSchema) -> None:
+    """Stream an engine's (possibly partial) result to the client, if any."""
+    emit_progress(
+        event,
+        {"engine": engine.value, "analysis": analysis.model_dump(mode="json")},
+    )
 
 
 async def process_receipt(
     file: UploadFile,
     method: Engine,
-    db: Session,
     user_id: int,
 ) -> Union[ReceiptAnalysisResponse, ReceiptCompareResponse]:
 
     file_bytes = await file.read()
 
-    name, ext = os.path.splitext(file.filename or "receipt.jpg")
-    new_name = f"{int(time.time())}_{uuid.uuid4().hex}{ext}"
+    return await process_receipt_bytes(
+        file_bytes,
+        file.filename,
+        method,
+        user_id,
+    )
 
-    blob_url = blob_storage.upload_bytes(new_name, file_bytes)
-    sas_url = blob_storage.generate_read_sas(new_name)
 
-    if method == Engine.di:
+class AnalyzedUpload(BaseModel):
+    """
+    Result of the engine stages for one uploaded file, before persistence.
+    """
 
-        raw_result = await di_service.analyze_receipt(sas_url)
-        analysis = normalize_di_receipt(raw_result)
+    file_saved_as: str
+    blob_url: str
+    sas_url: str
+    # what the engines read: the optimized variant when there is one
+    engine_url: str
+    optimized_file: Optional[str] = None
+    method: Engine
+    analysis: Optional[ReceiptSchema] = None
+    compare: Optional[ReceiptCompareAnalysis] = None
+    # engine outputs before normalization, by engine (see `ReceiptRawOutput`)
+    raw_outputs: Dict[str, Any] = {}
 
-        await enrich_items_with_categories(analysis)
 
-        try:
-            saved_receipt = save_receipt(db, analysis, user_id, sas_url)
-        except Exception:
-            logger.exception("Failed to persist receipt")
-            raise
-
-        return ReceiptAnalysisResponse(
-            id=saved_receipt.id,
-            file_saved_as=new_name,
-            blob_url=blob_url,
-            method="di",
-            analysis=analysis,
-        )
+# (analysis, raw extraction, image URL the extraction used)
+OpenAIStageResult = Tuple[ReceiptSchema, Optional[ReceiptExtraction], Optional[str]]
 
-    elif method == Engine.openai:
+# (analysis, DI field confidences)
+DIStageResult = Tuple[ReceiptSchema, Dict[str, Optional[float]]]
 
-        analysis = await processor.analyze_receipt(sas_url)
 
-        await enrich_items_with_categories(analysis)
+async def preprocess_for_engines(
+    file_bytes: bytes,
+    engines: List[Engine],
+) -> Optional[PreprocessedImage]:
+    """
+    Downscaled, re-encoded copy for the engines to read.
 
-        try:
-            saved_receipt = save_receipt(db, analysis, user_id, sas_url)
-        except Exception:
-            logger.exception("Failed to persist receipt")
-            raise
-
-        return ReceiptAnalysisResponse(
-            id=saved_receipt.id,
-            file_saved_as=new_name,
-            blob_url=blob_url,
-            method="openai",
-            analysis=analysis,
+    Returns None when the original should be used (preprocessing
+    disabled, not an image, or no size gain).
+    """
+
+    if not settings.IMAGE_PREPROCESS_ENABLED:
+        return None
+
+    return await image_preprocessor.preprocess(
+        file_bytes,
+        max_dimension=max(ENGINE_MAX_DIMENSION[engine] for engine in engines),
+    )
+
+
+def route_compare() -> Engine:
+    """
+    Engine to run for a compare request.
+
+    Compare needs both engines; while one of them is failing fast (circuit
+    breaker open), the healthy one runs alone and the upload is handled as
+    a regular single-engine receipt instead of failing.
+    """
+
+    degraded = [engine for engine, guard in engine_guards.items() if not guard.available]
+    if len(degraded) != 1:
+        return Engine.compare
+
+    healthy = Engine.openai if degraded[0] == Engine.di else Engine.di
+    metrics.inc("engine.compare_degraded")
+    logger.warning(
+        "%s is degraded, running compare request on %s only",
+        degraded[0].value,
+        healthy.value,
+    )
+    return healthy
+
+
+async def auto_escalation_reasons(
+    analysis: ReceiptSchema,
+    confidence: Dict[str, Optional[float]],
+) -> List[str]:
+    """
+    Why an `auto` receipt needs OpenAI as well; empty when DI is enough.
+
+    A missing currency is first resolved like OpenAI's (merchant history,
+    locale markers) and only escalates when that fails.
+    """
+
+    reasons = engine_router.di_weak_fields(
+        analysis, confidence, settings.AUTO_MIN_FIELD_CONFIDENCE
+    )
+
+    if "currency" in reasons:
+        analysis.currency = await processor.resolve_currency_without_ocr(
+            analysis.merchant,
+            [item.name for item in analysis.items or []],
         )
+        if analysis.currency:
+            reasons.remove("currency")
+
+    if await merchant_engine_history.di_is_weak(analysis.merchant):
+        reasons.append(engine_router.MERCHANT_HISTORY)
 
-    elif method == Engine.compare:
+    return reasons
+
+
+async def analyze_receipt_bytes(
+    file_bytes: bytes,
+    filename: Optional[str],
+    method: Engine,
+) -> AnalyzedUpload:
+    """
+    Upload the file and run the selected engine(s) on it.
+
+    Does not use the caller's database session, so many uploads can be
+    analyzed concurrently and persisted together afterwards.
+
+    Identical content seen before (same SHA-256 and engine) reuses the
+    cached analysis and its existing blob: no upload and no engine call.
+
+    The work is a `StageGraph`; each stage starts as soon as its inputs
+    are ready:
+
+        upload
+        preprocess ─┬─ upload_optimized
+                    ├─ di ─── classify_di ─── cache_di
+                    └─ openai ─┬─ currency ─────────┬─ cache_openai
+                               └─ classify_openai ──┘
+
+    and for `auto`, where OpenAI runs only if `route` finds DI lacking:
+
+        preprocess ─── di ─── route ─── openai ─── merge ─── classify_auto ─── cache_auto
+
+    Engines receive the image inline (DI bytes, OpenAI data URL) so they
+    do not wait for the archival upload; they fall back to a SAS URL when
+    inline sending is disabled or the image is too large. Stage timings
+    are logged and added to the request's Server-Timing header, and each
+    engine's result is emitted as a progress event as soon as it exists
+    (see `src.utils.progress`), so a streaming client sees the faster
+    engine's receipt before the slower one finishes.
+
+    A compare request runs a single engine while the other is degraded
+    (see `route_compare`); the result then carries that engine's method.
+
+    The engines' outputs before normalization are kept in `raw_outputs`
+    (nothing for cached results), so the receipt can be re-normalized
+    later without calling them again.
+    """
+
+    if method not in (Engine.di, Engine.openai, Engine.compare, Engine.auto):
+        raise ValueError(
+            f"Unsupported receipt processing method: {method!r}. "
+            "Supported methods are: 'di', 'openai', 'compare' and 'auto'."
+        )
 
-        di_task = di_service.analyze_receipt(sas_url)
-        oai_task = processor.analyze_receipt(sas_url)
+    if method == Engine.compare:
+        method = route_compare()
+
+    digest = content_hash(file_bytes)
+
+    engines = [Engine.di, Engine.openai] if method == Engine.compare else [method]
+    cached = {engine: await analysis_cache.lookup(digest, engine) for engine in engines}
+    reusable = next((c for c in cached.values() if c is not None), None)
+
+    name, ext = os.path.splitext(filename or "receipt.jpg")
+    stem = f"{int(time.time())}_{uuid.uuid4().hex}"
+
+    graph = StageGraph()
+    raw_outputs: Dict[str, Any] = {}
+
+    # ----- storage -----
+
+    async def preprocess() -> Optional[PreprocessedImage]:
+        if reusable is not None:
+            return None
+        return await preprocess_for_engines(file_bytes, engines)
+
+    async def upload() -> Tuple[str, str]:
+        if reusable is not None:
+            metrics.inc("analysis_cache.blob_uploads_saved")
+            new_name, blob_url = reusable.blob_name, reusable.blob_url
+        else:
+            new_name = f"{stem}{ext}"
+            blob_url = await async_blob_storage.upload_bytes(new_name, file_bytes)
+
+        emit_progress("uploaded", {"file_saved_as": new_name, "blob_url": blob_url})
+        return new_name, blob_url
+
+    async def upload_optimized(preprocess: Optional[PreprocessedImage]) -> Optional[str]:
+        if preprocess is None:
+            return None
+
+        optimized_name = f"{stem}_optimized.jpg"
+        await async_blob_storage.upload_bytes(optimized_name, preprocess.data)
+        return optimized_name
+
+    graph.add("preprocess", preprocess)
+    graph.add("upload", upload)
+    graph.add("upload_optimized", upload_optimized, after=["preprocess"])
+
+    async def engine_sas_url() -> str:
+        new_name, _ = await graph.result("upload")
+        optimized_name = await graph.result("upload_optimized")
+        return async_blob_storage.generate_read_sas(optimized_name or new_name)
+
+    def engine_image(optimized: Optional[PreprocessedImage]) -> Tuple[bytes, str]:
+        if optimized is not None:
+            return optimized.data, optimized.content_type
+        return file_bytes, mimetypes.guess_type(filename or "")[0] or "image/jpeg"
+
+    async def run_di(optimized: Optional[PreprocessedImage]) -> Dict[str, Any]:
+        data, _ = engine_image(optimized)
+        if settings.DI_SEND_BYTES and len(data) <= settings.DI_SEND_BYTES_MAX:
+            metrics.inc("di.inline_documents")
+            raw_result = await di_service.analyze_receipt(data=data)
+        else:
+            raw_result = await di_service.analyze_receipt(await engine_sas_url())
+
+        raw_outputs[Engine.di.value] = raw_result
+        return raw_result
+
+    async def openai_image_url(optimized: Optional[PreprocessedImage]) -> str:
+        if settings.OPENAI_INLINE_IMAGES:
+            data, content_type = engine_image(optimized)
+            if len(data) <= settings.OPENAI_INLINE_MAX_BYTES:
+                metrics.inc("openai.inline_images")
+                return encode_image_data_url(data, content_type)
+
+        return await engine_sas_url()
+
+    async def run_openai(optimized: Optional[PreprocessedImage]) -> OpenAIStageResult:
+        image_url = await openai_image_url(optimized)
+        response = await processor.extract_response(image_url)
+        raw_outputs[Engine.openai.value] = response.raw
+
+        extraction = cast(Optional[ReceiptExtraction], response.model)
+        return processor.to_receipt(extraction), extraction, image_url
+
+    async def remember(engine: Engine, analysis: ReceiptSchema, replace: bool) -> None:
+        new_name, blob_url = await graph.result("upload")
+        await analysis_cache.store(
+            digest, engine, new_name, blob_url, analysis, replace=replace
+        )
 
-        raw_di, oai_model = await asyncio.gather(di_task, oai_task)
+    # compare entries never replace single-engine ones
+    replace = method != Engine.compare
+
+    # ----- Document Intelligence -----
+
+    if Engine.di in engines:
+        hit = cached[Engine.di]
+
+        async def di(preprocess: Optional[PreprocessedImage]) -> ReceiptSchema:
+            analysis = hit.analysis if hit is not None else normalize_di_receipt(
+                await run_di(preprocess)
+            )
+            emit_analysis("di_done", Engine.di, analysis)
+            return analysis
+
+        async def classify_di(di: ReceiptSchema) -> bool:
+            categorized = await categorize_if_needed(di)
+            emit_analysis("categories_assigned", Engine.di, di)
+            return categorized
+
+        async def cache_di(di: ReceiptSchema, classify_di: bool) -> None:
+            if hit is None or classify_di:
+                await remember(Engine.di, di, replace)
+
+        graph.add("di", di, after=["preprocess"])
+        graph.add("classify_di", classify_di, after=["di"])
+        graph.add("cache_di", cache_di, after=["di", "classify_di"])
+
+    # ----- OpenAI -----
+
+    if Engine.openai in engines:
+        oai_hit = cached[Engine.openai]
+
+        async def openai(
+            preprocess: Optional[PreprocessedImage],
+        ) -> OpenAIStageResult:
+            if oai_hit is not None:
+                return oai_hit.analysis, None, None
+
+            return await run_openai(preprocess)
+
+        async def currency(openai: OpenAIStageResult) -> None:
+            model, extraction, image_url = openai
+            if extraction is not None:
+                await processor.complete_currency(model, extraction, image_url)
+            emit_analysis("openai_done", Engine.openai, model)
+
+        async def classify_openai(openai: OpenAIStageResult) -> bool:
+            categorized = await categorize_if_needed(openai[0])
+            emit_analysis("categories_assigned", Engine.openai, openai[0])
+            return categorized
+
+        async def cache_openai(
+            openai: OpenAIStageResult,
+            currency: None,
+            classify_openai: bool,
+        ) -> None:
+            if oai_hit is None or classify_openai:
+                await remember(Engine.openai, openai[0], replace)
+
+        graph.add("openai", openai, after=["preprocess"])
+        graph.add("currency", currency, after=["openai"])
+        graph.add("classify_openai", classify_openai, after=["openai"])
+        graph.add(
+            "cache_openai",
+            cache_openai,
+            after=["openai", "currency", "classify_openai"],
+        )
 
-        di_model = normalize_di_receipt(raw_di)
+    # ----- auto: DI first, OpenAI only when DI is not enough -----
+
+    if method == Engine.auto:
+        auto_hit = cached[Engine.auto]
+
+        async def di(preprocess: Optional[PreprocessedImage]) -> Optional[DIStageResult]:
+            if auto_hit is not None:
+                return None
+
+            raw_result = await run_di(preprocess)
+            analysis = normalize_di_receipt(raw_result)
+            emit_analysis("di_done", Engine.di, analysis)
+            return analysis, raw_result.get("confidence") or {}
+
+        async def route(di: Optional[DIStageResult]) -> List[str]:
+            if di is None:
+                return []
+
+            reasons = await auto_escalation_reasons(*di)
+            for reason in reasons:
+                metrics.inc(f"engine.auto.reason.{reason}")
+            return reasons
+
+        async def openai(
+            preprocess: Optional[PreprocessedImage],
+            route: List[str],
+        ) -> Optional[ReceiptSchema]:
+            if not route:
+                return None
+
+            if not engine_guards[Engine.openai].available:
+                metrics.inc("engine.auto.escalation_skipped")
+                return None
+
+            try:
+                model, extraction, image_url = await run_openai(preprocess)
+                await processor.complete_currency(model, extraction, image_url)
+            except Exception:
+                # DI's answer is still a usable receipt
+                logger.warning("OpenAI escalation failed, keeping DI result", exc_info=True)
+                metrics.inc("engine.auto.escalation_failed")
+                raw_outputs.pop(Engine.openai.value, None)
+                return None
+
+            emit_analysis("openai_done", Engine.openai, model)
+            return model
+
+        async def merge(
+            di: Optional[DIStageResult],
+            route: List[str],
+            openai: Optional[ReceiptSchema],
+        ) -> ReceiptSchema:
+            if auto_hit is not None:
+                return auto_hit.analysis
+
+            assert di is not None
+            di_model, _ = di
+
+            if openai is None:
+                metrics.inc("engine.auto.di_only")
+                # a skipped or failed escalation is not a comparison
+                if not route:
+                    await merchant_engine_history.record_di_only(di_model.merchant)
+                return di_model
+
+            metrics.inc("engine.auto.escalated")
+            # what `merge_receipts` needs to merge the raw outputs again
+            raw_outputs[Engine.auto.value] = {"reasons": route}
+            await merchant_engine_history.record(
+                di_model.merchant or openai.merchant,
+                build_diff(di=di_model, openai=openai),
+            )
+            return engine_router.merge_receipts(di_model, openai, route)
+
+        async def classify_auto(merge: ReceiptSchema) -> bool:
+            categorized = await categorize_if_needed(merge)
+            emit_analysis("categories_assigned", Engine.auto, merge)
+            return categorized
+
+        async def cache_auto(merge: ReceiptSchema, classify_auto: bool) -> None:
+            if auto_hit is None or classify_auto:
+                await remember(Engine.auto, merge, replace)
+
+        graph.add("di", di, after=["preprocess"])
+        graph.add("route", route, after=["di"])
+        graph.add("openai", openai, after=["preprocess", "route"])
+        graph.add("merge", merge, after=["di", "route", "openai"])
+        graph.add("classify_auto", classify_auto, after=["merge"])
+        graph.add("cache_auto", cache_auto, after=["merge", "classify_auto"])
+
+    results = await graph.run()
+
+    logger.info(
+        "Receipt pipeline (%s) stage timings ms: %s",
+        method.value,
+        {stage: round(ms, 1) for stage, ms in graph.timings.items()},
+    )
+    record_server_timing(graph.timings)
+
+    new_name, blob_url = results["upload"]
+    optimized_name = results["upload_optimized"]
+    sas_url = async_blob_storage.generate_read_sas(new_name)
+
+    upload = AnalyzedUpload(
+        file_saved_as=new_name,
+        blob_url=blob_url,
+        sas_url=sas_url,
+        engine_url=(
+            async_blob_storage.generate_read_sas(optimized_name)
+            if optimized_name
+            else sas_url
+        ),
+        optimized_file=optimized_name,
+        method=method,
+        raw_outputs=raw_outputs,
+    )
 
+    if method == Engine.di:
+        upload.analysis = results["di"]
+    elif method == Engine.openai:
+        upload.analysis = results["openai"][0]
+    elif method == Engine.auto:
+        upload.analysis = results["merge"]
+    else:
+        di_model = results["di"]
+        oai_model = results["openai"][0]
         diff = build_diff(di=di_model, openai=oai_model)
 
+        # repeated uploads of the same file would skew the merchant stats
+        if all(hit is None for hit in cached.values()):
+            await merchant_engine_history.record(di_model.merchant or oai_model.merchant, diff)
+
+        upload.compare = ReceiptCompareAnalysis(
+            di=di_model,
+            openai=oai_model,
+            diff=diff,
+        )
+        emit_progress("diff_ready", {"diff": diff.model_dump(mode="json")})
+
+    return upload
+
+
+def build_receipt_response(
+    upload: AnalyzedUpload,
+    saved_id: Optional[int],
+) -> Union[ReceiptAnalysisResponse, ReceiptCompareResponse]:
+    """
+    `saved_id` is the receipt's id, or the stored comparison's for compare.
+    """
+
+    if upload.compare is not None:
         return ReceiptCompareResponse(
-            file_saved_as=new_name,
-            blob_url=blob_url,
+            id=saved_id,
+            file_saved_as=upload.file_saved_as,
+            blob_url=upload.blob_url,
             method="compare",
-            analysis=ReceiptCompareAnalysis(
-                di=di_model,
-                openai=oai_model,
-                diff=diff,
-            ),
+            analysis=upload.compare,
         )
 
+    assert upload.analysis is not None and saved_id is not None
+
+    return ReceiptAnalysisResponse(
+        id=saved_id,
+        file_saved_as=upload.file_saved_as,
+        blob_url=upload.blob_url,
+        method=upload.method.value,  # type: ignore[arg-type]
+        analysis=upload.analysis,
+    )
+
+
+def stored_raw_outputs(upload: AnalyzedUpload) -> Optional[Dict[str, Any]]:
+    """Raw outputs to persist with the receipt, unless storing them is off."""
+    return upload.raw_outputs if settings.RAW_OUTPUT_STORE_ENABLED else None
+
+
+async def save_compare_results(
+    uploads: List[AnalyzedUpload],
+    user_id: int,
+) -> List[Optional[int]]:
+    """
+    Store compare results so the user can save one as a receipt later
+    (see `promote_comparison`). They are still returned when storing
+    fails, just without an id.
+    """
+
+    try:
+        async with AsyncSessionLocal() as db:
+            return await save_comparisons(  # type: ignore[return-value]
+                db,
+                [
+                    (upload.compare, upload.file_saved_as, upload.blob_url, stored_raw_outputs(upload))  # type: ignore[misc]
+                    for upload in uploads
+                ],
+                user_id,
+            )
+    except Exception:
+        logger.exception("Failed to persist compare results")
+        return [None] * len(uploads)
+
+
+async def process_receipt_bytes(
+    file_bytes: bytes,
+    filename: Optional[str],
+    method: Engine,
+    user_id: int,
+) -> Union[ReceiptAnalysisResponse, ReceiptCompareResponse]:
+    """
+    Run the full receipt pipeline on already-read file content.
+
+    Used directly by background ingestion jobs, which outlive the
+    request's UploadFile.
+
+    A database session is opened only to persist the result, so no
+    pooled connection is held while the engines run.
+    """
+
+    upload = await analyze_receipt_bytes(file_bytes, filename, method)
+
+    if upload.analysis is None:
+        comparison_ids = await save_compare_results([upload], user_id)
+        return build_receipt_response(upload, comparison_ids[0])
+
+    try:
+        async with AsyncSessionLocal() as db:
+            saved_receipt = await save_receipt(
+                db,
+                upload.analysis,
+                user_id,
+                upload.sas_url,
+                raw_outputs=stored_raw_outputs(upload),
+            )
+    except Exception:
+        logger.exception("Failed to persist receipt")
+        raise
+
+    emit_progress("saved", {"id": saved_receipt.id})
+    return build_receipt_response(upload, saved_receipt.id)
+
+
+async def process_receipt_batch(
+    files: List[Tuple[Optional[str], bytes]],
+    method: Engine,
+    user_id: int,
+) -> ReceiptBatchResponse:
+    """
+    Analyze many uploads concurrently and persist them in one transaction.
+
+    At most `BATCH_UPLOAD_CONCURRENCY` files are in flight at once, so a
+    batch takes roughly as long as its slowest receipts instead of the sum
+    of all of them. A failing file does not abort the rest of the batch.
+    Like single uploads, it opens a database session only to persist.
+    """
+
+    semaphore = asyncio.Semaphore(settings.BATCH_UPLOAD_CONCURRENCY)
+
+    async def analyze(filename: Optional[str], file_bytes: bytes) -> AnalyzedUpload:
+        async with semaphore:
+            return await analyze_receipt_bytes(file_bytes, filename, method)
+
+    outcomes = await asyncio.gather(
+        *(analyze(filename, file_bytes) for filename, file_bytes in files),
+        return_exceptions=True,
+    )
+
+    results: List[ReceiptBatchItemResult] = []
+    to_save: List[Tuple[int, AnalyzedUpload]] = []
+    compared: List[Tuple[int, AnalyzedUpload]] = []
+
+    for index, ((filename, _), outcome) in enumerate(zip(files, outcomes)):
+        if isinstance(outcome, BaseException):
+            logger.error("Batch analysis failed for %s: %r", filename, outcome)
+            results.append(
+                ReceiptBatchItemResult(
+                    filename=filename or "",
+                    status="error",
+                    error=str(outcome) or type(outcome).__name__,
+                )
+            )
+            continue
+
+        results.append(
+            ReceiptBatchItemResult(filename=filename or "", status="ok")
+        )
+
+        if outcome.analysis is None:
+            compared.append((index, outcome))
+        else:
+            to_save.append((index, outcome))
+
+    if compared:
+        comparison_ids = await save_compare_results(
+            [upload for _, upload in compared], user_id
+        )
+        for (index, upload), comparison_id in zip(compared, comparison_ids):
+            results[index].result = build_receipt_response(upload, comparison_id)
+
+    if to_save:
+        try:
+            async with AsyncSessionLocal() as db:
+                receipt_ids = await save_receipts(
+                    db,
+                    [(upload.analysis, upload.sas_url) for _, upload in to_save],  # type: ignore[misc]
+                    user_id,
+                    raw_outputs=[stored_raw_outputs(upload) for _, upload in to_save],
+                )
+        except Exception:
+            logger.exception("Failed to persist receipt batch")
+            for index, _ in to_save:
+                results[index].status = "error"
+                results[index].error = "Failed to persist receipt"
+        else:
+            for (index, upload), receipt_id in zip(to_save, receipt_ids):
+                results[index].result = build_receipt_response(upload, receipt_id)
+
+    succeeded = sum(1 for r in results if r.status == "ok")
+
+    return ReceiptBatchResponse(
+        method=method.value,  # type: ignore[arg-type]
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results,
+    )
+
+
+class ComparisonAlreadyPromoted(Exception):
+    def __init__(self, comparison_id: int, receipt_id: Optional[int]):
+        super().__init__(f"Comparison {comparison_id} was already saved as a receipt")
+        self.receipt_id = receipt_id
+
+
+async def merge_reasons(
+    di: ReceiptSchema,
+    confidence: Dict[str, Optional[float]],
+) -> List[str]:
+    """
+    Fields where a merge of both engines' results prefers OpenAI: the
+    same weak-field and merchant-history rules as `auto` routing.
+    """
+
+    reasons = engine_router.di_weak_fields(
+        di, confidence, settings.AUTO_MIN_FIELD_CONFIDENCE
+    )
+    if await merchant_engine_history.di_is_weak(di.merchant):
+        reasons.append(engine_router.MERCHANT_HISTORY)
+    return reasons
+
+
+async def promote_comparison(
+    comparison_id: int,
+    user_id: int,
+    choice: CompareChoice,
+) -> ReceiptAnalysisResponse:
+    """
+    Save a stored compare result as a receipt: DI's, OpenAI's, or their
+    merge. No engine runs; items without categories are categorized.
+
+    The raw outputs behind the chosen result are stored with the receipt,
+    so it can be re-normalized like any upload. Each comparison becomes
+    at most one receipt (`ComparisonAlreadyPromoted` otherwise).
+    """
+
+    async with AsyncSessionLocal() as db:
+        comparison = await get_comparison_for_user(db, comparison_id, user_id)
+
+    if comparison.receipt_id is not None:
+        raise ComparisonAlreadyPromoted(comparison_id, comparison.receipt_id)
+
+    compare = ReceiptCompareAnalysis.model_validate_json(comparison.analysis)
+    stored_raw: Dict[str, Any] = (
+        decompress_payload(comparison.raw_outputs) if comparison.raw_outputs else {}
+    )
+
+    if choice == CompareChoice.merged:
+        di_raw = stored_raw.get(Engine.di.value) or {}
+        reasons = await merge_reasons(compare.di, di_raw.get("confidence") or {})
+        analysis = engine_router.merge_receipts(compare.di, compare.openai, reasons)
+        raw_outputs = dict(stored_raw)
+        if raw_outputs:
+            raw_outputs[Engine.auto.value] = {"reasons": reasons}
     else:
-        raise ValueError(
-            f"Unsupported receipt processing method: {method!r}. "
-            "Supported methods are: 'di', 'openai', and 'compare'."
+        analysis = compare.di if choice == CompareChoice.di else compare.openai
+        raw_outputs = {
+            engine: raw for engine, raw in stored_raw.items() if engine == choice.value
+        }
+
+    await categorize_if_needed(analysis)
+
+    sas_url = async_blob_storage.generate_read_sas(comparison.blob_name)
+
+    async with AsyncSessionLocal() as db:
+        receipt = await add_receipt(
+            db,
+            analysis,
+            user_id,
+            sas_url,
+            raw_outputs=raw_outputs if settings.RAW_OUTPUT_STORE_ENABLED else None,
         )
+        if not await claim_comparison(db, comparison_id, receipt.id):
+            # promoted concurrently
+            await db.rollback()
+            raise ComparisonAlreadyPromoted(comparison_id, None)
+        await db.commit()
+
+    metrics.inc(f"receipts.compare_promoted.{choice.value}")
+
+    return ReceiptAnalysisResponse(
+        id=receipt.id,
+        file_saved_as=comparison.blob_name,
+        blob_url=comparison.blob_url,
+        method=analysis.source,  # type: ignore[arg-type]
+        analysis=analysis,
+    )
@@ -0,0 +1,78 @@
+from typing import Any, Dict, List, Optional
+
+from src.db.models.receipt import Receipt, ReceiptItem
+from src.logic.engine_router import merge_receipts
+from src.logic.receipt_extractor import ReceiptOpenAIProcessor
+from src.logic.receipt_normalizer import normalize_di_receipt
+from src.schemas.engine import Engine
+from src.schemas.receipt import ReceiptExtraction, ReceiptSchema
+from src.utils.currency_resolver import resolve_currency_from_text
+
+
+def renormalize_openai(raw: Dict[str, Any]) -> ReceiptSchema:
+    """
+    OpenAI's stored JSON through the same validation and mapping as an
+    upload, with the currency taken from the printed token/total line.
+    The remaining currency steps (merchant history, OCR) are left to
+    the caller.
+    """
+
+    extraction = ReceiptExtraction.model_validate(raw)
+    model = ReceiptOpenAIProcessor.to_receipt(extraction)
+
+    if not model.currency:
+        model.currency = resolve_currency_from_text(
+            extraction.currency_token or ""
+        ) or resolve_currency_from_text(extraction.total_line or "")
+
+    return model
+
+
+def renormalize_receipt(
+    receipt: Receipt,
+    raw_outputs: Dict[str, Any],
+) -> Optional[ReceiptSchema]:
+    """
+    Rebuild a stored receipt from its engines' raw outputs with the
+    current normalizers. No engine is called.
+
+    Returns None when the raw outputs needed for the receipt's source
+    are missing. Values the raw outputs cannot reproduce are kept from
+    the stored receipt: a currency resolved from merchant history,
+    locale or OCR, and item categories (by position, while the item
+    name is unchanged; other items are saved without a category).
+    """
+
+    di_raw = raw_outputs.get(Engine.di.value)
+    openai_raw = raw_outputs.get(Engine.openai.value)
+
+    if receipt.source == "di" and di_raw is not None:
+        analysis = normalize_di_receipt(di_raw)
+    elif receipt.source == "openai" and openai_raw is not None:
+        analysis = renormalize_openai(openai_raw)
+    elif receipt.source == "auto" and di_raw is not None:
+        analysis = normalize_di_receipt(di_raw)
+        auto_raw = raw_outputs.get(Engine.auto.value)
+        if openai_raw is not None and auto_raw is not None:
+            analysis = merge_receipts(
+                analysis, renormalize_openai(openai_raw), auto_raw["reasons"]
+            )
+    else:
+        return None
+
+    analysis.source = receipt.source
+    analysis.currency = analysis.currency or receipt.currency
+
+    stored: List[ReceiptItem] = sorted(receipt.items, key=lambda row: row.id)
+    for index, item in enumerate(analysis.items or []):
+        row = stored[index] if index < len(stored) else None
+        if row is not None and item.name == row.name:
+            item.category = row.category
+            item.category_source = row.category_source
+            item.category_confidence = row.category_confidence
+        else:
+            # items are matched to rows by position when saved; a renamed
+            # item must not keep the category of the product it replaces
+            item.clear_category = True
+
+    return analysis
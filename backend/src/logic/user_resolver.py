@@ -1,21 +1,89 @@
-from sqlalchemy.orm import Session
+import asyncio
+import weakref
 
-from src.schemas.user_info import UserInfo
+from src.settings import settings
+
+from src.db.session import AsyncSessionLocal
 from src.db.crud.user_crud import get_or_create_user
 
+from src.schemas.user_info import UserInfo, ResolvedUser
+from src.services.user_cache import UserCacheBackend, MemoryUserCacheBackend
+from src.utils.metrics import metrics
+
 
-def resolve_user(
-    db: Session,
-    user_info: UserInfo,
-):
+class UserResolver:
     """
-    Resolve application user from Microsoft token.
-    Creates the user in DB if it does not exist.
+    Maps Microsoft identities to application users.
+
+    Resolved users are cached by `oid`, so a warm request needs no query
+    against the users table at all. On a miss, concurrent requests for the
+    same `oid` wait on one lookup instead of racing to insert the row.
     """
 
-    return get_or_create_user(
-        db=db,
-        oid=user_info.user_id,
-        email=user_info.email,
-        name=user_info.name,
+    def __init__(self, backend: UserCacheBackend):
+        self._backend = backend
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def _lock_for(self, oid: str) -> asyncio.Lock:
+        lock = self._locks.get(oid)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[oid] = lock
+        return lock
+
+    async def resolve(self, user_info: UserInfo) -> ResolvedUser:
+        """
+        Resolve application user from Microsoft token.
+        Creates the user in DB if it does not exist.
+        """
+
+        oid = user_info.user_id
+
+        cached = await self._backend.get(oid)
+        if cached is not None:
+            metrics.inc("user_cache.hits")
+            return cached
+
+        async with self._lock_for(oid):
+            # someone may have resolved it while we were waiting
+            cached = await self._backend.get(oid)
+            if cached is not None:
+                metrics.inc("user_cache.hits")
+                return cached
+
+            metrics.inc("user_cache.misses")
+
+            async with AsyncSessionLocal() as db:
+                user = await get_or_create_user(
+                    db=db,
+                    oid=oid,
+                    email=user_info.email,
+                    name=user_info.name,
+                )
+
+                resolved = ResolvedUser(
+                    id=user.id,
+                    microsoft_id=user.microsoft_id,
+                    email=user.email,
+                    name=user.name,
+                )
+
+            await self._backend.set(oid, resolved)
+            return resolved
+
+    async def invalidate(self, oid: str) -> None:
+        await self._backend.delete(oid)
+
+
+user_resolver = UserResolver(
+    MemoryUserCacheBackend(
+        maxsize=settings.USER_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
     )
+)
+
+
+async def resolve_user(user_info: UserInfo) -> ResolvedUser:
+    return await user_resolver.resolve(user_info)
@@ -1,8 +1,33 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.api.receipts_api import router as receipts_router
 from src.api.dashboard_api import router as dashboard_router
+from src.api.metrics_api import router as metrics_router
+from src.logic.receipt_jobs import ingestion_queue
+from src.logic.receipt_processor import image_preprocessor
+from src.logic.analysis_cache import analysis_cache
+from src.services.blob_storage_service import async_blob_storage
+from src.db.session import async_engine
+from src.core.auth import token_verifier
+from src.utils.server_timing import format_server_timing, start_server_timing
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # background receipt ingestion workers live as long as the app
+    await ingestion_queue.start()
+    await token_verifier.keys.start()
+    analysis_cache.start()
+    yield
+    await analysis_cache.stop()
+    await token_verifier.keys.stop()
+    await ingestion_queue.stop()
+    image_preprocessor.shutdown()
+    await async_blob_storage.aclose()
+    await async_engine.dispose()
+
 
 
 app = FastAPI(
@@ -12,6 +37,7 @@ app = FastAPI(
         "(Azure Document Intelligence & Azure OpenAI). "
         "Exposes HTTP APIs only — business logic lives in the logic layer."
     ),
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -26,6 +52,18 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    # stage durations recorded by the receipt pipeline during this request
+    collected = start_server_timing()
+    response = await call_next(request)
+
+    if collected:
+        response.headers["Server-Timing"] = format_server_timing(collected)
+
+    return response
+
+
 @app.get("/")
 def health_check():
     return {"status": "ok", "service": "receipt-ai"}
@@ -35,3 +73,4 @@ def health_check():
 # Routers group domain-level features under a structured URL namespace.
 app.include_router(receipts_router, prefix="/api/receipts", tags=["receipts"])
 app.include_router(dashboard_router, prefix="/api")
+app.include_router(metrics_router, prefix="/api")
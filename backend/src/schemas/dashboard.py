@@ -0,0 +1,30 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class CategoryTotal(BaseModel):
+    category: str
+    total: float
+
+
+class MonthlyTotal(BaseModel):
+    year: Optional[int]
+    month: Optional[int]
+    total: float
+
+
+class DashboardSummary(BaseModel):
+    current_month_total: float
+    previous_month_total: float
+    percent_change: float
+    top_category: Optional[str]
+
+
+class DashboardResponse(BaseModel):
+    """
+    Every dashboard panel, computed from one query.
+    """
+
+    category_distribution: List[CategoryTotal]
+    monthly_trend: List[MonthlyTotal]
+    summary: DashboardSummary
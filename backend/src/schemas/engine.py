@@ -5,3 +5,14 @@ class Engine(str, Enum):
     di = "di"
     openai = "openai"
     compare = "compare"
+    # DI, escalating to OpenAI only when DI's result is not good enough
+    auto = "auto"
+
+
+class CompareChoice(str, Enum):
+    """Which result of a stored comparison becomes the receipt."""
+
+    di = "di"
+    openai = "openai"
+    # DI, with OpenAI's values where DI was weak (as for `auto`)
+    merged = "merged"
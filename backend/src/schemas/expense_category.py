@@ -0,0 +1,33 @@
+from typing import List, Literal, get_args
+from pydantic import BaseModel, Field
+
+
+ExpenseCategory = Literal[
+    "Groceries",
+    "Dining",
+    "Beverages",
+    "Household",
+    "Personal Care",
+    "Health",
+    "Clothing",
+    "Electronics",
+    "Transportation",
+    "Utilities",
+    "Entertainment",
+    "Other",
+]
+
+EXPENSE_CATEGORIES: List[str] = list(get_args(ExpenseCategory))
+
+
+class ItemCategoryAssignment(BaseModel):
+    id: int = Field(..., description="The id of the item as given in the request.")
+    category: ExpenseCategory = Field(
+        ..., description="Best matching expense category for the item."
+    )
+
+
+class ItemCategoryBatch(BaseModel):
+    assignments: List[ItemCategoryAssignment] = Field(
+        ..., description="Exactly one assignment per requested item."
+    )
@@ -0,0 +1,29 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional, Union
+from pydantic import BaseModel
+
+from src.schemas.receipt import ReceiptAnalysisResponse, ReceiptCompareResponse
+
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class ReceiptJobAccepted(BaseModel):
+    job_id: str
+    status: JobStatus
+    status_url: str
+
+
+class ReceiptJobStatusResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Union[ReceiptAnalysisResponse, ReceiptCompareResponse]] = None
+    error: Optional[str] = None
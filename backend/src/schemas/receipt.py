@@ -2,9 +2,12 @@ from __future__ import annotations
 from datetime import date, datetime
 from typing import Optional, List, Literal
 from pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 
 
 class ReceiptItem(BaseModel):
+    # row id of a saved item; sent back on edits so the row is updated in place
+    id: SkipJsonSchema[Optional[int]] = None
     name: Optional[str] = Field(
         default=None,
         description=(
@@ -30,6 +33,11 @@ class ReceiptItem(BaseModel):
         default=None,
         description="AI-generated expense category for this item.",
     )
+    # set by the classifier, never requested from the extraction model
+    category_source: SkipJsonSchema[Optional[str]] = None
+    category_confidence: SkipJsonSchema[Optional[float]] = None
+    # on edits a missing category keeps the stored one; set to remove it
+    clear_category: SkipJsonSchema[bool] = Field(default=False, exclude=True)
 
     model_config = {"from_attributes": True}
 
@@ -83,11 +91,35 @@ class ReceiptSchema(BaseModel):
     model_config = {"from_attributes": True}  # Enable ORM mode
 
 
+class ReceiptExtraction(ReceiptSchema):
+    """
+    Structured-output schema for OpenAI extraction.
+
+    Adds the raw currency evidence so the currency can be resolved without
+    a second OCR request; these fields are not persisted.
+    """
+
+    currency_token: Optional[str] = Field(
+        default=None,
+        description=(
+            "Currency symbol or code exactly as printed next to the grand total "
+            "(e.g. '$', '€', 'TL', 'EUR'). Return null if none is printed."
+        ),
+    )
+    total_line: Optional[str] = Field(
+        default=None,
+        description=(
+            "The grand total line exactly as printed, including its label and any "
+            "currency symbol or code (e.g. 'TOPLAM *125,50 TL')."
+        ),
+    )
+
+
 class ReceiptAnalysisResponse(BaseModel):
     id: int
     file_saved_as: str
     blob_url: str
-    method: Literal["di", "openai"]
+    method: Literal["di", "openai", "auto"]
     analysis: ReceiptSchema
 
 
@@ -141,12 +173,33 @@ class ReceiptCompareAnalysis(BaseModel):
 
 
 class ReceiptCompareResponse(BaseModel):
+    id: Optional[int] = Field(
+        default=None,
+        description=(
+            "Stored comparison; POST /api/receipts/compare/{id}/promote saves it "
+            "as a receipt. Missing when it could not be stored."
+        ),
+    )
     file_saved_as: str
     blob_url: str
     method: Literal["compare"]
     analysis: ReceiptCompareAnalysis
 
 
+class ReceiptBatchItemResult(BaseModel):
+    filename: str
+    status: Literal["ok", "error"]
+    result: Optional[ReceiptAnalysisResponse | ReceiptCompareResponse] = None
+    error: Optional[str] = None
+
+
+class ReceiptBatchResponse(BaseModel):
+    method: Literal["di", "openai", "compare", "auto"]
+    succeeded: int
+    failed: int
+    results: List[ReceiptBatchItemResult]
+
+
 class ReceiptListSchema(BaseModel):
     id: int
     merchant: Optional[str]
@@ -159,8 +212,19 @@ class ReceiptListSchema(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class ReceiptListPage(BaseModel):
+    """
+    One page of the receipt list; pass `next_cursor` back to get the next one.
+    """
+
+    items: List[ReceiptListSchema]
+    next_cursor: Optional[str] = None
+
+
 class ReceiptDetailSchema(ReceiptSchema):
     id: int
     blob_url: Optional[str] = None
+    version: int
+    updated_at: datetime
 
     model_config = {"from_attributes": True}
@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel, EmailStr
 
 
@@ -5,4 +7,20 @@ class UserInfo(BaseModel):
     user_id: str  # Microsoft oid 
     email: EmailStr  
     name: str | None = None  
-    
+    # Entra ID app roles assigned to the caller ("roles" claim)
+    roles: List[str] = []
+
+
+
+class ResolvedUser(BaseModel):
+    """
+    Application user behind the current request.
+
+    Small enough to cache: carries the internal id that queries filter on,
+    not the ORM object.
+    """
+
+    id: int
+    microsoft_id: str
+    email: str
+    name: str | None = None
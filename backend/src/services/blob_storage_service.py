@@ -1,14 +1,19 @@
 from src.settings import settings
 from datetime import datetime, timedelta, timezone
-from typing import Optional, cast
+from typing import Optional, Type, Union, cast
 from azure.storage.blob import (
     BlobServiceClient,
     BlobClient,
     BlobSasPermissions,
     generate_blob_sas
 )
+from azure.storage.blob.aio import (
+    BlobServiceClient as AsyncBlobServiceClient,
+    BlobClient as AsyncBlobClient,
+)
+import asyncio
 import logging
-from azure.core.exceptions import ResourceExistsError
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
 
 logger = logging.getLogger(__name__)
 
@@ -167,36 +172,212 @@ class BlobStorageService:
         return f"{blob.url}?{sas_token}"
 
 
+class AsyncBlobStorageService:
+    """
+    Non-blocking variant of :class:`BlobStorageService`.
+
+    Built on `azure.storage.blob.aio`, so uploads and deletes are awaited
+    on the event loop instead of stalling it. Exposes the same operations
+    as the synchronous service; SAS generation is a local HMAC computation
+    and therefore stays synchronous.
+    """
+
+    def __init__(
+        self,
+        connection_string: str,
+        container_name: str,
+        auto_create_container: bool = True,
+    ):
+        """
+        Create an async storage service bound to a specific container.
+
+        Args:
+            connection_string (str):
+                Azure Storage connection string.
+            container_name (str):
+                Target blob container name.
+            auto_create_container (bool, optional):
+                Create the container on first upload if missing. Defaults to True.
+
+        Raises:
+            ValueError:
+                If required configuration values are missing.
+        """
+        if not connection_string:
+            raise ValueError("Missing Azure Blob connection string")
+
+        if not container_name:
+            raise ValueError("Missing Azure Blob container name")
+
+        self._client = AsyncBlobServiceClient.from_connection_string(connection_string)
+        self._container_name = container_name
+        self._container = self._client.get_container_client(container_name)
+
+        # container creation needs I/O, so it is deferred to the first upload
+        self._container_ready = not auto_create_container
+        self._container_lock = asyncio.Lock()
+
+    # ----- internal helpers -----
+
+    async def _ensure_container_exists(self) -> None:
+        """Create container once if it does not already exist."""
+        if self._container_ready:
+            return
+
+        async with self._container_lock:
+            if self._container_ready:
+                return
+
+            try:
+                await self._container.create_container()
+                logger.info("Blob container created: %s", self._container_name)
+
+            except ResourceExistsError:
+                logger.info("Blob container already exists: %s", self._container_name)
+
+            except Exception as e:
+                logger.error(
+                    "Failed to create blob container %s: %s",
+                    self._container_name,
+                    e
+                )
+                raise
+
+            self._container_ready = True
+
+    def get_blob_client(self, blob_name: str) -> AsyncBlobClient:
+        """Return a blob-scoped async client for the given name."""
+        return self._container.get_blob_client(blob_name)
+
+    # ----- public reusable operations -----
+
+    async def upload_bytes(self, blob_name: str, data: bytes, overwrite: bool = True) -> str:
+        """
+        Upload raw bytes and return the full blob URL.
+
+        Args:
+            blob_name (str):
+                Destination blob name.
+            data (bytes):
+                File content to upload.
+            overwrite (bool, optional):
+                Replace existing blob. Defaults to True.
+
+        Returns:
+            str: Public blob URL (not SAS-protected).
+        """
+        await self._ensure_container_exists()
+
+        blob = self.get_blob_client(blob_name)
+        await blob.upload_blob(data, overwrite=overwrite)
+        return blob.url
+
+    async def delete_blob(self, blob_name: str) -> None:
+        """
+        Delete a blob if it exists.
+
+        Args:
+            blob_name (str): Target blob to remove.
+        """
+        blob = self.get_blob_client(blob_name)
+        try:
+            await blob.delete_blob()
+        except ResourceNotFoundError:
+            pass
+
+    def generate_read_sas(
+        self,
+        blob_name: str,
+        expires_in_hours: int = 2,
+    ) -> str:
+        """
+        Generate a temporary read-only SAS URL for a blob.
+
+        Pure computation — no network call is made.
+
+        Args:
+            blob_name (str):
+                Blob name to expose.
+            expires_in_hours (int, optional):
+                Token lifetime. Defaults to 2 hours.
+
+        Returns:
+            str: Signed SAS URL granting time-limited read access.
+
+        Raises:
+            RuntimeError:
+                When account key cannot be resolved from the client.
+        """
+        blob = self.get_blob_client(blob_name)
+
+        account_name = cast(str, self._client.account_name)
+        account_key = cast(str, getattr(self._client.credential, "account_key", None))
+
+        if not account_key:
+            raise RuntimeError(
+                "BlobServiceClient has no account_key (Managed Identity?)"
+            )
+
+        sas_token = generate_blob_sas(
+            account_name=account_name,
+            container_name=self._container_name,
+            blob_name=blob_name,
+            account_key=account_key,
+            permission=BlobSasPermissions(read=True),
+            expiry=datetime.now(timezone.utc) + timedelta(hours=expires_in_hours),
+        )
+
+        return f"{blob.url}?{sas_token}"
+
+    async def close(self) -> None:
+        """Close the underlying HTTP session."""
+        await self._client.close()
+
+
 class LazyBlobStorageService:
     """
-    Lazy-initializing proxy for :class:`BlobStorageService`.
+    Lazy-initializing proxy for :class:`BlobStorageService` or
+    :class:`AsyncBlobStorageService`.
 
-    This defers creation of the underlying BlobStorageService instance
+    This defers creation of the underlying service instance
     (and use of environment-dependent settings) until the first time
     the service is actually used. This improves testability and avoids
     import-time failures in environments where blob storage is not needed.
     """
 
-    def __init__(self) -> None:
-        self._impl: Optional[BlobStorageService] = None
+    def __init__(
+        self,
+        service_cls: Type[Union[BlobStorageService, AsyncBlobStorageService]] = BlobStorageService,
+    ) -> None:
+        self._service_cls = service_cls
+        self._impl: Optional[Union[BlobStorageService, AsyncBlobStorageService]] = None
 
-    def _get_impl(self) -> BlobStorageService:
+    def _get_impl(self) -> Union[BlobStorageService, AsyncBlobStorageService]:
         """
-        Create the underlying BlobStorageService instance on first use.
+        Create the underlying service instance on first use.
         """
         if self._impl is None:
-            self._impl = BlobStorageService(
+            self._impl = self._service_cls(
                 connection_string=settings.AZURE_BLOB_CONNECTION_STRING,
                 container_name=settings.AZURE_BLOB_CONTAINER,
             )
         return self._impl
 
+    async def aclose(self) -> None:
+        """
+        Release network resources of an initialized async service.
+        """
+        if isinstance(self._impl, AsyncBlobStorageService):
+            await self._impl.close()
+            self._impl = None
+
     def __getattr__(self, name: str):
         """
-        Delegate attribute access to the underlying BlobStorageService.
+        Delegate attribute access to the underlying service.
         """
         return getattr(self._get_impl(), name)
 
 
-# reusable singleton instance (lazily initialized)
+# reusable singleton instances (lazily initialized)
 blob_storage = LazyBlobStorageService()
+async_blob_storage = LazyBlobStorageService(AsyncBlobStorageService)
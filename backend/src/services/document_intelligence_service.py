@@ -1,7 +1,68 @@
-from typing import Any, Dict, List
+import time
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
 from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
 from azure.ai.documentintelligence.models import AnalyzeDocumentRequest, AnalyzeResult
 from azure.core.credentials import AzureKeyCredential
+from azure.core.polling.async_base_polling import AsyncLROBasePolling
+
+from src.services.engine_guard import EngineGuard
+from src.utils.metrics import metrics
+
+
+class DocumentAnalysisTimeout(TimeoutError):
+    """Raised when an analysis does not finish within the service deadline."""
+
+
+class BackoffLROPolling(AsyncLROBasePolling):
+    """
+    Poll a DI operation with a short first interval that grows per poll.
+
+    The SDK default sleeps a fixed interval between status requests, so a
+    receipt finishing in ~1.5 s is typically noticed much later. Here the
+    delay starts at `initial_interval` and is multiplied by `backoff` up
+    to `max_interval`. A `Retry-After` header from the service always wins.
+
+    Also records when the operation left `notStarted`, which splits the
+    elapsed time into queue time and analysis time.
+    """
+
+    def __init__(
+        self,
+        initial_interval: float,
+        max_interval: float,
+        backoff: float,
+        **kwargs: Any,
+    ):
+        super().__init__(initial_interval, **kwargs)
+        self._interval = initial_interval
+        self._max_interval = max_interval
+        self._backoff = backoff
+        self.polls = 0
+        self.started_at = time.perf_counter()
+        self.running_at: Optional[float] = None
+
+    def _extract_delay(self) -> float:
+        retry_after = self._pipeline_response.http_response.headers.get("Retry-After")
+        try:
+            delay = float(retry_after) if retry_after else 0
+        except ValueError:
+            # HTTP-date form; DI only sends seconds
+            delay = 0
+
+        if delay <= 0:
+            delay = self._interval
+            self._interval = min(self._interval * self._backoff, self._max_interval)
+
+        return delay
+
+    async def update_status(self) -> None:
+        await super().update_status()
+        self.polls += 1
+
+        status = (self.status() or "").lower()
+        if self.running_at is None and status != "notstarted":
+            self.running_at = time.perf_counter()
 
 
 class DocumentIntelligenceService:
@@ -21,13 +82,30 @@ class DocumentIntelligenceService:
     It focuses only on retrieving structured data from Azure DI.
     """
 
-    def __init__(self, endpoint: str, api_key: str):
+    def __init__(
+        self,
+        endpoint: str,
+        api_key: str,
+        poll_initial_seconds: float = 0.25,
+        poll_max_seconds: float = 0.5,
+        poll_backoff: float = 1.5,
+        deadline_seconds: Optional[float] = 60,
+        guard: Optional[EngineGuard] = None,
+    ):
         """
         Create a DI client bound to a specific endpoint and key.
 
         Args:
             endpoint (str): Azure Document Intelligence endpoint URL.
             api_key (str): Access key for the DI resource.
+            poll_initial_seconds (float): First delay between status polls.
+            poll_max_seconds (float): Upper bound for the growing delay.
+            poll_backoff (float): Delay multiplier applied after each poll.
+            deadline_seconds (float, optional): Hard limit for one analysis,
+                submission and polling included. None disables it.
+            guard (EngineGuard, optional): Client-side throttling, retries
+                and circuit breaking for submissions. When given, the SDK's
+                own retries of the submission request are turned off.
 
         Raises:
             ValueError: If configuration values are missing.
@@ -36,8 +114,56 @@ class DocumentIntelligenceService:
             endpoint=endpoint,
             credential=AzureKeyCredential(api_key),
         )
+        self._endpoint = endpoint.rstrip("/")
+        self._poll_initial_seconds = poll_initial_seconds
+        self._poll_max_seconds = poll_max_seconds
+        self._poll_backoff = poll_backoff
+        self._deadline_seconds = deadline_seconds
+        self._guard = guard
+
+    def _polling_method(self) -> BackoffLROPolling:
+        # polling state is per operation, so every call gets a fresh one
+        return BackoffLROPolling(
+            self._poll_initial_seconds,
+            self._poll_max_seconds,
+            self._poll_backoff,
+            path_format_arguments={"endpoint": self._endpoint},
+        )
+
+    async def _analyze(
+        self,
+        model_id: str,
+        req: AnalyzeDocumentRequest,
+    ) -> Tuple[AnalyzeResult, BackoffLROPolling]:
+        polling = self._polling_method()
+        options: Dict[str, Any] = {}
+        if self._guard is not None:
+            # retried by the guard; status polls keep the SDK's retries
+            options["retry_total"] = 0
+
+        poller = await self._client.begin_analyze_document(
+            model_id=model_id,
+            body=req,
+            polling=polling,
+            **options,
+        )
+        return await poller.result(), polling
 
-    async def run_analysis(self, model_id: str, url: str) -> AnalyzeResult:
+    async def _guarded_analyze(
+        self,
+        model_id: str,
+        req: AnalyzeDocumentRequest,
+    ) -> Tuple[AnalyzeResult, BackoffLROPolling]:
+        if self._guard is None:
+            return await self._analyze(model_id, req)
+        return await self._guard.call(lambda: self._analyze(model_id, req))
+
+    async def run_analysis(
+        self,
+        model_id: str,
+        url: Optional[str] = None,
+        data: Optional[bytes] = None,
+    ) -> AnalyzeResult:
         """
         Execute a DI model and return the raw AnalyzeResult.
 
@@ -46,21 +172,58 @@ class DocumentIntelligenceService:
 
         Args:
             model_id (str): ID of the model to run (e.g., 'prebuilt-receipt').
-            url (str): Public or SAS-secured document URL.
+            url (str, optional): Public or SAS-secured document URL.
+            data (bytes, optional): Document content, sent in the request
+                instead of a URL — no storage round-trip needed.
 
         Returns:
             AnalyzeResult: Raw SDK result object from Azure DI.
+
+        Raises:
+            ValueError: If neither or both of `url` and `data` are given.
+            DocumentAnalysisTimeout: If the deadline passes first.
+            EngineUnavailable: If the guard's circuit breaker is open.
+
+        Queue time (until the operation starts running) and analysis time
+        are observed as the `di.queue_seconds` / `di.analysis_seconds`
+        histograms. Cancelling the caller stops polling immediately.
         """
-        req = AnalyzeDocumentRequest(url_source=url)
+        if (url is None) == (data is None):
+            raise ValueError("Provide exactly one of url or data")
 
-        poller = await self._client.begin_analyze_document(
-            model_id=model_id,
-            body=req,
+        req = (
+            AnalyzeDocumentRequest(bytes_source=data)
+            if data is not None
+            else AnalyzeDocumentRequest(url_source=url)
         )
 
-        return await poller.result()
+        try:
+            result, polling = await asyncio.wait_for(
+                self._guarded_analyze(model_id, req),
+                timeout=self._deadline_seconds,
+            )
+        except asyncio.TimeoutError:
+            metrics.inc("di.deadline_exceeded")
+            if self._guard is not None:
+                self._guard.record_failure()
+            raise DocumentAnalysisTimeout(
+                f"Document analysis exceeded {self._deadline_seconds}s"
+            ) from None
+
+        finished_at = time.perf_counter()
+        running_at = polling.running_at or finished_at
 
-    async def analyze_receipt(self, url: str) -> Dict[str, Any]:
+        metrics.inc("di.polls", polling.polls)
+        metrics.observe("di.queue_seconds", running_at - polling.started_at)
+        metrics.observe("di.analysis_seconds", finished_at - running_at)
+
+        return result
+
+    async def analyze_receipt(
+        self,
+        url: Optional[str] = None,
+        data: Optional[bytes] = None,
+    ) -> Dict[str, Any]:
         """
         Convenience wrapper for `prebuilt-receipt`.
 
@@ -69,13 +232,15 @@ class DocumentIntelligenceService:
         only the fields commonly expected in a receipt use-case.
 
         Args:
-            url (str): Document URL to analyze.
+            url (str, optional): Document URL to analyze.
+            data (bytes, optional): Document content, instead of a URL.
 
         Returns:
             dict: Receipt-like structure containing merchant, total,
-                  transaction_date and parsed item lines.
+                  transaction_date and parsed item lines, plus DI's
+                  `confidence` (0..1) for each of them and the document.
         """
-        result = await self.run_analysis("prebuilt-receipt", url)
+        result = await self.run_analysis("prebuilt-receipt", url=url, data=data)
 
         docs = result.documents or []
         doc = docs[0] if docs else None
@@ -93,8 +258,16 @@ class DocumentIntelligenceService:
                 or getattr(f, "content", None)
             )
 
+        def confidence(*names: str) -> Optional[float]:
+            """Confidence of the first of `names` that has a value."""
+            for name in names:
+                if safe(name) is not None:
+                    return getattr(fields[name], "confidence", None)
+            return None
+
         # extract line items
         items: List[Dict[str, Any]] = []
+        item_confidences: List[float] = []
         items_field = fields.get("Items")
         value_array = getattr(items_field, "value_array", None)
 
@@ -104,6 +277,9 @@ class DocumentIntelligenceService:
                 if not obj:
                     continue
 
+                if getattr(row, "confidence", None) is not None:
+                    item_confidences.append(row.confidence)
+
                 def cell(k):
                     f = obj.get(k) if isinstance(obj, dict) else getattr(obj, k, None)
                     return getattr(f, "value_string", None) or getattr(
@@ -125,4 +301,12 @@ class DocumentIntelligenceService:
             "transaction_date": safe("TransactionDate"),
             "items": items or None,
             "source": "document_intelligence",
+            "confidence": {
+                "document": getattr(doc, "confidence", None),
+                "merchant": confidence("MerchantName", "MerchantAddress"),
+                "total": confidence("Total", "Subtotal"),
+                "transaction_date": confidence("TransactionDate"),
+                # the weakest line decides whether items can be trusted
+                "items": min(item_confidences) if item_confidences else None,
+            },
         }
@@ -0,0 +1,335 @@
+import time
+import random
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+from azure.core.exceptions import ServiceRequestError, ServiceResponseError
+from openai import APIConnectionError
+
+from src.utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying; anything else is the caller's problem
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+
+# longest Retry-After we are willing to wait inside a request
+MAX_RETRY_AFTER_SECONDS = 30.0
+
+
+class EngineUnavailable(Exception):
+    """Raised without calling the engine while its circuit breaker is open."""
+
+    def __init__(self, engine: str, retry_after: float):
+        super().__init__(f"{engine} is temporarily unavailable")
+        self.engine = engine
+        self.retry_after = retry_after
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    # HttpResponseError (azure) and APIStatusError (openai) both carry it
+    status = getattr(exc, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return min(float(value) / 1000, MAX_RETRY_AFTER_SECONDS)
+        except ValueError:
+            pass
+
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return min(float(value), MAX_RETRY_AFTER_SECONDS)
+    except ValueError:
+        # HTTP-date form; neither service sends it
+        return None
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Throttling, server errors and connection failures — retryable."""
+
+    if isinstance(exc, (ServiceRequestError, ServiceResponseError, APIConnectionError)):
+        return True
+    return _status_code(exc) in TRANSIENT_STATUSES
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted by AIMD (additive increase, multiplicative
+    decrease), as TCP congestion control does.
+
+    Every success raises the limit by `1 / limit` (about +1 per full
+    window); every throttling response multiplies it by `decrease`. A
+    `Retry-After` pauses all new calls until it has passed.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        decrease: float = 0.5,
+    ):
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("AdaptiveLimiter needs 1 <= minimum <= initial <= maximum")
+
+        self._limit = float(initial)
+        self._minimum = minimum
+        self._maximum = maximum
+        self._decrease = decrease
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        while (delay := self._paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def on_success(self) -> None:
+        self._limit = min(self._maximum, self._limit + 1 / self._limit)
+
+    def on_throttled(self, retry_after: Optional[float]) -> None:
+        self._limit = max(self._minimum, self._limit * self._decrease)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+
+class RetryBudget:
+    """
+    Caps retries at a share of first attempts, shared by all engines.
+
+    Each call deposits `ratio` tokens and each retry spends one, so under
+    a throttling storm retries add at most `ratio` extra load instead of
+    multiplying it. `min_per_second` keeps a trickle of retries available
+    when traffic is low.
+    """
+
+    def __init__(
+        self,
+        ratio: float,
+        min_per_second: float = 1.0,
+        max_tokens: float = 10.0,
+    ):
+        self._ratio = ratio
+        self._min_per_second = min_per_second
+        self._max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._refilled_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self._max_tokens,
+            self._tokens + (now - self._refilled_at) * self._min_per_second,
+        )
+        self._refilled_at = now
+
+    def record_call(self) -> None:
+        self._refill()
+        self._tokens = min(self._max_tokens, self._tokens + self._ratio)
+
+    def try_spend(self) -> bool:
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class CircuitBreaker:
+    """
+    Fails fast after `failure_threshold` consecutive failed calls.
+
+    While open, calls are rejected for `reset_seconds`; then a single
+    probe call is let through (half-open) and its outcome closes or
+    re-opens the breaker. A probe that never reports back (cancelled)
+    is replaced after another `reset_seconds`.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self._failure_threshold = failure_threshold
+        self._reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_at: Optional[float] = None
+
+    def _probing(self) -> bool:
+        return (
+            self._probe_at is not None
+            and time.monotonic() - self._probe_at < self._reset_seconds
+        )
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probing() or self.retry_after() == 0:
+            return "half_open"
+        return "open"
+
+    def retry_after(self) -> float:
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self._reset_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        if self._probing() or self.retry_after() > 0:
+            return False
+
+        self._probe_at = time.monotonic()
+        return True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probe_at = None
+
+    def record_failure(self) -> bool:
+        """Count a failure; True when it (re-)opened the breaker."""
+
+        self._failures += 1
+        if self._probe_at is None and self._failures < self._failure_threshold:
+            return False
+
+        # calls already in flight keep failing while open; not a new opening
+        opened = self._opened_at is None or self._probe_at is not None
+        self._opened_at = time.monotonic()
+        self._probe_at = None
+        return opened
+
+
+class EngineGuard:
+    """
+    Client-side protection for one engine's calls.
+
+    Combines an `AdaptiveLimiter`, a `CircuitBreaker` and a shared
+    `RetryBudget`. Transient errors are retried with backoff (or after
+    `Retry-After`) while attempts and budget last. Non-transient errors
+    propagate at once and do not count against the engine's health.
+
+    Counters: `engine.<name>.{calls,throttled,retries,rejected,breaker_opened}`
+    and `engine.retry_budget.exhausted`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limiter: AdaptiveLimiter,
+        breaker: CircuitBreaker,
+        budget: RetryBudget,
+        max_attempts: int = 3,
+        base_backoff_seconds: float = 0.5,
+    ):
+        self.name = name
+        self.limiter = limiter
+        self.breaker = breaker
+        self._budget = budget
+        self._max_attempts = max_attempts
+        self._base_backoff = base_backoff_seconds
+
+    @property
+    def available(self) -> bool:
+        return self.breaker.state != "open"
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "state": self.breaker.state,
+            "concurrency_limit": self.limiter.limit,
+            "in_flight": self.limiter.in_flight,
+        }
+
+    def record_failure(self) -> None:
+        if self.breaker.record_failure():
+            metrics.inc(f"engine.{self.name}.breaker_opened")
+            logger.warning("Circuit breaker opened for %s", self.name)
+
+    async def call(self, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `func` (one engine request) under the limiter, with retries.
+
+        Raises:
+            EngineUnavailable: If the breaker is open.
+        """
+
+        if not self.breaker.allow():
+            metrics.inc(f"engine.{self.name}.rejected")
+            raise EngineUnavailable(self.name, self.breaker.retry_after())
+
+        metrics.inc(f"engine.{self.name}.calls")
+        self._budget.record_call()
+
+        attempt = 1
+        while True:
+            try:
+                async with self.limiter.slot():
+                    result = await func()
+            except Exception as exc:
+                if not is_transient(exc):
+                    # the engine answered; the request itself was bad
+                    self.breaker.record_success()
+                    raise
+
+                retry_after = _retry_after(exc)
+                if _status_code(exc) == 429:
+                    metrics.inc(f"engine.{self.name}.throttled")
+                    self.limiter.on_throttled(retry_after)
+
+                if attempt >= self._max_attempts:
+                    self.record_failure()
+                    raise
+
+                if not self._budget.try_spend():
+                    metrics.inc("engine.retry_budget.exhausted")
+                    self.record_failure()
+                    raise
+
+                metrics.inc(f"engine.{self.name}.retries")
+
+                # a Retry-After already paused the limiter for everyone
+                if not retry_after:
+                    backoff = self._base_backoff * 2 ** (attempt - 1)
+                    await asyncio.sleep(backoff * random.uniform(0.5, 1.5))
+
+                attempt += 1
+                continue
+
+            self.limiter.on_success()
+            self.breaker.record_success()
+            return result
@@ -0,0 +1,407 @@
+import os
+import json
+import uuid
+import asyncio
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from src.schemas.job import JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+JobHandler = Callable[[], Awaitable[BaseModel]]
+
+
+class JobRecord(BaseModel):
+    """
+    Persisted state of a single background job.
+    """
+
+    id: str
+    owner_id: int
+    kind: str
+    status: JobStatus
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SqliteJobStore:
+    """
+    Local SQLite-backed job store.
+
+    Stand-in for a managed queue/status backend (e.g. Azure Queue Storage +
+    Table Storage). Job records survive process restarts and are visible to
+    every worker process on the same host, which keeps `GET /jobs/{id}`
+    consistent regardless of which uvicorn worker accepted the upload.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the job database.
+
+        Args:
+            path (str): SQLite file path, or ":memory:" for a private store.
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    owner_id INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    result TEXT,
+                    error TEXT,
+                    worker_pid INTEGER
+                )
+                """
+            )
+
+            # stores created before the worker_pid column
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "worker_pid" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN worker_pid INTEGER")
+
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_jobs_owner_created "
+                "ON jobs (owner_id, created_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_jobs_status_finished "
+                "ON jobs (status, finished_at)"
+            )
+
+    # ----- internal helpers -----
+
+    def _update(self, job_id: str, **values: Any) -> None:
+        columns = ", ".join(f"{k} = ?" for k in values)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET {columns} WHERE id = ?",
+                (*values.values(), job_id),
+            )
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> JobRecord:
+        return JobRecord(
+            id=row["id"],
+            owner_id=row["owner_id"],
+            kind=row["kind"],
+            status=JobStatus(row["status"]),
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+        )
+
+    # ----- public operations -----
+
+    def create(self, owner_id: int, kind: str) -> JobRecord:
+        record = JobRecord(
+            id=uuid.uuid4().hex,
+            owner_id=owner_id,
+            kind=kind,
+            status=JobStatus.queued,
+            created_at=_utcnow(),
+        )
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, owner_id, kind, status, created_at, worker_pid) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    record.id,
+                    record.owner_id,
+                    record.kind,
+                    record.status.value,
+                    record.created_at.isoformat(),
+                    os.getpid(),
+                ),
+            )
+
+        return record
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+
+        return self._to_record(row) if row else None
+
+    def delete(self, job_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def mark_running(self, job_id: str) -> None:
+        self._update(
+            job_id,
+            status=JobStatus.running.value,
+            started_at=_utcnow().isoformat(),
+        )
+
+    def mark_succeeded(self, job_id: str, result: Dict[str, Any]) -> None:
+        self._update(
+            job_id,
+            status=JobStatus.succeeded.value,
+            finished_at=_utcnow().isoformat(),
+            result=json.dumps(result),
+        )
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        self._update(
+            job_id,
+            status=JobStatus.failed.value,
+            finished_at=_utcnow().isoformat(),
+            error=error,
+        )
+
+    def fail_interrupted(self, error: str) -> int:
+        """
+        Fail queued/running jobs whose worker process is gone.
+
+        Jobs live in their worker's in-process queue, so after a restart
+        they can never finish. Jobs recorded by this process id belong to
+        an earlier process that reused it. Jobs of other live worker
+        processes sharing the store are left alone.
+
+        Returns:
+            int: Number of jobs marked failed.
+        """
+        pid = os.getpid()
+
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, worker_pid FROM jobs WHERE status IN (?, ?)",
+                (JobStatus.queued.value, JobStatus.running.value),
+            ).fetchall()
+
+            interrupted = [
+                (_utcnow().isoformat(), error, row["id"])
+                for row in rows
+                if row["worker_pid"] is None
+                or row["worker_pid"] == pid
+                or not _pid_alive(row["worker_pid"])
+            ]
+
+            self._conn.executemany(
+                f"UPDATE jobs SET status = '{JobStatus.failed.value}', "
+                "finished_at = ?, error = ? WHERE id = ?",
+                interrupted,
+            )
+
+        return len(interrupted)
+
+    def purge_finished(self, older_than: datetime) -> int:
+        """
+        Delete succeeded/failed jobs that finished before `older_than`.
+
+        Returns:
+            int: Number of jobs deleted.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (
+                    JobStatus.succeeded.value,
+                    JobStatus.failed.value,
+                    older_than.isoformat(),
+                ),
+            )
+
+        return cursor.rowcount
+
+
+class IngestionQueue:
+    """
+    Bounded in-process job queue served by a fixed pool of asyncio workers.
+
+    Responsibilities:
+        • Accept jobs without waiting for them to run
+        • Execute at most `workers` jobs concurrently
+        • Record job lifecycle and results in a job store
+        • Drop finished jobs once they are older than the retention period
+
+    Throughput is set by the worker count; the queue size caps how much
+    work may be waiting so a burst fails fast instead of piling up.
+    Store calls are blocking sqlite3 writes and run in a thread.
+    """
+
+    # how often finished jobs past retention are purged: at most hourly,
+    # at least a minute apart
+    PURGE_INTERVAL_SECONDS = 3600
+    MIN_PURGE_INTERVAL_SECONDS = 60
+
+    def __init__(
+        self,
+        store: SqliteJobStore,
+        workers: int,
+        maxsize: int,
+        retention_seconds: float,
+    ):
+        """
+        Args:
+            store (SqliteJobStore): Persistence for job state and results.
+            workers (int): Number of concurrent worker tasks.
+            maxsize (int): Maximum number of jobs waiting to run.
+            retention_seconds (float): How long finished jobs stay readable.
+        """
+        if workers < 1:
+            raise ValueError("IngestionQueue needs at least one worker")
+
+        self._store = store
+        self._workers = workers
+        self._maxsize = maxsize
+        self._retention = timedelta(seconds=retention_seconds)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def store(self) -> SqliteJobStore:
+        return self._store
+
+    async def start(self) -> None:
+        """
+        Fail jobs interrupted by a previous shutdown, then spawn worker
+        tasks and the retention purge on the running event loop.
+        """
+        if self._tasks:
+            return
+
+        interrupted = await asyncio.to_thread(
+            self._store.fail_interrupted, "Interrupted by a server restart"
+        )
+        if interrupted:
+            logger.warning("Marked %d interrupted ingestion jobs failed", interrupted)
+
+        self._queue = asyncio.Queue(maxsize=self._maxsize)
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"ingestion-worker-{i}")
+            for i in range(self._workers)
+        ]
+        self._tasks.append(
+            asyncio.create_task(self._purge_loop(), name="ingestion-purge")
+        )
+
+    async def stop(self) -> None:
+        """Cancel workers and fail every job that has not finished."""
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # the queue is in-process, so waiting jobs can never run after shutdown
+        if self._queue is not None:
+            while not self._queue.empty():
+                job_id, _ = self._queue.get_nowait()
+                await asyncio.to_thread(
+                    self._store.mark_failed, job_id, "Cancelled during shutdown"
+                )
+
+        self._queue = None
+
+    async def submit(self, owner_id: int, kind: str, handler: JobHandler) -> JobRecord:
+        """
+        Enqueue a job and return its record immediately.
+
+        Raises:
+            RuntimeError: If the queue has not been started.
+            QueueFullError: If `maxsize` jobs are already waiting.
+        """
+        if self._queue is None:
+            raise RuntimeError("IngestionQueue is not running")
+
+        if self._queue.full():
+            raise QueueFullError("Ingestion queue is full")
+
+        record = await asyncio.to_thread(
+            self._store.create, owner_id=owner_id, kind=kind
+        )
+        try:
+            self._queue.put_nowait((record.id, handler))
+        except asyncio.QueueFull:
+            await asyncio.to_thread(self._store.delete, record.id)
+            raise QueueFullError("Ingestion queue is full")
+
+        return record
+
+    async def _purge_loop(self) -> None:
+        interval = max(
+            self.MIN_PURGE_INTERVAL_SECONDS,
+            min(self._retention.total_seconds(), self.PURGE_INTERVAL_SECONDS),
+        )
+
+        while True:
+            try:
+                purged = await asyncio.to_thread(
+                    self._store.purge_finished, _utcnow() - self._retention
+                )
+                if purged:
+                    logger.info("Purged %d finished ingestion jobs", purged)
+            except sqlite3.Error:
+                logger.exception("Purging finished ingestion jobs failed")
+
+            await asyncio.sleep(interval)
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        queue = self._queue
+
+        while True:
+            job_id, handler = await queue.get()
+            try:
+                await asyncio.to_thread(self._store.mark_running, job_id)
+                result = await handler()
+                await asyncio.to_thread(
+                    self._store.mark_succeeded, job_id, result.model_dump(mode="json")
+                )
+
+            except asyncio.CancelledError:
+                # the task is being cancelled, so the write can't be awaited
+                self._store.mark_failed(job_id, "Cancelled during shutdown")
+                raise
+
+            except Exception as e:
+                logger.exception("Ingestion job %s failed", job_id)
+                detail = getattr(e, "detail", None) or str(e) or type(e).__name__
+                await asyncio.to_thread(self._store.mark_failed, job_id, str(detail))
+
+            finally:
+                queue.task_done()
@@ -1,9 +1,22 @@
 from __future__ import annotations
 from typing import Any, Dict, Optional
 from pydantic import BaseModel
-from openai import AsyncAzureOpenAI
+from openai import AsyncAzureOpenAI, DEFAULT_MAX_RETRIES
+import base64
 import json
 
+from src.services.engine_guard import EngineGuard
+
+
+def encode_image_data_url(data: bytes, content_type: str) -> str:
+    """
+    Inline image for the `image_url` parameters, as a base64 data URL.
+
+    Saves the model service a fetch from storage; the request body grows
+    by a third over the raw image size.
+    """
+    return f"data:{content_type};base64,{base64.b64encode(data).decode('ascii')}"
+
 
 class OpenAIJsonSchemaResponse(BaseModel):
     """
@@ -44,6 +57,7 @@ class OpenAIVisionService:
         api_key: str,
         deployment: str,
         api_version: str = "2024-08-01-preview",
+        guard: Optional[EngineGuard] = None,
     ):
         """
         Initialize Azure OpenAI client.
@@ -53,6 +67,9 @@ class OpenAIVisionService:
             api_key (str): API key for authentication.
             deployment (str): Model deployment name.
             api_version (str): API version to use (defaults to Vision preview).
+            guard (EngineGuard, optional): Client-side throttling, retries
+                and circuit breaking. When given, the SDK's own retries
+                are turned off.
 
         Raises:
             ValueError: If any required configuration is missing.
@@ -69,6 +86,15 @@ class OpenAIVisionService:
             azure_endpoint=endpoint,
             api_key=api_key,
             api_version=api_version,
+            max_retries=0 if guard is not None else DEFAULT_MAX_RETRIES,
+        )
+        self._guard = guard
+
+    async def _create_completion(self, **params: Any):
+        if self._guard is None:
+            return await self._client.chat.completions.create(**params)
+        return await self._guard.call(
+            lambda: self._client.chat.completions.create(**params)
         )
 
     async def analyze_image_with_schema(
@@ -88,7 +114,8 @@ class OpenAIVisionService:
             • how the result will be interpreted
 
         Args:
-            image_url (str): Public or SAS-secured image URL.
+            image_url (str): Public or SAS-secured image URL, or a data URL
+                from `encode_image_data_url`.
             schema_model (BaseModel): Pydantic model defining output schema.
             system_prompt (str): Instruction prompt for model behavior.
             user_prompt (str): Task-specific request text.
@@ -103,7 +130,7 @@ class OpenAIVisionService:
             ValueError: If the model returns an empty or invalid response.
         """
 
-        response = await self._client.chat.completions.create(
+        response = await self._create_completion(
             model=self._deployment,
             temperature=temperature,
             messages=[
@@ -125,6 +152,45 @@ class OpenAIVisionService:
             },
         )
 
+        return self._parse_structured(response, schema_model)
+
+    async def complete_with_schema(
+        self,
+        schema_model: type[BaseModel],
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0,
+    ) -> OpenAIJsonSchemaResponse:
+        """
+        Execute a text-only request and enforce JSON-Schema structured output.
+
+        Same contract as `analyze_image_with_schema`, without an image —
+        for tasks such as labelling item names.
+
+        Raises:
+            ValueError: If the model returns an empty or invalid response.
+        """
+
+        response = await self._create_completion(
+            model=self._deployment,
+            temperature=temperature,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            response_format={
+                "type": "json_schema",
+                "json_schema": {
+                    "name": schema_model.__name__,
+                    "schema": schema_model.model_json_schema(),
+                },
+            },
+        )
+
+        return self._parse_structured(response, schema_model)
+
+    @staticmethod
+    def _parse_structured(response, schema_model: type[BaseModel]) -> OpenAIJsonSchemaResponse:
         content = response.choices[0].message.content
         if not content:
             raise ValueError("Empty response from OpenAI")
@@ -146,9 +212,12 @@ class OpenAIVisionService:
         """
         Extract ALL visible text from an image as-is (OCR-like).
         Returns plain text (not JSON).
+
+        `image_url` may be a SAS URL or a data URL, as for
+        `analyze_image_with_schema`.
         """
 
-        response = await self._client.chat.completions.create(
+        response = await self._create_completion(
             model=self._deployment,
             temperature=temperature,
             messages=[
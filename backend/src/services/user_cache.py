@@ -0,0 +1,38 @@
+from typing import Optional, Protocol
+
+from src.schemas.user_info import ResolvedUser
+from src.utils.ttl_cache import TTLCache
+
+
+class UserCacheBackend(Protocol):
+    """
+    Storage for Microsoft `oid` → resolved user mappings.
+
+    The in-process backend is enough for a single instance; a shared
+    backend (e.g. Azure Cache for Redis) can implement the same three
+    methods so every worker benefits from one lookup.
+    """
+
+    async def get(self, oid: str) -> Optional[ResolvedUser]: ...
+
+    async def set(self, oid: str, user: ResolvedUser) -> None: ...
+
+    async def delete(self, oid: str) -> None: ...
+
+
+class MemoryUserCacheBackend:
+    """
+    Process-local TTL/LRU backend.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self._cache: TTLCache[ResolvedUser] = TTLCache(maxsize, ttl_seconds)
+
+    async def get(self, oid: str) -> Optional[ResolvedUser]:
+        return self._cache.get(oid)
+
+    async def set(self, oid: str, user: ResolvedUser) -> None:
+        self._cache.set(oid, user)
+
+    async def delete(self, oid: str) -> None:
+        self._cache.pop(oid)
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import Optional
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 ENV_PATH = BASE_DIR / ".env"
@@ -15,7 +16,115 @@ class Settings(BaseSettings): # type: ignore
     AZURE_OPENAI_KEY: str
     AZURE_OPENAI_DEPLOYMENT: str
 
+    # Entra ID app registration of this API (token audience)
+    AUTH_TENANT_ID: str
+    AUTH_AUDIENCE: str
+    # https URL or local JSON file; defaults to the tenant's discovery keys
+    AUTH_JWKS_URL: Optional[str] = None
+    # defaults to the tenant's v2.0 and v1.0 issuers
+    AUTH_ISSUER: Optional[str] = None
+    AUTH_JWKS_REFRESH_SECONDS: int = 6 * 3600
+    AUTH_JWKS_MIN_REFRESH_SECONDS: int = 60
+    AUTH_CLAIMS_CACHE_MAX_ENTRIES: int = 10000
+    # app role (token "roles" claim) required for /api/metrics
+    AUTH_OPERATOR_ROLE: str = "Operator"
+
     DATABASE_URL: str
+    # derived from DATABASE_URL (e.g. mssql+pyodbc → mssql+aioodbc) when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+
+    # background ingestion (POST /api/receipts/jobs)
+    INGESTION_WORKERS: int = 4
+    INGESTION_QUEUE_MAXSIZE: int = 100
+    INGESTION_JOB_STORE_PATH: str = str(BASE_DIR / "ingestion_jobs.sqlite3")
+    # finished jobs (and their results) are deleted after this long
+    INGESTION_JOB_RETENTION_SECONDS: int = 7 * 24 * 3600
+
+    # batch upload (POST /api/receipts/batch)
+    BATCH_UPLOAD_MAX_FILES: int = 50
+    BATCH_UPLOAD_CONCURRENCY: int = 8
+
+    # streaming upload (POST /api/receipts/stream): comment sent when no
+    # event has gone out for this long, so proxies keep the stream open
+    RECEIPT_STREAM_KEEPALIVE_SECONDS: float = 15
+
+    # keep the engines' outputs before normalization (receipt_raw_outputs),
+    # so `scripts.renormalize_receipts` can reprocess without engine calls
+    RAW_OUTPUT_STORE_ENABLED: bool = True
+
+    # GET /api/receipts page size cap
+    RECEIPTS_PAGE_SIZE_MAX: int = 200
+
+    # content-hash deduplication of engine results
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 1024
+    # memory and table entries; expired rows are purged in the background
+    ANALYSIS_CACHE_TTL_SECONDS: int = 3600
+
+    # item categorization (memo + micro-batched LLM calls)
+    CLASSIFIER_BATCH_SIZE: int = 40
+    CLASSIFIER_BATCH_WAIT_MS: int = 25
+    CLASSIFIER_MEMO_MAX_ENTRIES: int = 20000
+    CLASSIFIER_MEMO_TTL_SECONDS: int = 24 * 3600
+    # local index tier: answers below this confidence escalate to the LLM
+    CLASSIFIER_LOCAL_MIN_CONFIDENCE: float = 0.8
+    CLASSIFIER_LOCAL_REFRESH_SECONDS: int = 600
+    CLASSIFIER_LOCAL_MAX_ROWS: int = 50000
+
+    # engine-bound copy of each upload (original is stored unchanged)
+    IMAGE_PREPROCESS_ENABLED: bool = True
+    IMAGE_PREPROCESS_WORKERS: int = 2
+    IMAGE_PREPROCESS_GRAYSCALE: bool = True
+    IMAGE_PREPROCESS_JPEG_QUALITY: int = 85
+    # longest side sent to each engine, in pixels
+    IMAGE_MAX_DIMENSION_DI: int = 2500
+    IMAGE_MAX_DIMENSION_OPENAI: int = 2048
+
+    # send images to Document Intelligence in the request body instead of
+    # a SAS URL (the free F0 tier accepts at most 4 MB)
+    DI_SEND_BYTES: bool = True
+    DI_SEND_BYTES_MAX: int = 4 * 1024 * 1024
+
+    # Document Intelligence status polling: first delay, growth factor and
+    # cap (a Retry-After header overrides), plus a hard per-analysis limit
+    DI_POLL_INITIAL_SECONDS: float = 0.25
+    DI_POLL_BACKOFF: float = 1.5
+    DI_POLL_MAX_SECONDS: float = 0.5
+    DI_DEADLINE_SECONDS: float = 60
+
+    # client-side protection of DI / OpenAI calls: per-engine AIMD
+    # concurrency limit, retries shared through one budget, and a circuit
+    # breaker that fails fast (compare falls back to the healthy engine)
+    ENGINE_CONCURRENCY_INITIAL: int = 4
+    ENGINE_CONCURRENCY_MIN: int = 1
+    ENGINE_CONCURRENCY_MAX: int = 16
+    ENGINE_MAX_ATTEMPTS: int = 3
+    ENGINE_RETRY_BUDGET_RATIO: float = 0.2
+    ENGINE_BREAKER_FAILURES: int = 5
+    ENGINE_BREAKER_RESET_SECONDS: float = 30
+
+    # send images to OpenAI as base64 data URLs instead of SAS URLs,
+    # so the request does not wait for the blob upload
+    OPENAI_INLINE_IMAGES: bool = True
+    OPENAI_INLINE_MAX_BYTES: int = 10 * 1024 * 1024
+
+    # `auto` engine: escalate to OpenAI when a DI field is missing or below
+    # this confidence, or when DI disagreed with OpenAI on at least the
+    # given share of a merchant's earlier receipts
+    AUTO_MIN_FIELD_CONFIDENCE: float = 0.8
+    AUTO_WEAK_MERCHANT_MIN_COMPARISONS: int = 3
+    AUTO_WEAK_MERCHANT_DISAGREEMENT_RATE: float = 0.3
+
+    # merchant → currency history used before falling back to an OCR request
+    CURRENCY_MERCHANT_CACHE_MAX_ENTRIES: int = 5000
+    CURRENCY_MERCHANT_CACHE_TTL_SECONDS: int = 3600
+
+    # Microsoft oid → application user lookups
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 300
 
     model_config = {"env_file": str(ENV_PATH)}
 
@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+
+def entity_tag(*parts: object) -> str:
+    """Strong ETag built from values that change whenever the representation does."""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC (or aware) datetime as an HTTP-date."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # weak comparison, as RFC 9110 prescribes for If-None-Match
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
+
+
+def is_not_modified(
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+    etag: str,
+    last_modified: datetime,
+) -> bool:
+    """
+    Whether a GET with these request headers should get 304 Not Modified.
+
+    If-None-Match takes precedence; If-Modified-Since is only evaluated
+    without it, at one-second resolution. Unparseable dates are ignored.
+    """
+
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if if_modified_since is None:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+
+    return last_modified.replace(microsecond=0) <= since
@@ -1,15 +1,53 @@
-from typing import Optional
+import re
+from typing import Dict, Iterable, Optional, Set
 
 CURRENCY_SYMBOL_MAP = {
     "$": "USD",
     "€": "EUR",
+    "£": "GBP",
     "₺": "TRY",
 }
 
+# codes (and local abbreviations) accepted as whole words
+CURRENCY_CODE_MAP = {
+    "TRY": "TRY",
+    "TL": "TRY",
+    "USD": "USD",
+    "EUR": "EUR",
+    "GBP": "GBP",
+}
+
+_CODE_PATTERN = re.compile(
+    r"(?<![A-Z])(" + "|".join(CURRENCY_CODE_MAP) + r")(?![A-Z])"
+)
+
+# tax keywords printed on receipts of a single currency area
+LOCALE_TAX_MARKERS = {
+    "TRY": ("KDV", "TOPKDV"),
+    "EUR": ("MWST", "UST-ID", "TVA", "IVA", "BTW"),
+    "USD": ("SALES TAX",),
+}
+
+# language hints; only used to choose between tax keyword matches
+LOCALE_HINT_MARKERS = {
+    "TRY": ("TOPLAM", "FİŞ", "FIŞ", "FIS NO"),
+    "EUR": ("SUMME", "GESAMT", "TOTAAL"),
+}
+
+
+def _marker_pattern(markers: Iterable[str]) -> re.Pattern:
+    # whole words only: no letter (of any script) on either side,
+    # so 'SUMMER', 'OLIVA' or 'TVARDY' do not match
+    return re.compile(r"(?<![^\W\d_])(" + "|".join(map(re.escape, markers)) + r")(?![^\W\d_])")
+
+
+_TAX_PATTERNS = {code: _marker_pattern(m) for code, m in LOCALE_TAX_MARKERS.items()}
+_HINT_PATTERNS = {code: _marker_pattern(m) for code, m in LOCALE_HINT_MARKERS.items()}
+
 
 def resolve_currency_from_text(text: str) -> Optional[str]:
     """
-    Resolve ISO currency code from visible currency symbols in text.
+    Resolve ISO currency code from visible currency symbols or codes in text.
     """
     if not text:
         return None
@@ -18,4 +56,36 @@ def resolve_currency_from_text(text: str) -> Optional[str]:
         if symbol in text:
             return code
 
+    match = _CODE_PATTERN.search(text.upper())
+    if match:
+        return CURRENCY_CODE_MAP[match.group(1)]
+
+    return None
+
+
+def guess_currency_from_locale(texts: Iterable[Optional[str]]) -> Optional[str]:
+    """
+    Guess the currency from tax keywords (e.g. 'KDV', 'MwSt').
+
+    A tax keyword is required; language hints (e.g. 'Toplam') only break
+    ties between keywords of different currencies. Returns a code only
+    when the markers point to exactly one currency.
+    """
+
+    upper = [text.upper() for text in texts if text]
+
+    def matching(patterns: Dict[str, re.Pattern]) -> Set[str]:
+        return {
+            code
+            for code, pattern in patterns.items()
+            if any(pattern.search(text) for text in upper)
+        }
+
+    candidates = matching(_TAX_PATTERNS)
+    if len(candidates) > 1:
+        candidates &= matching(_HINT_PATTERNS)
+
+    if len(candidates) == 1:
+        return candidates.pop()
+
     return None
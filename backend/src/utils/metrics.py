@@ -0,0 +1,74 @@
+import bisect
+import threading
+from collections import defaultdict
+from typing import Dict, List, Sequence
+
+# upper bounds (seconds) for latency histograms
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def flatten(self, name: str) -> Dict[str, float]:
+        # cumulative buckets, Prometheus-style
+        out: Dict[str, float] = {}
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            out[f"{name}.le_{bound:g}"] = running
+        out[f"{name}.count"] = running + self.counts[-1]
+        out[f"{name}.sum"] = round(self.total, 6)
+        return out
+
+
+class MetricsRegistry:
+    """
+    Process-local counters and histograms for operational visibility.
+
+    Counter names are dotted strings (e.g. `analysis_cache.hits.memory`)
+    so related counters group naturally in the snapshot. Histograms are
+    flattened into `<name>.le_<bound>`, `<name>.count` and `<name>.sum`.
+    """
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._histograms: Dict[str, _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def get(self, name: str) -> float:
+        return self._counters.get(name, 0)
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            values = dict(self._counters)
+            for name, histogram in self._histograms.items():
+                values.update(histogram.flatten(name))
+            return dict(sorted(values.items()))
+
+
+# shared registry instance
+metrics = MetricsRegistry()
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+logger = logging.getLogger(__name__)
+
+
+BatchHandler = Callable[[List[K]], Awaitable[Dict[K, V]]]
+
+
+class MicroBatcher(Generic[K, V]):
+    """
+    Coalesces lookups from concurrent callers into batched handler calls.
+
+    Keys submitted within `max_wait_seconds` of each other are sent to the
+    handler together, at most `max_batch_size` per call. A key that is
+    already waiting or in flight is not sent twice — later callers share
+    the earlier result.
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler,
+        max_batch_size: int,
+        max_wait_seconds: float,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("MicroBatcher max_batch_size must be positive")
+
+        self._handler = handler
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_seconds
+
+        self._pending: Dict[K, asyncio.Future] = {}
+        self._inflight: Dict[K, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit_many(self, keys: Iterable[K]) -> Dict[K, V]:
+        """
+        Resolve keys through the handler and return what it produced.
+
+        Keys the handler did not answer (or whose batch failed) are
+        missing from the result.
+        """
+
+        loop = asyncio.get_running_loop()
+        futures: Dict[K, asyncio.Future] = {}
+
+        for key in keys:
+            if key in futures:
+                continue
+
+            future = self._pending.get(key) or self._inflight.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._pending[key] = future
+
+            futures[key] = future
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._pending and self._timer is None:
+            self._timer = loop.call_later(self._max_wait, self._flush)
+
+        results: Dict[K, V] = {}
+        for key, future in futures.items():
+            try:
+                value = await asyncio.shield(future)
+            except Exception:
+                continue
+            if value is not None:
+                results[key] = value
+
+        return results
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = dict(list(self._pending.items())[: self._max_batch_size])
+            for key in batch:
+                del self._pending[key]
+            self._inflight.update(batch)
+
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[K, asyncio.Future]) -> None:
+        try:
+            results = await self._handler(list(batch))
+        except Exception as e:
+            logger.warning("Micro-batch of %d keys failed", len(batch), exc_info=True)
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # retrieved by waiters; avoid "exception never retrieved" noise
+                    future.exception()
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(results.get(key))
+        finally:
+            for key in batch:
+                self._inflight.pop(key, None)
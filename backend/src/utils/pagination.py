@@ -0,0 +1,29 @@
+import json
+import base64
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, receipt_id: int) -> str:
+    """
+    Encode a keyset position as an opaque, URL-safe cursor.
+    """
+
+    payload = json.dumps({"c": created_at.isoformat(), "i": receipt_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["c"]), int(payload["i"])
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,41 @@
+import json
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+
+ProgressEvent = Tuple[str, Dict[str, Any]]
+
+# per-request event queue, installed by streaming endpoints
+_events: ContextVar[Optional["asyncio.Queue[ProgressEvent]"]] = ContextVar(
+    "progress_events", default=None
+)
+
+
+def start_progress() -> "asyncio.Queue[ProgressEvent]":
+    """
+    Collect progress events emitted in the current context (and the tasks
+    it creates from now on) into a fresh queue, and return it.
+    """
+    queue: "asyncio.Queue[ProgressEvent]" = asyncio.Queue()
+    _events.set(queue)
+    return queue
+
+
+def emit_progress(event: str, data: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Report a pipeline milestone to the streaming client, if there is one.
+
+    `data` must be JSON-serializable and is sent as-is, so pass snapshots
+    (`model_dump(mode="json")`), not objects that later stages mutate.
+    Outside a streaming request this is a no-op.
+    """
+
+    queue = _events.get()
+    if queue is not None:
+        queue.put_nowait((event, data or {}))
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """One server-sent event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
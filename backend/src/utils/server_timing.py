@@ -0,0 +1,35 @@
+from contextvars import ContextVar
+from typing import Dict, Mapping, Optional
+
+
+# per-request collector, installed by the Server-Timing middleware
+_collected: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "server_timing", default=None
+)
+
+
+def start_server_timing() -> Dict[str, float]:
+    """Install a fresh collector for the current request and return it."""
+    collected: Dict[str, float] = {}
+    _collected.set(collected)
+    return collected
+
+
+def record_server_timing(timings: Mapping[str, float]) -> None:
+    """
+    Add stage durations (ms) to the current request's Server-Timing header.
+
+    When a request runs a stage several times (batch uploads), the slowest
+    run is reported. Outside a request this is a no-op.
+    """
+
+    collected = _collected.get()
+    if collected is None:
+        return
+
+    for name, duration in timings.items():
+        collected[name] = max(duration, collected.get(name, 0.0))
+
+
+def format_server_timing(timings: Mapping[str, float]) -> str:
+    return ", ".join(f"{name};dur={duration:.1f}" for name, duration in timings.items())
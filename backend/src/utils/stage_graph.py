@@ -0,0 +1,73 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Sequence, Tuple
+
+
+StageFunc = Callable[..., Awaitable[Any]]
+
+
+class StageGraph:
+    """
+    Minimal async dependency-graph executor.
+
+    Each stage is an async callable that receives the results of the stages
+    listed in `after` as keyword arguments, and starts as soon as all of
+    them have finished — independent stages run concurrently. A stage may
+    also `await graph.result(name)` for a dependency it needs only on some
+    paths.
+
+    Stages must be added after their dependencies, which keeps the graph
+    acyclic. The first failure cancels every stage still running and is
+    re-raised from `run()`.
+    """
+
+    def __init__(self) -> None:
+        self._stages: Dict[str, Tuple[StageFunc, Tuple[str, ...]]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # stage name → duration in milliseconds (excluding dependency waits)
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, func: StageFunc, after: Sequence[str] = ()) -> None:
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage {name!r}")
+
+        for dependency in after:
+            if dependency not in self._stages:
+                raise ValueError(f"Unknown dependency {dependency!r} for stage {name!r}")
+
+        self._stages[name] = (func, tuple(after))
+
+    async def result(self, name: str) -> Any:
+        """Result of another stage of a running graph, waiting for it if needed."""
+        return await self._tasks[name]
+
+    async def _run_stage(self, name: str) -> Any:
+        func, after = self._stages[name]
+        kwargs = {dependency: await self._tasks[dependency] for dependency in after}
+
+        start = time.perf_counter()
+        try:
+            return await func(**kwargs)
+        finally:
+            self.timings[name] = (time.perf_counter() - start) * 1000
+
+    async def run(self) -> Dict[str, Any]:
+        """Run every stage; returns stage name → result."""
+
+        start = time.perf_counter()
+
+        self._tasks = {
+            name: asyncio.create_task(self._run_stage(name)) for name in self._stages
+        }
+
+        try:
+            await asyncio.gather(*self._tasks.values())
+        except BaseException:
+            for task in self._tasks.values():
+                task.cancel()
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            self.timings["total"] = (time.perf_counter() - start) * 1000
+
+        return {name: task.result() for name, task in self._tasks.items()}
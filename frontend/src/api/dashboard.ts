@@ -1,5 +1,15 @@
 const BASE_URL = "http://localhost:8000"
 
+// all panels in one request
+export async function fetchDashboard(token: string) {
+    const res = await fetch(`${BASE_URL}/api/dashboard`, {
+        headers: {
+            Authorization: `Bearer ${token}`,
+        },
+    })
+    return res.json()
+}
+
 export async function fetchCategoryDistribution(token: string) {
     const res = await fetch(`${BASE_URL}/api/dashboard/category-distribution`, {
         headers: {
@@ -1,4 +1,4 @@
-export type ReceiptMethod = "di" | "openai" | "compare"
+export type ReceiptMethod = "di" | "openai" | "compare" | "auto"
 
 interface BaseReceipt {
     merchant: string | null
@@ -14,9 +14,12 @@ export interface ReceiptAnalysis extends BaseReceipt { }
 export interface ReceiptDetail extends BaseReceipt {
     id: number
     blob_url: string
+    version: number
+    updated_at: string
 }
 
 export interface ReceiptItem {
+    id?: number | null
     name: string
     quantity: number
     price: number
@@ -31,6 +34,20 @@ export interface ReceiptResponse {
     analysis: ReceiptAnalysis
 }
 
+export type ReceiptProgressStage =
+    | "uploaded"
+    | "di_done"
+    | "openai_done"
+    | "diff_ready"
+    | "categories_assigned"
+    | "saved"
+
+export interface ReceiptProgressEvent {
+    stage: ReceiptProgressStage
+    // engine result so far, on di_done / openai_done / categories_assigned
+    analysis?: ReceiptAnalysis
+}
+
 export interface ReceiptListItem {
     id: number
     merchant: string | null
@@ -41,6 +58,11 @@ export interface ReceiptListItem {
     created_at: string
 }
 
+export interface ReceiptListPage {
+    items: ReceiptListItem[]
+    next_cursor: string | null
+}
+
 
 export async function uploadReceipt(
     file: File,
@@ -72,15 +94,87 @@ export async function uploadReceipt(
 }
 
 
+// Same as uploadReceipt, but reports each finished pipeline stage (and the
+// first engine's result) through onProgress while the upload is processed.
+export async function uploadReceiptStream(
+    file: File,
+    method: ReceiptMethod,
+    token: string,
+    onProgress: (event: ReceiptProgressEvent) => void
+): Promise<ReceiptResponse> {
+    const formData = new FormData();
+    formData.append("file", file);
+
+    const apiBaseUrl =
+        import.meta.env.VITE_API_URL || "http://127.0.0.1:8000";
+
+    const response = await fetch(
+        `${apiBaseUrl}/api/receipts/stream?method=${method}`,
+        {
+            method: "POST",
+            headers: {
+                Authorization: `Bearer ${token}`,
+            },
+            body: formData,
+        }
+    );
+
+    if (!response.ok || !response.body) {
+        throw new Error("Upload failed");
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+
+        let end: number;
+        while ((end = buffer.indexOf("\n\n")) !== -1) {
+            const frame = buffer.slice(0, end);
+            buffer = buffer.slice(end + 2);
+
+            let event = "";
+            let data = "";
+            for (const line of frame.split("\n")) {
+                if (line.startsWith("event: ")) event = line.slice(7);
+                else if (line.startsWith("data: ")) data += line.slice(6);
+            }
+            // keep-alive comments carry no event
+            if (!event) continue;
+
+            const payload = JSON.parse(data);
+            if (event === "result") {
+                return payload;
+            }
+            if (event === "error") {
+                throw new Error(payload.detail || "Upload failed");
+            }
+            onProgress({ stage: event as ReceiptProgressStage, analysis: payload.analysis });
+        }
+    }
+
+    throw new Error("Upload failed");
+}
+
+
 
 export async function fetchReceipts(
-    token: string
-): Promise<ReceiptListItem[]> {
+    token: string,
+    cursor?: string | null
+): Promise<ReceiptListPage> {
     const apiBaseUrl =
         import.meta.env.VITE_API_URL || "http://127.0.0.1:8000";
 
+    const params = new URLSearchParams();
+    if (cursor) {
+        params.set("cursor", cursor);
+    }
+
     const response = await fetch(
-        `${apiBaseUrl}/api/receipts`,
+        `${apiBaseUrl}/api/receipts?${params.toString()}`,
         {
             method: "GET",
             headers: {
@@ -1,12 +1,12 @@
 import { useMsal } from "@azure/msal-react";
 import { loginRequest } from "@/config/msalConfig";
-import { uploadReceipt } from "@/api/receipt"
+import { uploadReceiptStream } from "@/api/receipt"
 import { useEffect, useRef, useState } from "react"
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Upload, FileText } from "lucide-react"
 import { RadioGroup, RadioGroupItem } from "@/components/ui/radio-group"
-import type { ReceiptMethod } from "@/api/receipt"
+import type { ReceiptAnalysis, ReceiptMethod, ReceiptProgressStage } from "@/api/receipt"
 import {
     Field,
     FieldContent,
@@ -19,6 +19,15 @@ import { useNavigate } from "react-router-dom"
 
 const MAX_FILE_SIZE = 10 * 1024 * 1024 // 10MB
 
+const STAGE_LABELS: Record<ReceiptProgressStage, string> = {
+    uploaded: "Uploaded, reading receipt…",
+    di_done: "Document Intelligence done",
+    openai_done: "OpenAI done",
+    diff_ready: "Comparison ready",
+    categories_assigned: "Categories assigned",
+    saved: "Saved",
+}
+
 const ALLOWED_TYPES = [
     "image/jpeg",
     "image/png",
@@ -30,6 +39,8 @@ export function UploadCard() {
     const [method, setMethod] = useState<ReceiptMethod>("di")
 
     const [isUploading, setIsUploading] = useState(false)
+    const [stage, setStage] = useState<ReceiptProgressStage | null>(null)
+    const [partial, setPartial] = useState<ReceiptAnalysis | null>(null)
 
     const fileInputRef = useRef<HTMLInputElement | null>(null)
     const [file, setFile] = useState<File | null>(null)
@@ -79,6 +90,8 @@ export function UploadCard() {
 
         try {
             setIsUploading(true)
+            setStage(null)
+            setPartial(null)
             const account = instance.getActiveAccount();
 
             if (!account) {
@@ -93,7 +106,12 @@ export function UploadCard() {
 
             const token = tokenResponse.accessToken;
 
-            const data = await uploadReceipt(file, method, token);
+            const data = await uploadReceiptStream(file, method, token, (event) => {
+                setStage(event.stage)
+                if (event.analysis) {
+                    setPartial(event.analysis)
+                }
+            });
             navigate(`/receipts/${data.id}`)
         } catch (error) {
             console.error("Upload failed:", error)
@@ -191,6 +209,18 @@ export function UploadCard() {
                                         <RadioGroupItem value="openai" id="openai" />
                                     </Field>
                                 </FieldLabel>
+
+                                <FieldLabel htmlFor="auto" className="block w-full">
+                                    <Field orientation="horizontal" className="cursor-pointer hover:bg-muted/50">
+                                        <FieldContent>
+                                            <FieldTitle>Auto</FieldTitle>
+                                            <FieldDescription>
+                                                Document Intelligence, with OpenAI only when needed
+                                            </FieldDescription>
+                                        </FieldContent>
+                                        <RadioGroupItem value="auto" id="auto" />
+                                    </Field>
+                                </FieldLabel>
                             </RadioGroup>
                         </div>
 
@@ -213,6 +243,18 @@ export function UploadCard() {
                             )}
                         </Button>
 
+                        {isUploading && stage && (
+                            <div className="text-xs text-muted-foreground text-center space-y-1">
+                                <p>{STAGE_LABELS[stage]}</p>
+                                {partial && (
+                                    <p>
+                                        {partial.merchant ?? "Unknown merchant"}
+                                        {partial.total != null && ` · ${partial.total} ${partial.currency ?? ""}`}
+                                    </p>
+                                )}
+                            </div>
+                        )}
+
                         {!file && (
                             <p className="text-xs text-muted-foreground text-center">
                                 Supported formats: JPG, PNG, PDF (max 10MB)
@@ -2,8 +2,10 @@ import type { Configuration } from "@azure/msal-browser";
 
 const azureClientId = import.meta.env.VITE_AZURE_CLIENT_ID as string;
 const azureAuthority = import.meta.env.VITE_AZURE_AUTHORITY as string;
+// exposed scope of the backend app registration, e.g. api://<client-id>/access_as_user
+const apiScope = import.meta.env.VITE_API_SCOPE as string;
 
-if (!azureClientId || !azureAuthority) {
+if (!azureClientId || !azureAuthority || !apiScope) {
     throw new Error("Missing Azure AD environment configuration");
 }
 
@@ -19,5 +21,5 @@ export const msalConfig: Configuration = {
 };
 
 export const loginRequest = {
-    scopes: ["User.Read"],
+    scopes: [apiScope],
 };
\ No newline at end of file
@@ -9,11 +9,7 @@ import { ReceiptTable } from "@/components/ReceiptTable/ReceiptTable"
 import { Plus } from "lucide-react"
 import { ReceiptsTableSkeleton } from "@/components/ReceiptTable/ReceiptsTableSkeleton"
 import { Dashboard } from "@/components/Dashboard/Dashboard"
-import {
-    fetchCategoryDistribution,
-    fetchMonthlyTrend,
-    fetchSummary,
-} from "@/api/dashboard"
+import { fetchDashboard } from "@/api/dashboard"
 import { Skeleton } from "@/components/ui/skeleton"
 
 export default function HomePage() {
@@ -21,7 +17,9 @@ export default function HomePage() {
     const navigate = useNavigate()
 
     const [receipts, setReceipts] = useState<ReceiptListItem[]>([])
+    const [nextCursor, setNextCursor] = useState<string | null>(null)
     const [loading, setLoading] = useState(true)
+    const [loadingMore, setLoadingMore] = useState(false)
     const [dashboardLoading, setDashboardLoading] = useState(true)
 
     const [categoryData, setCategoryData] = useState<any[]>([])
@@ -41,32 +39,26 @@ export default function HomePage() {
 
                 const token = tokenResponse.accessToken
 
-                const [
-                    receiptsData,
-                    categories,
-                    trend,
-                    summaryData,
-                ] = await Promise.all([
+                const [receiptsData, dashboard] = await Promise.all([
                     fetchReceipts(token),
-                    fetchCategoryDistribution(token),
-                    fetchMonthlyTrend(token),
-                    fetchSummary(token),
+                    fetchDashboard(token),
                 ])
 
                 // receipts
-                setReceipts(receiptsData)
+                setReceipts(receiptsData.items)
+                setNextCursor(receiptsData.next_cursor)
 
                 // dashboard
-                setCategoryData(categories)
+                setCategoryData(dashboard.category_distribution)
 
                 setTrendData(
-                    trend.map((t: any) => ({
+                    dashboard.monthly_trend.map((t: any) => ({
                         name: `${t.year}-${String(t.month).padStart(2, "0")}`,
                         total: t.total,
                     }))
                 )
 
-                setSummary(summaryData)
+                setSummary(dashboard.summary)
 
             } catch (err) {
                 console.error("Failed to load data:", err)
@@ -79,6 +71,30 @@ export default function HomePage() {
         loadData()
     }, [instance])
 
+    const loadMore = async () => {
+        if (!nextCursor) return
+
+        setLoadingMore(true)
+        try {
+            const account = instance.getActiveAccount()
+            if (!account) return
+
+            const tokenResponse = await instance.acquireTokenSilent({
+                ...loginRequest,
+                account,
+            })
+
+            const page = await fetchReceipts(tokenResponse.accessToken, nextCursor)
+
+            setReceipts((prev) => [...prev, ...page.items])
+            setNextCursor(page.next_cursor)
+        } catch (err) {
+            console.error("Failed to load more receipts:", err)
+        } finally {
+            setLoadingMore(false)
+        }
+    }
+
     return (
         <PageWrapper>
             <div className="space-y-6 w-full">
@@ -134,7 +150,21 @@ export default function HomePage() {
                         </p>
                     </div>
                 ) : (
-                    <ReceiptTable data={receipts} />
+                    <>
+                        <ReceiptTable data={receipts} />
+
+                        {nextCursor && (
+                            <div className="flex justify-center">
+                                <Button
+                                    variant="outline"
+                                    onClick={loadMore}
+                                    disabled={loadingMore}
+                                >
+                                    {loadingMore ? "Loading..." : "Load more"}
+                                </Button>
+                            </div>
+                        )}
+                    </>
                 )}
 
             </div>
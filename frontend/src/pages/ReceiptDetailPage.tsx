@@ -78,7 +78,7 @@ export default function ReceiptDetailPage() {
         }
 
         const response = await instance.acquireTokenSilent({
-            scopes: ["User.Read"],
+            ...loginRequest,
             account,
         })
 
@@ -124,7 +124,7 @@ export default function ReceiptDetailPage() {
 
             const token = await getToken()
 
-            const { id, blob_url, ...payload } = receipt
+            const { id, blob_url, version, updated_at, ...payload } = receipt
 
             await updateReceipt(id, payload, token)
 